@@ -0,0 +1,43 @@
+import numpy as np
+
+
+def distribution_chart(distributions, stat, position, markers, leagues=None):
+    """
+    Builds a histogram of a stat within a position, with a line per player.
+
+    `distributions` is a `footverse.distributions.StatDistributions`; `markers`
+    is a list of (label, value, rgb colour string) tuples. Players without a
+    value are left out.
+    """
+    import plotly.graph_objects as go
+
+    counts, edges = distributions.histogram(stat, position, leagues)
+    fig = go.Figure(
+        go.Bar(
+            x=(edges[:-1] + edges[1:]) / 2,
+            y=counts,
+            width=np.diff(edges),
+            marker_color="rgba(150, 150, 150, 0.6)",
+            hovertemplate="%{x:.2f}: %{y} players<extra></extra>",
+        )
+    )
+
+    for label, value, color in markers:
+        if value is None or np.isnan(value):
+            continue
+        fig.add_vline(
+            x=value,
+            line=dict(color=f"rgba({color}, 1)", width=3),
+            annotation_text=label,
+            annotation_position="top",
+        )
+
+    fig.update_layout(
+        title=stat,
+        height=260,
+        margin=dict(l=10, r=10, t=60, b=10),
+        bargap=0,
+        showlegend=False,
+        yaxis_title="Players",
+    )
+    return fig
@@ -0,0 +1,72 @@
+import html
+from string import Template
+import streamlit as st
+
+# Styles are emitted once per fixture list instead of inline on every element
+FIXTURES_CSS = """
+<style>
+.fv-fixtures { display: flex; flex-direction: column; gap: 2rem; }
+.fv-fixture { display: grid; grid-template-columns: 3fr 1fr 3fr; align-items: center; }
+.fv-team, .fv-result { text-align: center; }
+.fv-team img { width: 50px; margin-bottom: 10px; }
+.fv-result h3 { margin: 0; padding: 0; }
+</style>
+"""
+
+FIXTURE_TEMPLATE = Template("""<div class="fv-fixture">
+<div class="fv-team"><img src="$home_crest"><br><strong>$home_name</strong></div>
+<div class="fv-result">$result</div>
+<div class="fv-team"><img src="$away_crest"><br><strong>$away_name</strong></div>
+</div>""")
+
+
+def match_result(match):
+    """Formats the centre cell of a fixture: the score once finished, else the status."""
+    score = match["score"]["fullTime"]
+    if match["status"] == "FINISHED":
+        home_score = score["home"] if score["home"] is not None else "-"
+        away_score = score["away"] if score["away"] is not None else "-"
+        return f"<h3>{home_score} - {away_score}</h3>"
+    return f"<strong>Status:</strong> {html.escape(match['status'])}"
+
+
+def build_fixtures_html(matches, crests=None):
+    """Builds the HTML block for a whole matchday from the fixture template."""
+    crests = crests or {}
+    rows = [
+        FIXTURE_TEMPLATE.substitute(
+            home_crest=html.escape(
+                crests.get(match["homeTeam"]["crest"])
+                or match["homeTeam"]["crest"]
+                or ""
+            ),
+            home_name=html.escape(match["homeTeam"]["shortName"] or ""),
+            result=match_result(match),
+            away_crest=html.escape(
+                crests.get(match["awayTeam"]["crest"])
+                or match["awayTeam"]["crest"]
+                or ""
+            ),
+            away_name=html.escape(match["awayTeam"]["shortName"] or ""),
+        )
+        for match in matches
+    ]
+    return FIXTURES_CSS + '<div class="fv-fixtures">' + "".join(rows) + "</div>"
+
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def render_fixtures_html(competition, season, matchday, version, _matches, _crests):
+    """
+    Returns the cached fixture list HTML for a (competition, matchday, data version).
+
+    The underscored arguments are not hashed; `version` changes whenever the
+    underlying API response is refreshed.
+    """
+    return build_fixtures_html(_matches, _crests)
+
+
+def fixture_list(competition, season, matchday, version, matches, crests=None):
+    """Renders a whole matchday as a single HTML element."""
+    st.html(
+        render_fixtures_html(competition, season, matchday, version, matches, crests)
+    )
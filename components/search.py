@@ -0,0 +1,77 @@
+import pandas as pd
+import streamlit as st
+from footverse.search import search_players
+
+# The page a sidebar search pick opens, and the positions it can scout
+SCOUT_REPORT_PAGE = "pages/3_🔍_Player_Scout_Report.py"
+SCOUTED_POSITIONS = ["GK", "DF", "MF", "FW"]
+
+SEARCH_HELP = "Accents and small typos are ignored. Add a team name to narrow it down."
+
+
+def search_matches(players_df, version, label="🔎 Search a Player", key=None):
+    """Shows the player search box and returns (query, best matches), or (query, None)."""
+    query = st.text_input(
+        label, placeholder="e.g. mbappe, odegaard", help=SEARCH_HELP, key=key
+    )
+    if not query:
+        return query, None
+    matches = search_players(players_df, version, query)
+    if matches.empty:
+        st.caption("No players found.")
+        return query, None
+    return query, matches
+
+
+def match_label(matches, i):
+    """Formats a match of `search_matches` for a selectbox."""
+    return f"{matches.at[i, 'Player']} ({matches.at[i, 'Team']})"
+
+
+def scout_selection(match):
+    """
+    Returns the (league, team, position, player) the Scout Report selects for a match.
+
+    Returns None, with a warning, if the player's primary position is not one
+    the Scout Report offers (e.g. no position listed).
+    """
+    position = match["Primary Position"]
+    if pd.isna(position) or position not in SCOUTED_POSITIONS:
+        reason = "has no position listed" if pd.isna(position) else f"plays {position}"
+        st.warning(
+            f"⚠️ {match['Player']} {reason}, which the Scout Report does not cover; "
+            "keeping the current selection."
+        )
+        return None
+    return match["League"], match["Team"], position, match["Player"]
+
+
+def sidebar_search(players_df, version):
+    """
+    The player search shared by the pages, in the sidebar.
+
+    Picking a match and opening it selects the player on the Scout Report.
+    Nothing is shown without players (their loader already showed why).
+    """
+    if players_df is None:
+        return
+    with st.sidebar:
+        _, matches = search_matches(players_df, version, key="sidebar_search")
+        if matches is None:
+            return
+        pick = st.selectbox(
+            "✨ Best Matches",
+            range(len(matches)),
+            format_func=lambda i: match_label(matches, i),
+            key="sidebar_search_pick",
+        )
+        if st.button("🔍 Open Scout Report", width="stretch"):
+            selection = scout_selection(matches.loc[pick])
+            if selection is not None:
+                (
+                    st.session_state.selected_league,
+                    st.session_state.selected_team,
+                    st.session_state.selected_position,
+                    st.session_state.selected_player,
+                ) = selection
+                st.switch_page(SCOUT_REPORT_PAGE)
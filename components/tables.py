@@ -0,0 +1,11 @@
+import streamlit as st
+
+# Styling touches every cell, so long tables are cut to their top rows
+MAX_STYLED_ROWS = 500
+
+
+def top_rows(df, noun="players"):
+    """Keeps the first `MAX_STYLED_ROWS` rows of a sorted table, noting the cut."""
+    if len(df) > MAX_STYLED_ROWS:
+        st.caption(f"Showing the top {MAX_STYLED_ROWS} of {len(df)} {noun}.")
+    return df.head(MAX_STYLED_ROWS)
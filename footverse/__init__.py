@@ -0,0 +1,42 @@
+"""
+Football data core used by the Streamlit app, scripts and worker processes.
+
+Fetching (fbref tables, football-data.org), parsing, merging, scoring and
+caching live here without any Streamlit dependency. Failures raise a
+`FootverseError` subclass; the `data` package adapts them to page messages.
+
+Caches persist under `data/cache` by default; call `configure_cache(None)`
+to keep them in memory only, or pass another directory.
+"""
+
+from footverse.cache import configure_cache
+from footverse.datasets import get_table, load_columns, refresh_table
+from footverse.errors import (
+    ConfigurationError,
+    DataUnavailableError,
+    FetchError,
+    FootverseError,
+    RateLimitError,
+    SchemaDriftError,
+    SchemaError,
+    ValidationError,
+)
+from footverse.football_data import cached_request
+from footverse.merge import merge_data
+
+__all__ = [
+    "ConfigurationError",
+    "DataUnavailableError",
+    "FetchError",
+    "FootverseError",
+    "RateLimitError",
+    "SchemaDriftError",
+    "SchemaError",
+    "ValidationError",
+    "cached_request",
+    "configure_cache",
+    "get_table",
+    "load_columns",
+    "merge_data",
+    "refresh_table",
+]
@@ -0,0 +1,262 @@
+import base64
+import hashlib
+import io
+import math
+import os
+import tempfile
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from footverse.cache import cache_path
+from footverse.singleflight import single_flight
+
+# Crests and emblems downloaded once and stored as resized thumbnails
+ASSET_NAMESPACE = "crests"
+
+# Image widths (px) used by the League Table and Matchday Zone pages
+THUMBNAIL_SIZES = (50, 150)
+
+# Magic bytes of the PNG, JPEG, GIF and WebP images a crest may be served as
+RASTER_SIGNATURES = (b"\x89PNG\r\n\x1a\n", b"\xff\xd8\xff", b"GIF8", b"RIFF")
+
+SVG_NUMBER = r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?"
+
+_lock = threading.Lock()
+# {(url, size): data URI}; an SVG crest is stored once under (url, None)
+_data_uris = {}
+
+
+def _asset_path(url, suffix):
+    digest = hashlib.sha1(url.encode("utf-8")).hexdigest()
+    return cache_path(ASSET_NAMESPACE, f"{digest}{suffix}")
+
+
+def _is_svg(data):
+    head = data[:512].lstrip().lower()
+    return head.startswith(b"<svg") or (head.startswith(b"<?xml") and b"<svg" in data)
+
+
+def _is_image(data):
+    """Checks that downloaded or cached bytes are an SVG or a known raster image."""
+    return bool(data) and (_is_svg(data) or data.startswith(RASTER_SIGNATURES))
+
+
+def _format_number(value, decimals):
+    text = f"{round(value, decimals):.{decimals}f}".rstrip("0").rstrip(".")
+    if text in ("", "-", "-0"):
+        return "0"
+    if text.startswith(("0.", "-0.")):
+        text = text.replace("0.", ".", 1)
+    return text
+
+
+def _round_coordinates(value, decimals):
+    """Rewrites path data or a point list with `decimals` digits per number."""
+    # Arc flags may be written without separators ("a5 5 0 0110 10"), so leave arcs
+    if re.search(r"[Aa]", value):
+        return value
+
+    parts, after_number = [], False
+    for token in re.findall(rf"[A-DF-Za-df-z]|{SVG_NUMBER}", value):
+        if token[0].isalpha():
+            parts.append(token)
+            after_number = False
+            continue
+        text = _format_number(float(token), decimals)
+        if after_number and not text.startswith("-"):
+            parts.append(" ")
+        parts.append(text)
+        after_number = True
+    return "".join(parts)
+
+
+def _shrink_svg(data, size):
+    """
+    Strips an SVG down to what a `size` px crest needs and sets its rendered size.
+
+    Comments, metadata and editor attributes are dropped, and path coordinates
+    are rounded to a fraction of a pixel at that size. The viewBox keeps the
+    aspect ratio, so the same file serves smaller sizes as well.
+    """
+    text = data.decode("utf-8", errors="replace")
+    text = re.sub(r"<\?xml.*?\?>|<!DOCTYPE[^>]*>|<!--.*?-->", "", text, flags=re.S)
+    text = re.sub(
+        r"<(metadata|title|desc|sodipodi:namedview)\b.*?(</\1>|/>)",
+        "",
+        text,
+        flags=re.S | re.I,
+    )
+    text = re.sub(r'\s(xmlns:)?(inkscape|sodipodi)(:[\w-]+)?="[^"]*"', "", text)
+    text = re.sub(r">\s+<", "><", text).strip()
+
+    match = re.search(r"<svg\b[^>]*>", text, flags=re.IGNORECASE)
+    if not match:
+        return data
+
+    tag = match.group(0)
+    width = re.search(r'\swidth="([\d.]+)(px)?"', tag)
+    height = re.search(r'\sheight="([\d.]+)(px)?"', tag)
+
+    # Without a viewBox the drawing would be clipped rather than scaled
+    if "viewbox" not in tag.lower() and width and height:
+        tag = tag.replace(
+            "<svg", f'<svg viewBox="0 0 {width.group(1)} {height.group(1)}"', 1
+        )
+
+    tag = re.sub(r'\s(width|height)="[^"]*"', "", tag)
+    tag = tag.replace("<svg", f'<svg width="{size}" height="{size}"', 1)
+    text = text[: match.start()] + tag + text[match.end() :]
+
+    # A quarter of a pixel on a 2x (high-DPI) screen
+    view_box = re.search(r'viewBox="([^"]*)"', tag, flags=re.IGNORECASE)
+    numbers = re.findall(SVG_NUMBER, view_box.group(1)) if view_box else []
+    extent = max(map(float, numbers[2:4])) if len(numbers) == 4 else 0
+    if extent > 0:
+        step = extent / (size * 8)
+        decimals = max(1, math.ceil(-math.log10(step)))
+        text = re.sub(
+            r'(\s(?:d|points)=")([^"]*)"',
+            lambda m: f'{m.group(1)}{_round_coordinates(m.group(2), decimals)}"',
+            text,
+        )
+    return text.encode("utf-8")
+
+
+def _resize_raster(data, size):
+    """Downscales a PNG/JPEG to fit a `size` x `size` box. Returns PNG bytes."""
+    try:
+        from PIL import Image  # Installed with Streamlit
+    except ImportError:
+        return data
+
+    try:
+        image = Image.open(io.BytesIO(data))
+        image.thumbnail((size * 2, size * 2))  # 2x for high-DPI screens
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG", optimize=True)
+        return buffer.getvalue()
+    except OSError:
+        return data
+
+
+def _read(path):
+    """Returns a cached image, or None if it is missing or not an image."""
+    if path is None or not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        data = f.read()
+    return data if _is_image(data) else None
+
+
+def _write(path, data):
+    """Writes an image to the cache directory, unless caches are memory only."""
+    if path is None:
+        return
+    # Write to a temporary file first so readers never see a partial image
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _download(url):
+    """Downloads an image once and keeps the original on disk."""
+    path = _asset_path(url, ".orig")
+    data = _read(path)
+    if data is not None:
+        return data
+
+    try:
+        response = requests.get(url, timeout=10)
+    except requests.RequestException:
+        return None
+    # An error page served with a 200 is not cached as the crest
+    if response.status_code != 200 or not _is_image(response.content):
+        return None
+
+    _write(path, response.content)
+    return response.content
+
+
+def _data_uri(data):
+    mime = "image/svg+xml" if _is_svg(data) else "image/png"
+    return f"data:{mime};base64,{base64.b64encode(data).decode()}"
+
+
+def _build_thumbnail(url, size):
+    """
+    Returns (size, data URI) of an image's thumbnail, creating it if needed.
+
+    An SVG is shrunk once at the largest thumbnail size and scales down to the
+    others, so its size is None: the encoded string is shared by every size.
+    """
+    for path, key in (
+        (_asset_path(url, ".svg"), None),
+        (_asset_path(url, f"_{size}.png"), size),
+    ):
+        data = _read(path)
+        if data is not None:
+            return key, _data_uri(data)
+
+    data = _download(url)
+    if data is None:
+        return size, None
+
+    if _is_svg(data):
+        thumbnail = _shrink_svg(data, max(THUMBNAIL_SIZES + (size,)))
+        path, key = _asset_path(url, ".svg"), None
+    else:
+        thumbnail = _resize_raster(data, size)
+        path, key = _asset_path(url, f"_{size}.png"), size
+
+    _write(path, thumbnail)
+    return key, _data_uri(thumbnail)
+
+
+def _cached(url, size):
+    """Returns the data URI already built for a crest at `size` (call with _lock)."""
+    return _data_uris.get((url, None)) or _data_uris.get((url, size))
+
+
+def crest_thumbnail(url, size=50):
+    """
+    Returns a locally cached, resized crest as an inline data URI.
+
+    Falls back to the original URL if the image cannot be downloaded.
+    """
+    if not url:
+        return url
+
+    with _lock:
+        data_uri = _cached(url, size)
+    if data_uri is not None:
+        return data_uri
+
+    try:
+        key, data_uri = single_flight(
+            f"crest:{url}:{size}", _build_thumbnail, url, size
+        )
+    except OSError:
+        data_uri = None
+
+    if data_uri is None:
+        return url  # Retry on the next call
+
+    with _lock:
+        _data_uris[(url, key)] = data_uri
+    return data_uri
+
+
+def crest_thumbnails(urls, size=50):
+    """Returns {url: data URI} for many crests, downloading missing ones in parallel."""
+    urls = list(dict.fromkeys(url for url in urls if url))
+    with _lock:
+        missing = [url for url in urls if _cached(url, size) is None]
+    if not missing:
+        with _lock:
+            return {url: _cached(url, size) for url in urls}
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        return dict(zip(urls, executor.map(lambda u: crest_thumbnail(u, size), urls)))
@@ -0,0 +1,143 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+# Default root directory for persistent caches (survives app restarts)
+CACHE_DIR = "data/cache"
+
+_lock = threading.Lock()
+_memory = {}
+# File version (see `file_version`) of each in-memory entry that came from disk
+_file_versions = {}
+_stats = {"hits": 0, "misses": 0, "stale": 0, "writes": 0}
+_settings = {"cache_dir": CACHE_DIR}
+
+
+def configure_cache(cache_dir=CACHE_DIR):
+    """
+    Sets the directory every footverse cache persists to.
+
+    Pass None to keep caches in memory only (e.g. for tests or short-lived
+    worker processes); in-memory entries are kept either way.
+    """
+    with _lock:
+        _settings["cache_dir"] = cache_dir
+
+
+def cache_path(*parts):
+    """Returns a path inside the cache directory, or None if caches are memory only."""
+    with _lock:
+        cache_dir = _settings["cache_dir"]
+    return os.path.join(cache_dir, *parts) if cache_dir else None
+
+
+def file_version(path):
+    """
+    Returns a key that changes whenever a file is replaced, or None if absent.
+
+    Lets a process holding a file's contents in memory notice that another
+    process (such as the warmup job) wrote a newer copy.
+    """
+    if path is None:
+        return None
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _entry_path(namespace, key):
+    """Returns the file path used to persist a cache entry, or None."""
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+    return cache_path(namespace, f"{digest}.json")
+
+
+def cache_get(namespace, key):
+    """
+    Returns the cached entry for a key (fresh or stale), or None if absent.
+
+    An entry held in memory is reloaded when another process (such as the
+    warmup job) wrote a newer one on disk.
+    """
+    path = _entry_path(namespace, key)
+    disk_version = file_version(path)
+    with _lock:
+        entry = _memory.get((namespace, key))
+        if entry is not None and (
+            disk_version is None or _file_versions.get((namespace, key)) == disk_version
+        ):
+            return entry
+    if disk_version is None:
+        return None
+
+    try:
+        with open(path, "r") as f:
+            loaded = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return entry
+
+    # Guard against hash collisions
+    if loaded.get("key") != key:
+        return entry
+
+    with _lock:
+        # Keep an entry stored by another thread in the meantime
+        if _file_versions.get((namespace, key)) != file_version(path):
+            _memory[(namespace, key)] = loaded
+            _file_versions[(namespace, key)] = disk_version
+        return _memory[(namespace, key)]
+
+
+def cache_set(namespace, key, payload, ttl):
+    """Stores a payload in memory and on disk with the given TTL (seconds)."""
+    now = time.time()
+    entry = {
+        "key": key,
+        "stored_at": now,
+        "expires_at": now + ttl,
+        "payload": payload,
+    }
+
+    with _lock:
+        _memory[(namespace, key)] = entry
+        _stats["writes"] += 1
+
+    path = _entry_path(namespace, key)
+    if path is None:
+        return entry
+
+    # Write to a temporary file first so readers never see a partial entry
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+    except OSError:
+        # The in-memory copy is still usable if the disk is read-only
+        pass
+
+    with _lock:
+        _file_versions[(namespace, key)] = file_version(path)
+    return entry
+
+
+def is_fresh(entry):
+    """Checks whether a cache entry is still within its TTL."""
+    return entry is not None and time.time() < entry["expires_at"]
+
+
+def record(event):
+    """Increments a cache counter ('hits', 'misses' or 'stale')."""
+    with _lock:
+        _stats[event] = _stats.get(event, 0) + 1
+
+
+def cache_stats():
+    """Returns a snapshot of the cache counters."""
+    with _lock:
+        return dict(_stats)
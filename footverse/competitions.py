@@ -0,0 +1,67 @@
+"""
+The competitions whose fbref player tables make up the dataset.
+
+`config/competitions.json` lists each competition's fbref id and URL slug,
+in the order their players appear. A multi-league page such as the Big 5 maps
+fbref's `Comp` labels to league names; any other competition is one league
+named after its entry. Set `"enabled": false` to leave a competition out.
+"""
+
+from dataclasses import dataclass, field
+from footverse.errors import SchemaError
+from footverse.fbref import read_json
+
+COMPETITIONS_FILE = "config/competitions.json"
+
+FBREF_COMPS_URL = "https://fbref.com/en/comps"
+
+
+@dataclass(frozen=True)
+class Competition:
+    """One fbref competition page (such as the Big 5 or the Eredivisie)."""
+
+    name: str
+    fbref_id: str
+    slug: str
+    leagues: dict = field(default_factory=dict, compare=False)
+
+    def url(self, category, season=None):
+        """Returns the URL of a player table, for the current or a past season."""
+        if season is None:
+            return f"{FBREF_COMPS_URL}/{self.fbref_id}/{category}/players/{self.slug}"
+        return (
+            f"{FBREF_COMPS_URL}/{self.fbref_id}/{season}/{category}"
+            f"/players/{season}-{self.slug}"
+        )
+
+
+def competitions():
+    """Returns {name: Competition} of the enabled competitions. Raises SchemaError."""
+    registry = {}
+    for name, entry in read_json(COMPETITIONS_FILE).items():
+        if not entry.get("enabled", True):
+            continue
+        if not entry.get("fbref_id") or not entry.get("slug"):
+            raise SchemaError(COMPETITIONS_FILE, f"has no fbref_id or slug for {name}")
+        registry[name] = Competition(
+            name, str(entry["fbref_id"]), entry["slug"], entry.get("leagues", {})
+        )
+    if not registry:
+        raise SchemaError(COMPETITIONS_FILE, "enables no competition")
+    return registry
+
+
+def league_mapping():
+    """Maps fbref's `Comp` labels of the multi-league pages to league names."""
+    mapping = {}
+    for competition in competitions().values():
+        mapping.update(competition.leagues)
+    return mapping
+
+
+def league_names():
+    """Returns every league of the enabled competitions, in registry order."""
+    names = []
+    for competition in competitions().values():
+        names.extend(competition.leagues.values() or [competition.name])
+    return names
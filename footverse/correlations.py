@@ -0,0 +1,149 @@
+"""
+Correlations between stat columns, per position and league.
+
+Instead of one matrix per slice, the dataset is reduced once per version to
+the pairwise sums a Pearson correlation needs (counts, sums, sums of squares
+and cross products over the players that have both stats) for every
+(primary position, league) group. Any combination of positions and leagues is
+then the sum of its groups' matrices, so slicing never goes back to the
+players. Missing values are skipped pair by pair, like `DataFrame.corr()`.
+"""
+
+import copy
+import numpy as np
+import pandas as pd
+
+# Correlations from fewer players than this are left out
+MIN_PLAYERS = 10
+
+# Stats correlating at least this strongly (in absolute value) are redundant
+REDUNDANCY_THRESHOLD = 0.9
+
+
+class StatCorrelations:
+    """Pairwise moment matrices of every stat for each (position, league) group."""
+
+    def __init__(self, merged_df):
+        self.stats = [col for col in merged_df.columns[7:] if col != "Primary Position"]
+        values, present, groups = self._groups(merged_df)
+        self.groups = list(groups)
+
+        # moments[g] = (count, sum x, sum x^2, sum xy), each stats x stats,
+        # where [i, j] only counts players with both stat i and stat j
+        self.moments = np.empty((len(groups), 4, len(self.stats), len(self.stats)))
+        for g, rows in enumerate(groups.values()):
+            x, m = values[rows], present[rows]
+            self.moments[g] = (m.T @ m, x.T @ m, (x * x).T @ m, x.T @ x)
+
+    def _groups(self, merged_df):
+        """Returns the zero-filled stats, their presence and the rows of every group."""
+        values = merged_df[self.stats].to_numpy(dtype="float64", na_value=np.nan)
+        present = ~np.isnan(values)
+        values = np.where(present, values, 0.0)
+        groups = (
+            pd.DataFrame(
+                {
+                    "Position": merged_df["Position"].str.split(",").str[0],
+                    "League": merged_df["League"],
+                }
+            )
+            .groupby(["Position", "League"])
+            .indices
+        )
+        return values, present.astype("float64"), groups
+
+    def updated(self, merged_df, stats):
+        """
+        Returns a copy with the moments of some stats recomputed.
+
+        Only the rows and columns of those stats are multiplied out again, so
+        the players and their groups must be the same as when built.
+        """
+        values, present, groups = self._groups(merged_df)
+        columns = [self.stats.index(stat) for stat in stats]
+        updated = copy.copy(self)
+        updated.moments = self.moments.copy()
+        for g, rows in enumerate(groups.values()):
+            x, m = values[rows], present[rows]
+            for k, (left, right) in enumerate(((m, m), (x, m), (x * x, m), (x, x))):
+                updated.moments[g, k, columns, :] = left[:, columns].T @ right
+                updated.moments[g, k, :, columns] = (left.T @ right[:, columns]).T
+        return updated
+
+    def positions(self):
+        return sorted({position for position, _ in self.groups})
+
+    def leagues(self):
+        return sorted({league for _, league in self.groups})
+
+    def matrix(self, positions=None, leagues=None):
+        """
+        Returns the correlation matrix of the players in some positions and leagues.
+
+        Empty or None selections mean all. Pairs of stats shared by fewer than
+        `MIN_PLAYERS` players, or that do not vary, are NaN.
+        """
+        selected = [
+            g
+            for g, (position, league) in enumerate(self.groups)
+            if (not positions or position in positions)
+            and (not leagues or league in leagues)
+        ]
+        n, sx, sxx, sxy = self.moments[selected].sum(axis=0)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            covariance = n * sxy - sx * sx.T
+            variance = (n * sxx - sx**2) * (n * sxx.T - sx.T**2)
+            corr = covariance / np.sqrt(variance)
+        corr[(n < MIN_PLAYERS) | ~np.isfinite(corr)] = np.nan
+        return pd.DataFrame(
+            np.clip(corr, -1.0, 1.0), index=self.stats, columns=self.stats
+        )
+
+
+def redundant_clusters(corr, threshold=REDUNDANCY_THRESHOLD):
+    """
+    Groups stats that correlate at least `threshold` (in absolute value).
+
+    Average-linkage clustering on 1 - |r|, cut at 1 - threshold, so every
+    stat in a cluster is on average that close to the others. Returns a frame
+    with one row per stat in a cluster of two or more, the cluster's most
+    central stat as its `Representative`, and the stat's mean |r| to the rest
+    of its cluster.
+    """
+    # SciPy comes with scikit-learn and is only needed here
+    from scipy.cluster.hierarchy import fcluster, linkage
+    from scipy.spatial.distance import squareform
+
+    # Stats without any correlation cannot be clustered
+    strength = corr.abs()
+    stats = strength.index[strength.notna().sum(axis=1) > 1]
+    strength = strength.loc[stats, stats]
+    columns = ["Cluster", "Stat", "Representative", "Mean |r|"]
+    if len(stats) < 2:
+        return pd.DataFrame(columns=columns)
+
+    distance = 1 - strength.fillna(0).to_numpy()
+    np.fill_diagonal(distance, 0)
+    labels = fcluster(
+        linkage(squareform(distance, checks=False), method="average"),
+        t=1 - threshold,
+        criterion="distance",
+    )
+
+    clusters = [stats[labels == label] for label in pd.unique(labels)]
+    clusters = sorted(
+        (members for members in clusters if len(members) > 1), key=len, reverse=True
+    )
+
+    rows = []
+    for cluster_id, members in enumerate(clusters, start=1):
+        inner = strength.loc[members, members].to_numpy()
+        np.fill_diagonal(inner, np.nan)
+        closeness = np.nanmean(inner, axis=1)
+        representative = members[np.nanargmax(closeness)]
+        order = np.argsort(-closeness, kind="stable")
+        rows.extend(
+            (cluster_id, members[i], representative, closeness[i]) for i in order
+        )
+    return pd.DataFrame(rows, columns=columns)
@@ -0,0 +1,686 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from functools import lru_cache
+import pandas as pd
+from footverse.competitions import competitions
+from footverse.derived import derive, derived_columns, helper_columns
+from footverse.errors import DataUnavailableError, FootverseError, ValidationError
+from footverse.fbref import fetch_table, parse_table
+from footverse.merge import merge_data
+from footverse.precompute import (
+    MERGED_DATASETS,
+    column_digests,
+    load_entry,
+    load_result,
+    stat_correlations,
+    stat_distributions,
+    store_result,
+    team_tables,
+)
+from footverse.schema import compile_plans
+from footverse.store import ensure_store, store_is_current
+from footverse.snapshots import (
+    content_digest,
+    install_snapshot,
+    last_attempt,
+    load_manifest,
+    load_snapshot,
+    record_attempt,
+    refresh_in_background,
+)
+
+# ! The playing time data consists of both outfield and goalkeeping data, so it is not included in the list of datasets.
+# * name: (category, json_file, standard, goalkeeping); every competition has the same tables
+FBREF_DATASETS = {
+    "Standard Data": ("stats", "columns/standard_data.json", True),
+    "Shooting Data": ("shooting", "columns/shooting_data.json"),
+    "Passing Data": ("passing", "columns/passing_data.json"),
+    "Pass Types Data": ("passing_types", "columns/pass_types_data.json"),
+    "Goal and Shot Creation Data": ("gca", "columns/goal_shot_creation_data.json"),
+    "Defensive Actions Data": ("defense", "columns/defensive_actions_data.json"),
+    "Possession Data": ("possession", "columns/possession_data.json"),
+    # "Playing Time Data": ("playingtime", "columns/playing_time_data.json"),
+    "Miscellaneous Data": ("misc", "columns/misc_data.json"),
+    "Goalkeeping Data": ("keepers", "columns/goalkeeping_data.json", True, True),
+    "Advanced Goalkeeping Data": (
+        "keepersadv",
+        "columns/advanced_goalkeeping_data.json",
+        False,
+        True,
+    ),
+}
+
+OUTFIELD_CATEGORIES = [
+    key
+    for key in FBREF_DATASETS.keys()
+    if key not in ["Goalkeeping Data", "Advanced Goalkeeping Data"]
+]
+GOALKEEPING_CATEGORIES = [
+    "Standard Data",
+    "Goalkeeping Data",
+    "Advanced Goalkeeping Data",
+]
+
+# Snapshots older than this are refreshed in the background
+DATA_TTL = 3600 * 24 * 1
+
+# Competitions of a table fetched side by side
+FETCH_WORKERS = 4
+
+# Index of every table row: its competition and its row on that competition's page
+PARTITION_LEVELS = ["Competition", "Row"]
+
+# Temporary columns numbering the rows of each side of the outfield/goalkeeping merge
+SOURCE_ROWS = {"outfield": "Outfield Row", "goalkeeping": "Goalkeeping Row"}
+
+# Background job name of SQL store rebuilds
+STORE_REFRESH = "SQL store"
+
+_combine_lock = threading.Lock()
+
+
+def dataset_options(name):
+    """Returns (category, json_file, standard, goalkeeping) for a dataset."""
+    category, json_file, *flags = FBREF_DATASETS[name]
+    standard = bool(flags[0]) if len(flags) > 0 else False
+    goalkeeping = bool(flags[1]) if len(flags) > 1 else False
+    return category, json_file, standard, goalkeeping
+
+
+@lru_cache(maxsize=None)
+def table_plans():
+    """Compiles the column plan of every table once. Raises SchemaError."""
+    return compile_plans({name: dataset_options(name)[1:] for name in FBREF_DATASETS})
+
+
+def table_plan(name):
+    """Returns the compiled column plan of a table."""
+    return table_plans()[name]
+
+
+def partition_name(name, competition):
+    """Returns the snapshot name of one competition's part of a table."""
+    return f"{name} · {competition}"
+
+
+def load_partition(name, competition, season=None):
+    """
+    Fetches and parses one competition's part of a table.
+
+    Single-league pages have no `Comp` column, so the competition's name is
+    added as the league. Rows are indexed by (Competition, Row), which lines
+    them up with the same competition's rows in the other tables.
+    """
+    category = dataset_options(name)[0]
+    raw_df = fetch_table(competition.url(category, season))
+    if not competition.leagues:
+        headers = [col[-1] for col in raw_df.columns]
+        position = headers.index("Squad") + 1 if "Squad" in headers else 0
+        raw_df.insert(position, ("Unnamed: comp_level_0", "Comp"), competition.name)
+    df = parse_table(raw_df, table_plan(name))
+    df.index = pd.MultiIndex.from_arrays(
+        [[competition.name] * len(df), df.index], names=PARTITION_LEVELS
+    )
+    return df
+
+
+def fetch_partitions(name, names=None, season=None):
+    """
+    Fetches a table for several competitions (default: all enabled) in parallel.
+
+    Every download still waits for the shared fbref budget, so running them
+    side by side only keeps one slow competition from holding up the others.
+    Returns ({competition: df}, {competition: error}).
+    """
+    registry = competitions()
+    names = list(registry) if names is None else names
+
+    def load(competition):
+        return load_partition(name, registry[competition], season)
+
+    frames, errors = {}, {}
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as executor:
+        # Each worker keeps the caller's priority, deadline and cancellation
+        futures = {
+            competition: executor.submit(copy_context().run, load, competition)
+            for competition in names
+        }
+        for competition, future in futures.items():
+            try:
+                frames[competition] = future.result()
+            except FootverseError as e:
+                errors[competition] = e
+    return frames, errors
+
+
+def combine_partitions(name):
+    """Swaps in a table made of the current parts of every enabled competition."""
+    with _combine_lock:
+        parts = [
+            snapshot["df"]
+            for competition in competitions()
+            if (snapshot := load_snapshot(partition_name(name, competition)))
+        ]
+        if not parts:
+            return None
+        # Each part was validated on its own; the table shrinks when one is disabled
+        return install_snapshot(name, pd.concat(parts), validate=False)
+
+
+def refresh_table(name, names=None):
+    """
+    Fetches, processes and validates a table for some competitions (default: all).
+
+    Each competition's part is validated and swapped in on its own, then the
+    table is rebuilt from the current parts, so a failed competition keeps
+    its last good rows. Raises a FootverseError if any competition failed.
+    """
+    frames, errors = fetch_partitions(name, names)
+    for competition, df in frames.items():
+        if install_snapshot(partition_name(name, competition), df) is None:
+            errors[competition] = ValidationError(
+                f"Downloaded {name} for {competition} failed validation; "
+                "keeping the last good version."
+            )
+
+    snapshot = combine_partitions(name)
+    if errors:
+        raise FootverseError(
+            "; ".join(f"{competition}: {e}" for competition, e in errors.items())
+        )
+    if snapshot is None:
+        raise DataUnavailableError([name])
+    return snapshot["df"]
+
+
+def get_table(name):
+    """
+    Returns the last good version of a table immediately (stale-while-revalidate).
+
+    Expired snapshots are re-fetched on a background thread; only the very first
+    load, when no snapshot exists yet, waits for fbref (and raises a
+    FootverseError if it fails). Returns None while a failed first load is
+    retried in the background.
+    """
+    snapshot = load_snapshot(name)
+    if snapshot is None:
+        # Retries after a failed first load also run in the background
+        if last_attempt(name) is not None:
+            refresh_in_background(name, lambda: refresh_table(name))
+            return None
+        # Wait for the first competition only; the others follow in the background
+        record_attempt(name)
+        first, *others = competitions()
+        df = refresh_table(name, [first])
+        if others:
+            refresh_in_background(
+                partition_name(name, "more competitions"),
+                lambda: refresh_table(name, others),
+            )
+        return df
+
+    if time.time() - snapshot["fetched_at"] > DATA_TTL:
+        refresh_in_background(name, lambda: refresh_table(name))
+
+    return snapshot["df"]
+
+
+def current_snapshots():
+    """Returns the current snapshot of every table that has one."""
+    return {
+        name: snapshot
+        for name in FBREF_DATASETS
+        if (snapshot := load_snapshot(name)) is not None
+    }
+
+
+def dataset_version(snapshots=None):
+    """
+    Returns a version key made of every table's content digest.
+
+    A refresh that fetched the same rows again keeps the version, so nothing
+    is merged or precomputed again.
+    """
+    if snapshots is None:
+        snapshots = current_snapshots()
+    return tuple((name, snapshot["digest"]) for name, snapshot in snapshots.items())
+
+
+def build_datasets(tables, version):
+    """
+    Merges outfield and goalkeeping tables once per dataset version.
+
+    When only stat tables changed since the last merge, their columns are
+    rewritten in it instead (see `update_datasets`).
+    """
+    # Stored on disk too, so a warmup job or a restarted server reuses the merge
+    frames = load_result(MERGED_DATASETS, version)
+    if frames is None:
+        previous = load_entry(MERGED_DATASETS)
+        frames = store_result(
+            MERGED_DATASETS,
+            version,
+            (previous and update_datasets(previous, tables, version))
+            or merge_datasets(tables),
+        )
+    return frames
+
+
+def row_digest(df):
+    """Returns a key of a table's rows and columns, but not of its stat values."""
+    identity = [col for col in df.columns if col in IDENTITY_COLUMNS]
+    return content_digest(df[identity]), tuple(df.columns)
+
+
+def merge_datasets(tables):
+    """Merges the outfield tables, the goalkeeping tables, and then both."""
+    outfield_df_list = [
+        df for name, df in tables.items() if not dataset_options(name)[3]
+    ]
+    goalkeeping_df_list = [
+        df for name, df in tables.items() if dataset_options(name)[3]
+    ]
+
+    outfield_data = (
+        merge_data(*outfield_df_list) if outfield_df_list else pd.DataFrame()
+    )
+    goalkeeping_data = (
+        merge_data(*goalkeeping_df_list) if goalkeeping_df_list else pd.DataFrame()
+    )
+
+    merged_data, source_rows = None, None
+    if not outfield_data.empty and not goalkeeping_data.empty:
+        # * Remember the source rows, so changed tables can be rewritten in place
+        groups = {"outfield": outfield_data, "goalkeeping": goalkeeping_data}
+        merged_data = merge_data(
+            *(
+                data.assign(**{SOURCE_ROWS[group]: range(len(data))})
+                for group, data in groups.items()
+            ),
+            on=["Player", "Team"],
+        )
+        # Row -1 marks players missing from a side
+        source_rows = {
+            group: (
+                data.index,
+                merged_data.pop(SOURCE_ROWS[group]).fillna(-1).to_numpy("int64"),
+            )
+            for group, data in groups.items()
+        }
+
+    frames = {
+        "primary_position": (
+            merged_data["Position"].str.split(",").str[0]
+            if merged_data is not None
+            else None
+        ),
+        "outfield_columns": outfield_data.columns if not outfield_data.empty else [],
+        "goalkeeping_columns": (
+            goalkeeping_data.columns if not goalkeeping_data.empty else []
+        ),
+        "merged_data": merged_data,
+        # Rate stats share the merged data's index and cache entry
+        "derived_data": (
+            derive(merged_data, derived_columns(merged_data.columns[7:]))
+            if merged_data is not None
+            else None
+        ),
+        # What an incremental merge needs to rewrite one table's columns
+        "source_rows": source_rows,
+        "row_digests": {name: row_digest(df) for name, df in tables.items()},
+        "column_digests": (
+            column_digests(merged_data) if merged_data is not None else {}
+        ),
+    }
+    return frames
+
+
+def _merged_column(tables, source_rows, column):
+    """Merges one column from every table that has it, like `merge_datasets`."""
+    merged = None
+    for group, (index, rows) in source_rows.items():
+        values = None
+        for name, df in tables.items():
+            goalkeeping = dataset_options(name)[3]
+            if goalkeeping == (group == "goalkeeping") and column in df.columns:
+                part = df[column].reindex(index)
+                values = part if values is None else values.combine_first(part)
+        if values is None:
+            continue
+        # merge_data makes every stat numeric per group, then once merged
+        values = pd.to_numeric(values, errors="coerce").reset_index(drop=True)
+        values = values.reindex(rows).reset_index(drop=True)
+        merged = values if merged is None else merged.combine_first(values)
+    return merged.convert_dtypes()
+
+
+def update_datasets(previous, tables, version):
+    """
+    Rewrites the columns of the changed stat tables in a previous merge.
+
+    Only tables that kept their rows, identity columns and column list are
+    rewritten, so every merged row still lines up with the same table rows;
+    the derived rate stats of their columns are computed again. Returns None
+    when a full merge is needed, such as when a standard table changed.
+    """
+    frames, before = previous["value"], dict(previous["version"])
+    if (
+        frames.get("source_rows") is None
+        or frames["merged_data"] is None
+        or before.keys() != tables.keys()
+    ):
+        return None
+    changed = [name for name, digest in version if before[name] != digest]
+    if any(
+        dataset_options(name)[2]
+        or frames["row_digests"].get(name) != row_digest(tables[name])
+        for name in changed
+    ):
+        return None
+
+    columns = list(
+        dict.fromkeys(
+            col
+            for name in changed
+            for col in tables[name].columns
+            if col not in IDENTITY_COLUMNS
+        )
+    )
+    merged_data = frames["merged_data"].copy()
+    for col in columns:
+        merged_data[col] = _merged_column(tables, frames["source_rows"], col)
+
+    specs = derived_columns(merged_data.columns[7:])
+    specs = {
+        name: spec
+        for name, spec in specs.items()
+        if set(helper_columns({name: spec})) & set(columns)
+    }
+    derived_data = frames["derived_data"].copy()
+    if specs:
+        derived_data[list(specs)] = derive(merged_data, specs)
+
+    return {
+        **frames,
+        "merged_data": merged_data,
+        "derived_data": derived_data,
+        "column_digests": {
+            **frames["column_digests"],
+            **column_digests(merged_data, columns),
+        },
+    }
+
+
+def _current_result(name, compute):
+    """
+    Returns a result precomputed from the current merged dataset.
+
+    Reads the stored result when it exists, so the players are only merged
+    and processed once per dataset version. Returns None while some tables
+    have no snapshot yet.
+    """
+    snapshots = current_snapshots()
+    if len(snapshots) < len(FBREF_DATASETS):
+        return None
+    version = dataset_version(snapshots)
+    result = load_result(name, version)
+    if result is not None:
+        return result
+
+    merged_data = build_datasets(
+        {name: snapshot["df"] for name, snapshot in snapshots.items()}, version
+    )["merged_data"]
+    return compute(merged_data, version) if merged_data is not None else None
+
+
+def team_data():
+    """Returns the team aggregate tables of the current data, or None."""
+    return _current_result("team aggregates", team_tables)
+
+
+def correlation_data():
+    """Returns the stat correlations of the current data, or None."""
+    return _current_result("stat correlations", stat_correlations)
+
+
+def distribution_data():
+    """Returns the stat distributions of the current data, or None."""
+    return _current_result("stat distributions", stat_distributions)
+
+
+def sync_store():
+    """
+    Loads the current merged dataset into the SQL store unless it already holds it.
+
+    Returns True when the store is current; False while some tables have no
+    snapshot yet. Raises FootverseError if the store cannot be written.
+    """
+    snapshots = current_snapshots()
+    if len(snapshots) < len(FBREF_DATASETS):
+        return False
+    version = dataset_version(snapshots)
+    if store_is_current(version):
+        return True
+
+    frames = build_datasets(
+        {name: snapshot["df"] for name, snapshot in snapshots.items()}, version
+    )
+    if frames["merged_data"] is None:
+        return False
+    ensure_store(
+        pd.concat([frames["merged_data"], frames["derived_data"]], axis=1), version
+    )
+    return True
+
+
+def manifest_version():
+    """Returns the dataset version from the snapshot manifests, without loading tables."""
+    version = []
+    for name in FBREF_DATASETS:
+        # Manifests written before digests existed need their table after all
+        manifest = load_manifest(name) or {}
+        if "digest" not in manifest:
+            manifest = load_snapshot(name)
+        if manifest is None:
+            return None
+        version.append((name, manifest["digest"]))
+    return tuple(version)
+
+
+def store_ready():
+    """
+    Returns True when the SQL store holds the current dataset.
+
+    Otherwise the store is rebuilt on a background thread, so the merge and
+    the SQLite write never run inside a page request; pages use pandas
+    until the new store is swapped in.
+    """
+    version = manifest_version()
+    if version is not None and store_is_current(version):
+        return True
+    refresh_in_background(STORE_REFRESH, sync_store)
+    return False
+
+
+# Columns describing who a player is; every projection includes them
+IDENTITY_COLUMNS = [
+    "Player",
+    "Nationality",
+    "Position",
+    "Team",
+    "League",
+    "Age",
+    "Year of Birth",
+]
+
+_projection_lock = threading.Lock()
+_projections = OrderedDict()
+MAX_PROJECTIONS = 32
+
+
+def table_columns(name):
+    """Returns a table's columns from its snapshot manifest, or from its column plan."""
+    manifest = load_manifest(name)
+    return manifest["columns"] if manifest else table_plan(name).kept
+
+
+def dataset_columns():
+    """Returns (outfield_columns, goalkeeping_columns) without loading any table."""
+    outfield_columns, goalkeeping_columns = {}, {}
+    for name in FBREF_DATASETS:
+        target = goalkeeping_columns if dataset_options(name)[3] else outfield_columns
+        target.update(dict.fromkeys(table_columns(name)))
+    return list(outfield_columns), list(goalkeeping_columns)
+
+
+def stat_columns(goalkeeping=None, derived=False):
+    """
+    Returns the stat columns in merged order (outfield first), without loading data.
+
+    Pass `goalkeeping=True/False` to only list goalkeeping or outfield stats,
+    and `derived=True` to append the derived rate stats of those columns.
+    """
+    outfield_columns, goalkeeping_columns = dataset_columns()
+    if goalkeeping is None:
+        columns = list(dict.fromkeys(outfield_columns + goalkeeping_columns))
+    else:
+        columns = goalkeeping_columns if goalkeeping else outfield_columns
+    columns = [col for col in columns if col not in IDENTITY_COLUMNS]
+    return columns + list(derived_columns(columns)) if derived else columns
+
+
+def derived_specs():
+    """Returns {derived column: (base stat, kind)} for every counting stat."""
+    return derived_columns(stat_columns())
+
+
+def source_columns(columns):
+    """Splits `columns` into the stored columns to load and the derived ones to compute."""
+    specs = derived_specs()
+    derived = {col: specs[col] for col in columns if col in specs}
+    stored = [col for col in columns if col not in specs]
+    return list(dict.fromkeys(stored + helper_columns(derived))), derived
+
+
+def column_owner(column):
+    """Returns the table (first in merge order) that owns a column, or None."""
+    for plan in table_plans().values():
+        for col in plan.columns:
+            if col.target == column and col.keep:
+                return col.owner
+    return None
+
+
+def projection_tables(columns):
+    """Returns the tables (in merge order) needed to project `columns`."""
+    owners = {column_owner(col) for col in source_columns(columns)[0]} - {None}
+
+    # Standard data holds the identity columns; goalkeeping tables need their own
+    owners.add("Standard Data")
+    if owners & {"Goalkeeping Data", "Advanced Goalkeeping Data"}:
+        owners.add("Goalkeeping Data")
+    return tuple(name for name in FBREF_DATASETS if name in owners)
+
+
+def tables_version(names):
+    """Returns a version key made of the content digests of the given tables."""
+    return dataset_version(
+        {name: snapshot for name in names if (snapshot := load_snapshot(name))}
+    )
+
+
+def project_tables(names, columns, load=None):
+    """
+    Merges the projected columns of the given tables like `build_datasets`.
+
+    Tables come from their current snapshots, or from `load(name)` when given.
+    Raises DataUnavailableError if any of them is not available, rather than
+    returning a projection without their columns.
+    """
+    projected = {"outfield": [], "goalkeeping": []}
+    missing = []
+    for name in names:
+        df = (load or get_table)(name)
+        if df is None:
+            missing.append(name)
+            continue
+        _, _, standard, goalkeeping = dataset_options(name)
+        keep = [
+            col
+            for col in df.columns
+            if col in columns or (standard and col in IDENTITY_COLUMNS)
+        ]
+        # merge_data formats columns in place, so each projection gets its own frame
+        projected["goalkeeping" if goalkeeping else "outfield"].append(df[keep].copy())
+
+    if missing:
+        raise DataUnavailableError(missing)
+    if not projected["outfield"]:
+        return None
+
+    merged_df = merge_data(*projected["outfield"])
+    if projected["goalkeeping"]:
+        goalkeeping_df = merge_data(*projected["goalkeeping"])
+        merged_df = merge_data(merged_df, goalkeeping_df, on=["Player", "Team"])
+    merged_df = merged_df.reset_index(drop=True)
+
+    merged_df["Primary Position"] = merged_df["Position"].str.split(",").str[0]
+    return merged_df
+
+
+def project_columns(names, columns, load=None):
+    """
+    Projects `columns` from the given tables, computing the derived ones.
+
+    Tables are read like `project_tables`; returns None without an outfield
+    table. Raises DataUnavailableError if a table is not available.
+    """
+    stored, derived = source_columns(columns)
+    merged_df = project_tables(names, set(stored), load)
+    if merged_df is None or not derived:
+        return merged_df
+
+    # Helper columns read by the derivation are only kept if requested
+    helpers = [col for col in stored if col not in columns]
+    return pd.concat(
+        [
+            merged_df.drop(columns=helpers + ["Primary Position"]),
+            derive(merged_df, derived),
+            merged_df["Primary Position"],
+        ],
+        axis=1,
+    )
+
+
+def load_columns(columns):
+    """
+    Returns the identity columns plus `columns`, loading only the tables that own them.
+
+    Projections are cached per dataset version and end with a `Primary Position`
+    helper column. Raises DataUnavailableError if a table owning them is not loaded.
+    """
+    columns = [col for col in dict.fromkeys(columns) if col not in IDENTITY_COLUMNS]
+    names = projection_tables(columns)
+
+    # Serve whatever is available now; expired tables refresh in the background
+    for name in names:
+        get_table(name)
+
+    key = (names, tuple(columns), tables_version(names))
+    with _projection_lock:
+        if key in _projections:
+            _projections.move_to_end(key)
+            return _projections[key].copy()
+
+    merged_df = project_columns(names, columns)
+    if merged_df is None:
+        raise DataUnavailableError(names)
+
+    with _projection_lock:
+        _projections[key] = merged_df
+        while len(_projections) > MAX_PROJECTIONS:
+            _projections.popitem(last=False)
+    return merged_df.copy()
@@ -0,0 +1,112 @@
+"""
+Rate stats derived from the counting stats of the merged dataset.
+
+Every counting stat (goals, passes, tackles...) gets a per-90 variant, a
+per-100-touches variant and its share of the team total. The derived names
+only depend on the column names, so pages can list them before any data is
+loaded; the values are computed in one vectorised pass per kind.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Appearance and result columns are not scaled
+PLAYING_TIME_COLUMNS = {
+    "Matches Played",
+    "Starts",
+    "Minutes",
+    "90s",
+    "Wins",
+    "Draws",
+    "Losses",
+}
+
+# Columns containing these are already rates, averages or differences
+RATE_MARKERS = ("p90", "%", " per ", "Average", "Avg", "-xG", "-xAG", "+/-")
+
+# Derived column name of each kind
+DERIVED_TEMPLATES = {
+    "p90": "{} p90",
+    "touch": "{} per 100 Touches",
+    "share": "{} Team Share %",
+}
+
+
+def counting_stats(columns):
+    """Returns the columns that count events, in their original order."""
+    return [
+        col
+        for col in columns
+        if col not in PLAYING_TIME_COLUMNS
+        and not any(marker in col for marker in RATE_MARKERS)
+    ]
+
+
+def derived_columns(columns):
+    """
+    Returns {derived column: (base stat, kind)} for the counting stats in `columns`.
+
+    A variant fbref already provides (such as `Shots p90`) is not derived again.
+    """
+    existing = set(columns)
+    derived = {}
+    for stat in counting_stats(columns):
+        for kind, template in DERIVED_TEMPLATES.items():
+            name = template.format(stat)
+            if name in existing or (kind == "touch" and stat == "Touches"):
+                continue
+            derived[name] = (stat, kind)
+    return derived
+
+
+def helper_columns(specs):
+    """Returns the columns `derive` reads for the given derived columns."""
+    columns = {}
+    for stat, kind in specs.values():
+        columns[stat] = None
+        if kind == "p90":
+            columns["90s"] = None
+        elif kind == "touch":
+            columns["Touches"] = None
+    return list(columns)
+
+
+def _values(df, columns):
+    return df[columns].to_numpy(dtype="float64", na_value=np.nan)
+
+
+def derive(df, specs):
+    """
+    Computes the derived columns described by `specs` (see `derived_columns`).
+
+    Per-90 stats divide by `90s`, per-touch stats by `Touches` / 100 and
+    team shares by the stat's (Team, League) total / 100. Divisions by zero
+    give NaN. Returns a frame with the same index as `df`.
+    """
+    by_kind = {}
+    for name, (stat, kind) in specs.items():
+        by_kind.setdefault(kind, []).append((name, stat))
+
+    derived = {}
+    for kind, items in by_kind.items():
+        names = [name for name, _ in items]
+        counts = _values(df, [stat for _, stat in items])
+
+        if kind == "p90":
+            denominator = _values(df, ["90s"])
+        elif kind == "touch":
+            denominator = _values(df, ["Touches"]) / 100
+        else:
+            totals = (
+                pd.DataFrame(counts, index=df.index)
+                .groupby([df["Team"], df["League"]])
+                .transform("sum")
+            )
+            denominator = totals.to_numpy() / 100
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            values = counts / denominator
+        values[~np.isfinite(values)] = np.nan
+        derived.update(zip(names, values.T))
+
+    return pd.DataFrame(derived, index=df.index, columns=list(specs))
@@ -0,0 +1,126 @@
+"""
+Histograms and quantile sketches of every stat, per position and league.
+
+Built once per dataset version so a page can draw a dozen distributions, or
+place a player in them, without going back to the player rows. Histograms of
+one position share their bin edges across leagues, so the histogram of any
+set of leagues is a sum of counts.
+"""
+
+import copy
+import warnings
+import numpy as np
+import pandas as pd
+
+HISTOGRAM_BINS = 30
+
+# The quantile sketch keeps every percentile from 0 to 100
+QUANTILE_GRID = np.linspace(0, 1, 101)
+
+
+class StatDistributions:
+    """Histogram counts and quantiles of every stat for each (position, league)."""
+
+    def __init__(self, merged_df, bins=HISTOGRAM_BINS):
+        self.stats = [col for col in merged_df.columns[7:] if col != "Primary Position"]
+        self.index = {stat: i for i, stat in enumerate(self.stats)}
+        self.bins = bins
+        values = merged_df[self.stats].to_numpy(dtype="float64", na_value=np.nan)
+        primary_position = merged_df["Position"].str.split(",").str[0].to_numpy()
+        leagues = merged_df["League"].to_numpy()
+
+        # edges[position]: stats x (bins + 1); counts[(position, league)]: stats x bins;
+        # quantiles[(position, league)]: grid x stats, with league None for all
+        self.edges, self.counts, self.quantiles = {}, {}, {}
+        with warnings.catch_warnings():
+            # Stats no player of a group has (goalkeeping stats of outfielders)
+            warnings.simplefilter("ignore", RuntimeWarning)
+            for position, rows in (
+                pd.Series(primary_position).groupby(primary_position).indices.items()
+            ):
+                self._add_position(position, values[rows], leagues[rows])
+
+    def _add_position(self, position, values, leagues):
+        low, high = np.nanmin(values, axis=0), np.nanmax(values, axis=0)
+        width = np.where(high > low, (high - low) / self.bins, 1.0)
+        self.edges[position] = low[:, None] + width[:, None] * np.arange(self.bins + 1)
+
+        # One flat bin number per value, so each league is a single bincount
+        present = ~np.isnan(values)
+        bin_numbers = np.clip(
+            np.floor((np.nan_to_num(values) - np.nan_to_num(low)) / width),
+            0,
+            self.bins - 1,
+        ).astype(np.intp)
+        flat = bin_numbers + np.arange(len(self.stats)) * self.bins
+
+        self.quantiles[(position, None)] = np.nanquantile(values, QUANTILE_GRID, axis=0)
+        for league, rows in pd.Series(leagues).groupby(leagues).indices.items():
+            self.counts[(position, league)] = np.bincount(
+                flat[rows][present[rows]], minlength=len(self.stats) * self.bins
+            ).reshape(len(self.stats), self.bins)
+            self.quantiles[(position, league)] = np.nanquantile(
+                values[rows], QUANTILE_GRID, axis=0
+            )
+
+    def updated(self, merged_df, stats):
+        """
+        Returns a copy with the histograms and quantiles of some stats rebuilt.
+
+        The players and their groups must be the same as when built.
+        """
+        partial = StatDistributions(
+            merged_df[list(merged_df.columns[:7]) + list(stats)], self.bins
+        )
+        columns = [self.index[stat] for stat in stats]
+        updated = copy.copy(self)
+        updated.edges, updated.counts, updated.quantiles = {}, {}, {}
+        for position, edges in self.edges.items():
+            updated.edges[position] = edges.copy()
+            updated.edges[position][columns] = partial.edges[position]
+        for key, counts in self.counts.items():
+            updated.counts[key] = counts.copy()
+            updated.counts[key][columns] = partial.counts[key]
+        for key, quantiles in self.quantiles.items():
+            updated.quantiles[key] = quantiles.copy()
+            updated.quantiles[key][:, columns] = partial.quantiles[key]
+        return updated
+
+    def positions(self):
+        return sorted(self.edges)
+
+    def leagues(self, position):
+        return sorted(league for pos, league in self.counts if pos == position)
+
+    def histogram(self, stat, position, leagues=None):
+        """Returns the (counts, bin edges) of a stat within a position and some leagues."""
+        column = self.index[stat]
+        leagues = leagues or self.leagues(position)
+        counts = sum(
+            (
+                self.counts[(position, league)][column]
+                for league in leagues
+                if (position, league) in self.counts
+            ),
+            np.zeros(self.bins, dtype=np.intp),
+        )
+        return counts, self.edges[position][column]
+
+    def percentile(self, stat, position, value, league=None):
+        """
+        Returns the percentile (0-100) of a value within a position (and league).
+
+        Interpolated from the quantile sketch; a value shared by many players
+        (such as 0 goals) gets the middle of their percentiles. NaN if the
+        value or the stat is missing.
+        """
+        quantiles = self.quantiles.get((position, league))
+        if quantiles is None or value is None or np.isnan(value):
+            return np.nan
+        column = quantiles[:, self.index[stat]]
+        if np.isnan(column).any():
+            return np.nan
+        grid = QUANTILE_GRID * 100
+        lowest = np.interp(value, column, grid)
+        highest = np.interp(-value, -column[::-1], grid[::-1])
+        return float((lowest + highest) / 2)
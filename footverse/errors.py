@@ -0,0 +1,60 @@
+class FootverseError(Exception):
+    """Base class for errors raised by the footverse package."""
+
+
+class SchemaError(FootverseError):
+    """A column schema or config file is missing, empty or invalid."""
+
+    def __init__(self, path, reason):
+        super().__init__(f"JSON file '{path}' {reason}.")
+        self.path = path
+        self.reason = reason
+
+
+class FetchError(FootverseError):
+    """An upstream request failed."""
+
+    def __init__(self, message, url=None, status=None):
+        super().__init__(message)
+        self.url = url
+        self.status = status
+
+
+class RateLimitError(FetchError):
+    """An upstream kept answering 429, or the request budget was not granted in time."""
+
+
+class ConfigurationError(FootverseError):
+    """A required setting (such as an API key) is missing."""
+
+
+class DataUnavailableError(FootverseError):
+    """A table has no snapshot yet and could not be loaded."""
+
+    def __init__(self, names):
+        names = list(names)
+        super().__init__(f"Data not available for: {', '.join(names)}.")
+        self.names = names
+
+
+class ValidationError(FootverseError):
+    """A freshly downloaded table looks truncated or lost most of its schema."""
+
+
+class SchemaDriftError(ValidationError):
+    """A downloaded table no longer matches its compiled column plan."""
+
+    def __init__(self, name, missing=(), unexpected=()):
+        self.name = name
+        self.missing = list(missing)
+        self.unexpected = list(unexpected)
+        details = []
+        if self.missing:
+            details.append(f"missing {', '.join(self.missing)}")
+        if self.unexpected:
+            details.append(f"unexpected {', '.join(self.unexpected)}")
+        super().__init__(f"{name} changed upstream ({'; '.join(details)}).")
+
+
+class FilterError(FootverseError):
+    """A filter expression could not be parsed or names an unknown column."""
@@ -0,0 +1,100 @@
+import json
+import os
+import random
+import time
+from functools import lru_cache
+from io import StringIO
+import pandas as pd
+import requests
+from footverse.errors import FetchError, RateLimitError, SchemaError
+from footverse.scheduler import (
+    acquire,
+    current_request_context,
+    promote,
+    request_flight,
+)
+from footverse.singleflight import single_flight
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+}
+
+COLUMN_MAPPING_FILE = "columns/column_mapping.json"
+STANDARD_SCHEMA_FILE = "columns/standard_data.json"
+GOALKEEPING_SCHEMA_FILE = "columns/goalkeeping_data.json"
+
+
+@lru_cache(maxsize=None)
+def read_json(file_path):
+    """Reads a JSON config or schema file once. Raises SchemaError."""
+    if not os.path.exists(file_path):
+        raise SchemaError(file_path, "not found")
+    if os.path.getsize(file_path) == 0:
+        raise SchemaError(file_path, "is empty")
+    try:
+        with open(file_path, "r") as f:
+            return json.load(f)
+    except json.JSONDecodeError:
+        raise SchemaError(file_path, "could not be parsed")
+
+
+def download_table(url, max_retries=5, base_delay=2, priority=None):
+    """
+    Downloads and parses the first table of a page, retrying on 429 errors.
+
+    Every attempt waits for a slot in the shared fbref budget (max 10 requests
+    per 60 seconds). Raises FetchError or RateLimitError.
+    """
+    # Promotions during a backoff apply to the next attempt
+    with request_flight("fbref", url, priority):
+        # Exponential backoff with jitter for retries
+        for attempt in range(max_retries):
+            if not acquire("fbref", priority=priority, key=url):
+                raise RateLimitError("Request cancelled or timed out.", url=url)
+
+            try:
+                response = requests.get(url, headers=HEADERS)
+            except requests.RequestException as e:
+                raise FetchError(str(e), url=url)
+
+            if response.status_code == 200:  # Successful request
+                return pd.read_html(StringIO(response.text))[0]
+
+            elif response.status_code == 429:  # Too Many Requests
+                wait_time = base_delay * (2**attempt) + random.uniform(0, 1)
+                time.sleep(wait_time)
+
+            else:  # Other errors
+                raise FetchError(
+                    f"Failed to fetch data (Error {response.status_code}): {response.reason}",
+                    url=url,
+                    status=response.status_code,
+                )
+
+        raise RateLimitError("Maximum retries reached. Try again later.", url=url)
+
+
+def fetch_table(url, max_retries=5, base_delay=2, priority=None):
+    """Downloads a table, coalescing concurrent requests for the same URL."""
+    if priority is None:
+        priority = current_request_context()[0]
+
+    # A user joining a queued background fetch lifts it to their priority
+    promote("fbref", url, priority)
+
+    df = single_flight(
+        f"fbref:{url}", download_table, url, max_retries, base_delay, priority
+    )
+
+    # Every caller gets its own copy of the shared download
+    return df.copy()
+
+
+def parse_table(df, plan):
+    """Flattens the headers of a raw fbref table and applies its compiled column plan."""
+    return plan.apply(df)
+
+
+def load_table(url, plan):
+    """Fetches and parses an fbref table. Raises a FootverseError on failure."""
+    return parse_table(fetch_table(url), plan)
@@ -0,0 +1,276 @@
+"""
+Filter expressions such as `Age < 23 and "xG p90" > 0.35 and League in ("Serie A", "Ligue 1")`.
+
+An expression is parsed once into a tree of comparisons joined by `and`, `or`
+and `not`, checked against the dataset's columns and compiled into a single
+function over the column arrays. Column names with spaces or symbols are
+written in double quotes on the left of a comparison; values on the right are
+numbers or quoted strings.
+"""
+
+import difflib
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+from footverse.errors import FilterError
+
+TOKEN = re.compile(
+    r"""\s*(?:
+        (?P<number>-?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)
+        |(?P<string>"[^"]*"|'[^']*')
+        |(?P<op><=|>=|==|!=|<|>|=|\(|\)|,)
+        |(?P<name>[A-Za-z_][\w.]*)
+    )""",
+    re.VERBOSE,
+)
+
+KEYWORDS = {"and", "or", "not", "in"}
+
+COMPARISONS = {
+    "<": np.less,
+    "<=": np.less_equal,
+    ">": np.greater,
+    ">=": np.greater_equal,
+    "=": np.equal,
+    "==": np.equal,
+    "!=": np.not_equal,
+}
+
+_lock = threading.Lock()
+_compiled = OrderedDict()
+MAX_COMPILED = 64
+
+
+def tokenize(text):
+    """Splits an expression into (kind, value, position) tokens."""
+    tokens, position = [], 0
+    text = text.rstrip()
+    while position < len(text):
+        match = TOKEN.match(text, position)
+        if match is None or match.end() == position:
+            raise FilterError(f"Unexpected character at position {position + 1}.")
+        kind = match.lastgroup
+        value, start = match.group(kind), match.start(kind)
+        if kind == "name" and value.lower() in KEYWORDS:
+            kind, value = "keyword", value.lower()
+        elif kind == "string":
+            value = value[1:-1]
+        elif kind == "number":
+            value = float(value)
+        tokens.append((kind, value, start + 1))
+        position = match.end()
+    return tokens
+
+
+class _Parser:
+    """Recursive-descent parser producing nested tuples."""
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.index = 0
+
+    def peek(self, kind=None, value=None):
+        if self.index >= len(self.tokens):
+            return None
+        token = self.tokens[self.index]
+        if (kind is None or token[0] == kind) and (value is None or token[1] == value):
+            return token
+        return None
+
+    def fail(self, expected):
+        found = self.tokens[self.index] if self.index < len(self.tokens) else None
+        where = f"at position {found[2]}" if found else "at the end"
+        raise FilterError(f"Expected {expected} {where}.")
+
+    def take(self, kind, value=None, expected=None):
+        token = self.peek(kind, value)
+        if token is None:
+            self.fail(expected or value or kind)
+        self.index += 1
+        return token
+
+    def parse(self):
+        node = self.disjunction()
+        if self.index < len(self.tokens):
+            raise FilterError(
+                f"Unexpected '{self.tokens[self.index][1]}' at position {self.tokens[self.index][2]}."
+            )
+        return node
+
+    def disjunction(self):
+        node = self.conjunction()
+        while self.peek("keyword", "or"):
+            self.index += 1
+            node = ("or", node, self.conjunction())
+        return node
+
+    def conjunction(self):
+        node = self.negation()
+        while self.peek("keyword", "and"):
+            self.index += 1
+            node = ("and", node, self.negation())
+        return node
+
+    def negation(self):
+        if self.peek("keyword", "not"):
+            self.index += 1
+            return ("not", self.negation())
+        if self.peek("op", "("):
+            self.index += 1
+            node = self.disjunction()
+            self.take("op", ")", expected="')'")
+            return node
+        return self.comparison()
+
+    def comparison(self):
+        column = self.peek("name") or self.peek("string")
+        if column is None:
+            self.fail("a column name")
+        self.index += 1
+
+        negate = bool(self.peek("keyword", "not"))
+        if negate:
+            self.index += 1
+        if self.peek("keyword", "in"):
+            self.index += 1
+            self.take("op", "(", expected="'(' after 'in'")
+            values = [self.value()]
+            while self.peek("op", ","):
+                self.index += 1
+                values.append(self.value())
+            self.take("op", ")", expected="')'")
+            return ("in", column[1], values, negate)
+        if negate:
+            self.take("keyword", "in", expected="'in' after 'not'")
+
+        operator = self.take("op", expected="a comparison operator")
+        if operator[1] not in COMPARISONS:
+            raise FilterError(
+                f"Expected a comparison operator at position {operator[2]}."
+            )
+        value = self.value()
+        if isinstance(value, str) and operator[1] not in ("=", "==", "!="):
+            raise FilterError(f"'{column[1]} {operator[1]}' needs a number.")
+        return ("compare", column[1], operator[1], value)
+
+    def value(self):
+        token = self.peek("number") or self.peek("string")
+        if token is None:
+            self.fail("a number or a quoted string")
+        self.index += 1
+        return token[1]
+
+
+def _comparisons(node):
+    """Yields (column, values) for every comparison of an expression tree."""
+    if node[0] in ("and", "or"):
+        yield from _comparisons(node[1])
+        yield from _comparisons(node[2])
+    elif node[0] == "not":
+        yield from _comparisons(node[1])
+    elif node[0] == "in":
+        yield node[1], node[2]
+    else:
+        yield node[1], [node[3]]
+
+
+def _build(node):
+    """Turns an expression tree into a function of {column: array}."""
+    kind = node[0]
+    if kind in ("and", "or"):
+        left, right = _build(node[1]), _build(node[2])
+        combine = np.logical_and if kind == "and" else np.logical_or
+        return lambda arrays: combine(left(arrays), right(arrays))
+    if kind == "not":
+        inner = _build(node[1])
+        return lambda arrays: np.logical_not(inner(arrays))
+    if kind == "in":
+        _, column, values, negate = node
+        values = np.array(values, dtype=object)
+        return lambda arrays: np.isin(arrays[column], values) != negate
+
+    _, column, operator, value = node
+    compare = COMPARISONS[operator]
+    # Missing values never match a numeric comparison
+    if isinstance(value, str):
+        return lambda arrays: compare(arrays[column], value)
+    return lambda arrays: compare(arrays[column], value) & ~np.isnan(arrays[column])
+
+
+@dataclass(frozen=True)
+class CompiledFilter:
+    """A parsed filter expression, ready to be evaluated on DataFrames."""
+
+    text: str
+    columns: tuple
+    numeric: frozenset
+    evaluate: object
+
+    def mask(self, df):
+        """Returns a boolean Series selecting the rows of `df` that match."""
+        arrays = {}
+        for column in self.columns:
+            series = df[column]
+            if column in self.numeric:
+                arrays[column] = pd.to_numeric(series, errors="coerce").to_numpy(
+                    dtype=float, na_value=np.nan
+                )
+            else:
+                arrays[column] = series.to_numpy(dtype=object, na_value=None)
+        return pd.Series(self.evaluate(arrays), index=df.index, dtype=bool)
+
+
+def compile_filter(text, columns):
+    """
+    Parses an expression and checks its column names against `columns`.
+
+    Raises FilterError with the position of a syntax error, or with close
+    matches for an unknown column.
+    """
+    tree = _Parser(tokenize(text)).parse()
+
+    kinds = {}
+    for column, values in _comparisons(tree):
+        kinds.setdefault(column, set()).update(
+            "text" if isinstance(value, str) else "number" for value in values
+        )
+
+    known = set(columns)
+    for column, column_kinds in kinds.items():
+        if column not in known:
+            suggestions = difflib.get_close_matches(column, columns, n=3)
+            hint = (
+                f" Did you mean {', '.join(map(repr, suggestions))}?"
+                if suggestions
+                else ""
+            )
+            raise FilterError(f"Unknown column '{column}'.{hint}")
+        if len(column_kinds) > 1:
+            raise FilterError(f"'{column}' is compared with both numbers and text.")
+
+    return CompiledFilter(
+        text=text,
+        columns=tuple(kinds),
+        numeric=frozenset(col for col, kind in kinds.items() if kind == {"number"}),
+        evaluate=_build(tree),
+    )
+
+
+def cached_filter(text, columns, version):
+    """Returns the compiled expression, once per dataset version and column set."""
+    # Validation depends on the columns, so callers with other columns compile their own
+    key = (text.strip(), version, tuple(columns))
+    with _lock:
+        if key in _compiled:
+            _compiled.move_to_end(key)
+            return _compiled[key]
+
+    compiled = compile_filter(key[0], columns)
+    with _lock:
+        _compiled[key] = compiled
+        while len(_compiled) > MAX_COMPILED:
+            _compiled.popitem(last=False)
+    return compiled
@@ -0,0 +1,216 @@
+# https://www.football-data.org/
+import os
+import time
+from datetime import date
+from urllib.parse import parse_qsl, urlencode, urlsplit
+import requests
+from footverse.cache import cache_get, cache_set, is_fresh, record
+from footverse.errors import (
+    ConfigurationError,
+    FetchError,
+    FootverseError,
+    RateLimitError,
+)
+from footverse.scheduler import (
+    acquire,
+    current_request_context,
+    promote,
+    request_flight,
+)
+from footverse.singleflight import single_flight
+
+API_BASE_URL = "https://api.football-data.org/v4"
+API_KEY_SECRET = "API_FOOTBALL_DATA_KEY"
+SECRETS_FILE = ".streamlit/secrets.toml"
+
+# Cache namespace for football-data.org responses
+CACHE_NAMESPACE = "football-data"
+
+# * TTLs (in seconds) by data state
+TTL_LIVE = 30  # In-play matches
+TTL_CURRENT = 60 * 15  # Current matchday (scheduled or partially played)
+TTL_METADATA = 3600 * 6  # Competition metadata (current matchday changes weekly)
+TTL_ARCHIVE = 3600 * 24 * 30  # Past seasons, past matchdays and finished fixtures
+
+LIVE_STATUSES = {"IN_PLAY", "PAUSED", "LIVE"}
+FINAL_STATUSES = {"FINISHED", "AWARDED", "CANCELLED"}
+
+
+def load_api_key():
+    """
+    Returns the API key from the environment, or from `.streamlit/secrets.toml`.
+
+    Lets scripts and worker processes call the API without Streamlit.
+    """
+    api_key = os.environ.get(API_KEY_SECRET)
+    if api_key or not os.path.exists(SECRETS_FILE):
+        return api_key
+    try:
+        import tomllib  # Python 3.11+
+    except ImportError:
+        return None
+    with open(SECRETS_FILE, "rb") as f:
+        return tomllib.load(f).get(API_KEY_SECRET)
+
+
+def split_endpoint(endpoint, params=None):
+    """Splits an endpoint into its path and merged query parameters."""
+    parts = urlsplit(endpoint)
+    query = dict(parse_qsl(parts.query))
+    query.update({k: str(v) for k, v in (params or {}).items()})
+    return parts.path, query
+
+
+def cache_key(endpoint, params=None):
+    """Builds a canonical cache key so equivalent requests share an entry."""
+    path, query = split_endpoint(endpoint, params)
+    return f"{path}?{urlencode(sorted(query.items()))}" if query else path
+
+
+def season_finished(season):
+    """Checks whether a football-data.org season object has ended."""
+    end_date = (season or {}).get("endDate")
+    return bool(end_date) and end_date < date.today().isoformat()
+
+
+def endpoint_ttl(endpoint, params, payload):
+    """Classifies a response by endpoint and data state and returns its TTL."""
+    path, query = split_endpoint(endpoint, params)
+
+    # Fixtures: seconds while in play, long once every match is settled
+    if path.endswith("/matches"):
+        statuses = {match.get("status") for match in payload.get("matches", [])}
+        if statuses & LIVE_STATUSES:
+            return TTL_LIVE
+        if statuses and statuses <= FINAL_STATUSES:
+            return TTL_ARCHIVE
+        return TTL_CURRENT
+
+    # Standings: frozen for past seasons and past matchdays
+    if path.endswith("/standings"):
+        season = payload.get("season", {})
+        if season_finished(season):
+            return TTL_ARCHIVE
+        matchday = query.get("matchday")
+        current_matchday = season.get("currentMatchday")
+        if matchday and current_matchday and int(matchday) < int(current_matchday):
+            return TTL_ARCHIVE
+        return TTL_CURRENT
+
+    # Competition metadata for an explicitly requested past season
+    if "season" in query and season_finished(payload.get("currentSeason")):
+        return TTL_ARCHIVE
+
+    return TTL_METADATA
+
+
+def fetch_endpoint(
+    endpoint, params=None, api_key=None, max_retries=3, base_delay=2, priority=None
+):
+    """Makes a rate-limited API request with retries. Raises a FetchError on failure."""
+    if not api_key:
+        raise ConfigurationError(
+            f"API key not configured. Add `{API_KEY_SECRET}` to the secrets."
+        )
+    if params is None:
+        params = {}
+
+    # Promotions during a backoff apply to the next attempt
+    with request_flight("football-data", endpoint, priority):
+        # Exponential backoff for retries
+        for attempt in range(max_retries):
+            # Wait for a slot in the shared API key budget (10 requests per minute)
+            if not acquire("football-data", priority=priority, key=endpoint):
+                raise RateLimitError(
+                    "Request cancelled or timed out. Try again later.", url=endpoint
+                )
+            try:
+                response = requests.get(
+                    f"{API_BASE_URL}{endpoint}",
+                    headers={"X-Auth-Token": api_key},
+                    params=params,
+                )
+            except requests.RequestException as e:
+                raise FetchError(str(e), url=endpoint)
+
+            if response.status_code == 200:
+                return response.json()
+
+            elif response.status_code == 429:  # Too many requests
+                wait_time = base_delay * (2**attempt)
+                time.sleep(wait_time)
+
+            else:
+                raise FetchError(
+                    f"Error {response.status_code}: {response.reason}",
+                    url=endpoint,
+                    status=response.status_code,
+                )
+
+        raise RateLimitError("Maximum retries reached. Try again later.", url=endpoint)
+
+
+def refresh_endpoint(endpoint, params, api_key, max_retries, base_delay, priority=None):
+    """Fetches an endpoint and stores the response in the cache."""
+    key = cache_key(endpoint, params)
+
+    # Another caller may have refreshed the entry while this one was queued
+    entry = cache_get(CACHE_NAMESPACE, key)
+    if is_fresh(entry):
+        return entry["payload"]
+
+    payload = fetch_endpoint(
+        endpoint, params, api_key, max_retries, base_delay, priority
+    )
+    cache_set(CACHE_NAMESPACE, key, payload, endpoint_ttl(endpoint, params, payload))
+    return payload
+
+
+def cached_request(
+    endpoint, params=None, api_key=None, max_retries=3, base_delay=2, priority=None
+):
+    """
+    Returns an API response, served from the persistent cache while fresh.
+
+    Falls back to the last known response if the refresh fails, and raises a
+    FootverseError only when there is nothing cached.
+    """
+    if priority is None:
+        priority = current_request_context()[0]
+
+    key = cache_key(endpoint, params)
+    entry = cache_get(CACHE_NAMESPACE, key)
+
+    if is_fresh(entry):
+        record("hits")
+        return entry["payload"]
+
+    record("misses")
+
+    # A user joining a queued background request lifts it to their priority
+    promote("football-data", endpoint, priority)
+
+    try:
+        # Concurrent misses for the same endpoint share a single upstream request
+        return single_flight(
+            f"{CACHE_NAMESPACE}:{key}",
+            refresh_endpoint,
+            endpoint,
+            params,
+            api_key,
+            max_retries,
+            base_delay,
+            priority,
+        )
+    except FootverseError:
+        # Serve the last known response rather than failing the page
+        if entry is not None:
+            record("stale")
+            return entry["payload"]
+        raise
+
+
+def response_version(endpoint, params=None):
+    """Returns when the cached response for an endpoint was stored, or None."""
+    entry = cache_get(CACHE_NAMESPACE, cache_key(endpoint, params))
+    return entry["stored_at"] if entry else None
@@ -0,0 +1,253 @@
+"""
+Previous seasons of the fbref tables, partitioned by season and category.
+
+Each (season, table) is one file under `data/cache/history/<season>/`, next to
+a per-season manifest of the stored tables and their columns. Appending a
+season only writes that season's partitions; a stored partition is never
+rewritten unless asked to. Queries read only the seasons and tables that own
+the requested columns, filter each season on its own and keep the matching
+rows, so memory holds one season's projection at a time.
+"""
+
+import json
+import os
+import pickle
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+import pandas as pd
+from footverse.cache import cache_path
+from footverse.competitions import competitions
+from footverse.datasets import (
+    FBREF_DATASETS,
+    IDENTITY_COLUMNS,
+    fetch_partitions,
+    project_columns,
+    projection_tables,
+)
+from footverse.errors import DataUnavailableError, FootverseError
+
+HISTORY_NAMESPACE = "history"
+
+SEASON_PATTERN = re.compile(r"^(\d{4})-(\d{4})$")
+
+_lock = threading.Lock()
+_partitions = OrderedDict()
+MAX_PARTITIONS = 32
+
+
+def _slug(name):
+    return re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_")
+
+
+def _season_dir():
+    path = cache_path(HISTORY_NAMESPACE)
+    if path is None:
+        raise FootverseError("The history store needs a cache directory.")
+    return path
+
+
+def _partition_path(season, name):
+    return os.path.join(_season_dir(), season, f"{_slug(name)}.pkl")
+
+
+def _manifest_path(season):
+    return os.path.join(_season_dir(), season, "manifest.json")
+
+
+def _atomic_write(path, data, mode="wb"):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, mode) as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def check_season(season):
+    """Returns a season like '2022-2023', or raises FootverseError."""
+    match = SEASON_PATTERN.match(str(season))
+    if not match or int(match.group(2)) != int(match.group(1)) + 1:
+        raise FootverseError(f"Invalid season '{season}', expected e.g. '2022-2023'.")
+    return season
+
+
+def season_manifest(season):
+    """
+    Returns {table: {'rows', 'columns', 'missing', 'fetched_at'}} of a stored season.
+
+    `missing` maps the competitions a table could not be fetched for to why.
+    """
+    path = _manifest_path(check_season(season))
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def stored_seasons():
+    """Returns the stored seasons, oldest first."""
+    try:
+        root = _season_dir()
+    except FootverseError:
+        return []
+    if not os.path.isdir(root):
+        return []
+    return sorted(
+        entry
+        for entry in os.listdir(root)
+        if SEASON_PATTERN.match(entry) and season_manifest(entry)
+    )
+
+
+def write_partition(season, name, df, missing=None):
+    """
+    Stores one table of a season and records it in the season's manifest.
+
+    `missing` maps the competitions left out of the table to why.
+    """
+    check_season(season)
+    _atomic_write(_partition_path(season, name), pickle.dumps(df))
+
+    manifest = season_manifest(season)
+    manifest[name] = {
+        "rows": len(df),
+        "columns": list(df.columns),
+        "missing": {comp: str(error) for comp, error in (missing or {}).items()},
+        "fetched_at": time.time(),
+    }
+    _atomic_write(_manifest_path(season), json.dumps(manifest, indent=2), "w")
+    with _lock:
+        _partitions.pop((season, name), None)
+
+
+def load_partition(season, name):
+    """Returns one stored table of a season, or None if it was never loaded."""
+    key = (season, name)
+    with _lock:
+        if key in _partitions:
+            _partitions.move_to_end(key)
+            return _partitions[key]
+
+    path = _partition_path(season, name)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "rb") as f:
+            df = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+
+    with _lock:
+        _partitions[key] = df
+        while len(_partitions) > MAX_PARTITIONS:
+            _partitions.popitem(last=False)
+    return df
+
+
+def append_season(season, names=None, force=False):
+    """
+    Fetches the tables of a past season that are not stored yet.
+
+    A table is stored with the competitions that could be fetched (an old
+    season of a single league may not exist, or lack some columns), and the
+    others are recorded in the manifest as missing. Stored tables are kept
+    unless `force=True`, but their missing competitions are fetched again
+    and added. Returns {table: {competition: error}} of the tables written,
+    so callers can report what is still missing; a table without any
+    competition raises FootverseError after the others have been stored.
+    """
+    check_season(season)
+    stored = season_manifest(season)
+    registry = competitions()
+    written, failed = {}, []
+    for name in names or FBREF_DATASETS:
+        entry = None if force else stored.get(name)
+        if entry is not None and not entry.get("missing"):
+            continue
+        # Every competition's page of the table (or the missing ones), side by side
+        retry = (
+            None if entry is None else [c for c in entry["missing"] if c in registry]
+        )
+        if retry == []:
+            # Its missing competitions were taken out of the registry
+            continue
+        frames, errors = fetch_partitions(name, retry, season=season)
+        if not frames:
+            details = "; ".join(f"{comp}: {e}" for comp, e in errors.items())
+            failed.append(f"{name} ({details or 'no competition'})")
+            continue
+
+        if entry is not None:
+            # Keep the competitions stored before
+            frames = {"stored": load_partition(season, name), **frames}
+        write_partition(season, name, pd.concat(frames.values()), errors)
+        written[name] = errors
+
+    if failed:
+        raise FootverseError(f"{season}: failed {', '.join(failed)}")
+    return written
+
+
+def filter_rows(df, filters):
+    """
+    Keeps the rows matching {column: condition}, like the SQL store's filters.
+
+    A list or set matches any of its values, a (low, high) tuple is an
+    inclusive range (either bound may be None) and any other value must match
+    exactly. Empty conditions are ignored.
+    """
+    mask = pd.Series(True, index=df.index)
+    for column, condition in (filters or {}).items():
+        if isinstance(condition, (list, set)):
+            if condition:
+                mask &= df[column].isin(condition)
+        elif isinstance(condition, tuple):
+            low, high = condition
+            if low is not None:
+                mask &= df[column] >= low
+            if high is not None:
+                mask &= df[column] <= high
+        elif condition is not None:
+            mask &= df[column] == condition
+    return df[mask.fillna(False)]
+
+
+def query_history(columns, seasons=None, filters=None):
+    """
+    Returns the identity columns plus `columns` of every stored season.
+
+    Rows start with a `Season` column. Only the tables owning `columns` (and
+    the filtered columns) are read, one season at a time, and only matching
+    rows are kept; seasons missing one of those tables are skipped.
+    """
+    needed = [
+        col
+        for col in dict.fromkeys([*columns, *(filters or {})])
+        if col not in IDENTITY_COLUMNS and col != "Primary Position"
+    ]
+    names = projection_tables(needed)
+    frames = []
+    for season in seasons or stored_seasons():
+        if not set(names) <= set(season_manifest(season)):
+            continue
+        try:
+            df = project_columns(
+                names, needed, load=lambda name: load_partition(season, name)
+            )
+        except DataUnavailableError:
+            # A partition listed in the manifest could not be read
+            continue
+        if df is None:
+            continue
+        df = filter_rows(df, filters)
+        df.insert(0, "Season", season)
+        frames.append(df)
+
+    if not frames:
+        return pd.DataFrame(columns=["Season", *IDENTITY_COLUMNS, *needed])
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,394 @@
+"""
+Per-match player logs and the rolling form computed from them.
+
+Logs are appended to `data/cache/matchlogs/<YYYY-MM>/`, one file per appended
+batch and month, and listed in a manifest; stored parts are never rewritten,
+and a (Player, Team, Date) already stored keeps its first row. Everything that
+reads the logs streams them one part at a time, so memory never holds more
+than a part plus the form state.
+
+`FormState` keeps, for every (Player, Team), the stats of their last few
+matches and exponentially time-decayed sums of every counting stat. Both are
+updated part by part as matches arrive, so the form tables and Performance
+Index scores never go back over the stored logs.
+"""
+
+import fcntl
+import json
+import os
+import pickle
+import tempfile
+import threading
+from contextlib import contextmanager
+import pandas as pd
+from footverse.cache import cache_path
+from footverse.derived import counting_stats, derive
+from footverse.errors import FootverseError, ValidationError
+from footverse.fbref import COLUMN_MAPPING_FILE, read_json
+from footverse.scoring import percentile_scale, weighted_scores
+
+MATCHLOG_NAMESPACE = "matchlogs"
+
+LOG_KEYS = ["Player", "Team", "Date"]
+PLAYER_KEYS = ["Player", "Team"]
+
+# Text columns of a log row; every other column is a stat of that match
+LOG_TEXT_COLUMNS = ("Player", "Team", "League", "Position", "Opponent", "Venue")
+
+# fbref match-log headers the season column mapping does not cover
+MATCHLOG_RENAME = {
+    "Min": "Minutes",
+    "Pos": "Position",
+    "Performance Sh": "Shots",
+    "Performance SoT": "Shots on Target",
+    "Performance Touches": "Touches",
+    "Performance Tkl": "Tackles",
+    "Performance Blocks": "Blocks",
+    "Passes Cmp": "Passes Completed",
+    "Passes Att": "Passes Attempted",
+    "Passes Cmp%": "Pass Completion %",
+    "Passes PrgP": "Progressive Passes",
+    "SCA GCA": "GCA",
+}
+
+# Matches in the rolling window, and days for a match's weight to halve
+FORM_WINDOW = 5
+HALF_LIFE_DAYS = 28
+
+_lock = threading.Lock()
+
+
+def _log_dir(*parts):
+    path = cache_path(MATCHLOG_NAMESPACE, *parts)
+    if path is None:
+        raise FootverseError("The match log store needs a cache directory.")
+    return path
+
+
+def _atomic_write(path, data, mode="wb"):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, mode) as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def parse_match_logs(raw_df, player):
+    """
+    Turns a raw fbref match-log table of one player into log rows.
+
+    Headers are renamed with the season column mapping; matches the player
+    did not play in, repeated header rows and the totals row are dropped.
+    """
+    mapping = {**read_json(COLUMN_MAPPING_FILE), **MATCHLOG_RENAME}
+    headers = [" ".join(col).strip() for col in raw_df.columns]
+    headers = [col.split()[-1] if "level_0" in col else col for col in headers]
+    df = raw_df.set_axis([mapping.get(col, col) for col in headers], axis=1)
+    df = df.loc[:, ~df.columns.duplicated()]
+    df = df.drop(columns=["Report", "Day", "Round", "Result", "Start"], errors="ignore")
+    df.insert(0, "Player", player)
+    return clean_logs(df)
+
+
+def clean_logs(df):
+    """
+    Validates log rows: one row per (Player, Team, Date) with played minutes.
+
+    Dates are parsed, stats converted to numbers and rows without a date or
+    minutes dropped. Raises ValidationError if a key column is missing.
+    """
+    missing = [col for col in LOG_KEYS + ["Minutes"] if col not in df.columns]
+    if missing:
+        raise ValidationError(f"Match logs are missing {', '.join(missing)}.")
+
+    df = df.copy()
+    df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
+    stats = [col for col in df.columns if col not in LOG_TEXT_COLUMNS + ("Date",)]
+    df[stats] = df[stats].apply(pd.to_numeric, errors="coerce")
+    df = df[df["Date"].notna() & (df["Minutes"] > 0)]
+    return df.drop_duplicates(LOG_KEYS).reset_index(drop=True)
+
+
+def log_manifest():
+    """Returns the stored parts, oldest first, as {'part', 'month', 'rows', 'first', 'last'}."""
+    path = os.path.join(_log_dir(), "manifest.json")
+    if not os.path.exists(path):
+        return []
+    try:
+        with open(path, "r") as f:
+            return json.load(f)["parts"]
+    except (OSError, json.JSONDecodeError, KeyError):
+        return []
+
+
+def load_part(entry):
+    """Returns the rows of one stored part."""
+    with open(_log_dir(entry["month"], entry["part"]), "rb") as f:
+        return pickle.load(f)
+
+
+def iter_parts(manifest=None, start=0, months=None):
+    """Yields (index, rows) of the stored parts from `start`, one part at a time."""
+    manifest = log_manifest() if manifest is None else manifest
+    for index, entry in enumerate(manifest[start:], start):
+        if months is None or entry["month"] in months:
+            yield index, load_part(entry)
+
+
+@contextmanager
+def _append_lock():
+    """
+    Serialises appends across threads and processes (an ingest job and the app).
+
+    Part names come from the manifest length, so the manifest is read, the
+    parts written and the manifest replaced under one file lock, like warmup's.
+    """
+    path = _log_dir("append.lock")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with _lock, open(path, "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def append_logs(df):
+    """
+    Appends match log rows to the store and returns the number of new rows.
+
+    Each month of the batch becomes a new part; rows whose (Player, Team,
+    Date) is already stored are skipped, which only reads that month's parts.
+    """
+    df = clean_logs(df)
+    months = df["Date"].dt.strftime("%Y-%m")
+
+    with _append_lock():
+        manifest = log_manifest()
+        added = 0
+        for month, rows in df.groupby(months):
+            stored = [
+                part[LOG_KEYS] for _, part in iter_parts(manifest, months={month})
+            ]
+            if stored:
+                known = pd.MultiIndex.from_frame(pd.concat(stored))
+                rows = rows[~pd.MultiIndex.from_frame(rows[LOG_KEYS]).isin(known)]
+            if rows.empty:
+                continue
+
+            part = f"part-{len(manifest):06d}.pkl"
+            _atomic_write(_log_dir(month, part), pickle.dumps(rows))
+            manifest.append(
+                {
+                    "part": part,
+                    "month": month,
+                    "rows": len(rows),
+                    "first": rows["Date"].min().isoformat(),
+                    "last": rows["Date"].max().isoformat(),
+                }
+            )
+            added += len(rows)
+
+        if added:
+            _atomic_write(
+                _log_dir("manifest.json"),
+                json.dumps({"parts": manifest}, indent=2),
+                "w",
+            )
+    return added
+
+
+def query_logs(players=None, start=None, end=None):
+    """
+    Returns the stored matches of some players between two dates, by date.
+
+    Only the months between `start` and `end` are read, one part at a time.
+    """
+    start = pd.Timestamp(start) if start is not None else None
+    end = pd.Timestamp(end) if end is not None else None
+    months = {
+        entry["month"]
+        for entry in log_manifest()
+        if (start is None or pd.Timestamp(entry["last"]) >= start)
+        and (end is None or pd.Timestamp(entry["first"]) <= end)
+    }
+
+    frames = []
+    for _, part in iter_parts(months=months):
+        mask = pd.Series(True, index=part.index)
+        if players:
+            mask &= part["Player"].isin(players)
+        if start is not None:
+            mask &= part["Date"] >= start
+        if end is not None:
+            mask &= part["Date"] <= end
+        frames.append(part[mask])
+
+    if not frames:
+        return pd.DataFrame(columns=LOG_KEYS)
+    return pd.concat(frames, ignore_index=True).sort_values("Date", kind="stable")
+
+
+class FormState:
+    """
+    Rolling and time-decayed stats of every (Player, Team), updated part by part.
+
+    `recent` holds each player's last `window` matches. `decayed` holds every
+    counting stat (and the minutes) summed with a weight of 0.5 per
+    `half_life` days before `reference`, the latest match seen; moving the
+    reference forward rescales the sums, so matches may arrive in any order.
+    """
+
+    def __init__(self, window=FORM_WINDOW, half_life=HALF_LIFE_DAYS):
+        self.window = window
+        self.half_life = half_life
+        self.parts = 0
+        self.reference = None
+        self.players = None
+        self.recent = None
+        self.decayed = None
+
+    def _weights(self, dates):
+        days = (self.reference - dates).dt.total_seconds() / 86400
+        return 0.5 ** (days.to_numpy() / self.half_life)
+
+    def update(self, rows):
+        """Adds a batch of log rows (see `clean_logs`) to the form."""
+        if rows.empty:
+            return self
+        stats = counting_stats(
+            [col for col in rows.columns if col not in LOG_TEXT_COLUMNS + ("Date",)]
+        )
+        summed = [col for col in stats if col != "Minutes"] + ["Minutes"]
+
+        latest = rows["Date"].max()
+        if self.decayed is not None and latest > self.reference:
+            self.decayed *= 0.5 ** (
+                (latest - self.reference).total_seconds() / 86400 / self.half_life
+            )
+        if self.reference is None or latest > self.reference:
+            self.reference = latest
+
+        weights = self._weights(rows["Date"])
+        contributions = (
+            (rows[summed].fillna(0) * weights[:, None])
+            .assign(**{"Matches Played": weights})
+            .groupby([rows["Player"], rows["Team"]])
+            .sum()
+        )
+        if self.decayed is None:
+            self.decayed = contributions
+        else:
+            self.decayed = self.decayed.add(contributions, fill_value=0)
+
+        recent = rows[LOG_KEYS + summed]
+        if self.recent is not None:
+            recent = pd.concat([self.recent, recent], ignore_index=True)
+        self.recent = (
+            recent.sort_values("Date", kind="stable")
+            .groupby(PLAYER_KEYS, sort=False)
+            .tail(self.window)
+            .reset_index(drop=True)
+        )
+
+        # The league and position of each player's latest match
+        latest = (
+            rows.sort_values("Date", kind="stable")
+            .groupby(PLAYER_KEYS)
+            .last()
+            .reindex(columns=["League", "Position", "Date"])
+            .rename(columns={"Date": "Last Match"})
+        )
+        if self.players is not None:
+            previous = self.players.reindex(latest.index)
+            latest = latest.where(
+                previous["Last Match"].isna()
+                | (latest["Last Match"] >= previous["Last Match"]),
+                previous,
+                axis=0,
+            )
+            latest = pd.concat(
+                [self.players.drop(latest.index, errors="ignore"), latest]
+            )
+        self.players = latest
+        return self
+
+    def _table(self, sums):
+        """Adds identity columns, `90s` and per-90 variants to summed stats."""
+        sums = sums.assign(**{"90s": sums["Minutes"] / 90})
+        specs = {f"{stat} p90": (stat, "p90") for stat in counting_stats(sums.columns)}
+        table = pd.concat([sums, derive(sums, specs)], axis=1)
+        return self.players.join(table, how="inner").reset_index()
+
+    def rolling_table(self):
+        """Returns each player's stats summed over their last `window` matches."""
+        if self.recent is None:
+            return None
+        groups = self.recent.groupby(PLAYER_KEYS)
+        sums = groups.sum(numeric_only=True, min_count=1)
+        sums["Matches Played"] = groups.size()
+        return self._table(sums)
+
+    def decayed_table(self):
+        """
+        Returns each player's time-decayed stats.
+
+        Sums are as of the latest match seen, so `Minutes`, `90s` and
+        `Matches Played` are effective (decayed) amounts and the per-90 stats
+        are decay-weighted averages.
+        """
+        if self.decayed is None:
+            return None
+        return self._table(self.decayed)
+
+
+def form_index(table, metric_weights, min_90s=0):
+    """
+    Scores every player of a form table on each Performance Index category.
+
+    Categories without any of their metrics in the logs are left out. Scores
+    are the category's percentile (0-100) among players with at least
+    `min_90s` (effective) 90s, as in the season index.
+    """
+    table = table[table["90s"] >= min_90s].reset_index(drop=True)
+    scores = table[PLAYER_KEYS + ["League", "Position", "Matches Played", "90s"]]
+    for category, weights in metric_weights.items():
+        metrics = [metric for metric in weights if metric in table.columns]
+        if not metrics or len(table) < 2:
+            continue
+        category_scores, _ = weighted_scores(table, metrics, weights)
+        scores = scores.assign(
+            **{category: percentile_scale(category_scores)["Percentile Rank"]}
+        )
+    return scores
+
+
+def _state_path():
+    return _log_dir("form_state.pkl")
+
+
+def form_state(window=FORM_WINDOW, half_life=HALF_LIFE_DAYS):
+    """
+    Returns the form of every player, updated with the parts stored since last time.
+
+    The state is kept next to the logs; a different window or half-life starts
+    again from the first part, streaming the logs one part at a time.
+    """
+    with _lock:
+        state = None
+        if os.path.exists(_state_path()):
+            try:
+                with open(_state_path(), "rb") as f:
+                    state = pickle.load(f)
+            except (OSError, pickle.UnpicklingError, EOFError):
+                state = None
+        if state is None or (state.window, state.half_life) != (window, half_life):
+            state = FormState(window, half_life)
+
+        manifest = log_manifest()
+        if state.parts < len(manifest):
+            for index, part in iter_parts(manifest, start=state.parts):
+                state.update(part)
+                state.parts = index + 1
+            _atomic_write(_state_path(), pickle.dumps(state))
+    return state
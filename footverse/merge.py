@@ -0,0 +1,48 @@
+import pandas as pd
+from footverse.competitions import league_mapping
+from footverse.errors import FootverseError
+
+
+def merge_data(*dfs, how="outer", on=None):
+    """
+    Merges multiple DataFrames into a single DataFrame.
+    """
+    if not dfs:
+        raise FootverseError("No DataFrames provided to merge.")
+
+    merged_df = dfs[0]
+    for df in dfs[1:]:
+        if on:
+            merged_df = pd.merge(merged_df, df, how=how, suffixes=("", "_dup"), on=on)
+        else:
+            merged_df = pd.merge(
+                merged_df,
+                df,
+                how=how,
+                suffixes=("", "_dup"),
+                left_index=True,
+                right_index=True,
+            )
+
+        # Remove duplicate columns generated by the merge
+        for col in merged_df.columns:
+            if col.endswith("_dup"):
+                original_col = col.replace("_dup", "")
+                merged_df[original_col] = merged_df[original_col].combine_first(
+                    merged_df[col]
+                )
+                merged_df.drop(columns=[col], inplace=True)
+
+    # Ensure 'Age' is a string
+    merged_df["Age"] = merged_df["Age"].astype(str)
+    # Format 'Age' while preserving its structure
+    merged_df["Age"] = merged_df["Age"].str[:2] + "." + merged_df["Age"].str[3:6]
+
+    # * Convert all columns to numeric (except first 5 columns)
+    merged_df.iloc[:, 5:] = merged_df.iloc[:, 5:].apply(pd.to_numeric, errors="coerce")
+    merged_df = merged_df.convert_dtypes()
+
+    # * Rename the 'League' column to the standard names of the competition registry
+    merged_df["League"] = merged_df["League"].replace(league_mapping())
+
+    return merged_df
@@ -0,0 +1,226 @@
+import hashlib
+import os
+import pickle
+import re
+import tempfile
+import threading
+import pandas as pd
+from footverse.cache import cache_path, file_version
+from footverse.correlations import StatCorrelations
+from footverse.distributions import StatDistributions
+from footverse.scoring import player_rows, position_ranges
+from footverse.teams import team_aggregates
+
+# Results derived from the fbref tables, kept on disk per dataset version so a
+# warmup job (or a previous server process) can compute them ahead of users
+PRECOMPUTE_NAMESPACE = "precomputed"
+
+# The merged tables, whose entry also holds the digest of every merged column
+MERGED_DATASETS = "merged datasets"
+
+# The merged data's first columns say who a player is; the stats follow
+IDENTITY_WIDTH = 7
+
+_lock = threading.Lock()
+_results = {}
+# Version of the file each in-memory result was read from or written to
+_file_versions = {}
+
+
+def _result_path(name):
+    slug = re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_")
+    return cache_path(PRECOMPUTE_NAMESPACE, f"{slug}.pkl")
+
+
+def load_entry(name):
+    """
+    Returns the last stored entry of a result ({'version', 'value', ...}) or None.
+
+    An entry held in memory is reloaded when another process (such as the
+    warmup job) stored a newer one on disk.
+    """
+    path = _result_path(name)
+    disk_version = file_version(path)
+    with _lock:
+        entry = _results.get(name)
+        if entry is not None and (
+            disk_version is None or _file_versions.get(name) == disk_version
+        ):
+            return entry
+    if disk_version is None:
+        return None
+
+    try:
+        with open(path, "rb") as f:
+            loaded = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return entry
+
+    with _lock:
+        # Keep an entry stored by another thread in the meantime
+        if _file_versions.get(name) != file_version(path):
+            _results[name] = loaded
+            _file_versions[name] = disk_version
+        return _results[name]
+
+
+def load_result(name, version):
+    """Returns a precomputed result for a dataset version, or None."""
+    entry = load_entry(name)
+    if entry is None or entry.get("version") != version:
+        return None
+    return entry["value"]
+
+
+def store_result(name, version, value, digests=None):
+    """
+    Stores a result for a dataset version in memory and on disk.
+
+    `digests` are the digests of the columns the result was computed from.
+    """
+    entry = {"version": version, "value": value, "digests": digests}
+    with _lock:
+        _results[name] = entry
+
+    path = _result_path(name)
+    if path is None:
+        return value
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(entry, f)
+        os.replace(tmp_path, path)
+    except OSError:
+        # The in-memory result is still served if the disk is read-only
+        pass
+    with _lock:
+        _file_versions[name] = file_version(path)
+    return value
+
+
+def cached_result(name, version, compute, *args):
+    """Returns a result for a dataset version, computing and storing it if missing."""
+    value = load_result(name, version)
+    if value is None:
+        value = store_result(name, version, compute(*args))
+    return value
+
+
+def column_digests(df, columns=None):
+    """Returns {column: hash of its values} for some columns (default all) of a frame."""
+    return {
+        col: hashlib.sha1(
+            pd.util.hash_pandas_object(df[col], index=False).to_numpy().tobytes()
+        ).hexdigest()
+        for col in (df.columns if columns is None else columns)
+    }
+
+
+def input_digests(merged_df, version, columns):
+    """Returns the digests of some merged columns, read from the merge when stored."""
+    stored = (load_result(MERGED_DATASETS, version) or {}).get("column_digests", {})
+    digests = {col: stored[col] for col in columns if col in stored}
+    return {
+        **digests,
+        **column_digests(merged_df, [c for c in columns if c not in digests]),
+    }
+
+
+def tracked_result(name, version, compute, merged_df, *args, columns=None, update=None):
+    """
+    Returns a result of the merged data for a dataset version, reusing older ones.
+
+    The stored result remembers the digest of every column it read (`columns`,
+    default all but `Primary Position`). For a new dataset version, a result
+    whose columns did not change is kept as is, and when only stat columns
+    changed `update(previous, merged_df, changed, *args)` may recompute just
+    those (returning None when it cannot). Anything else is computed again.
+    """
+    entry = load_entry(name)
+    if entry is not None and entry["version"] == version:
+        return entry["value"]
+
+    if columns is None:
+        columns = [col for col in merged_df.columns if col != "Primary Position"]
+    digests = input_digests(merged_df, version, columns)
+
+    value, previous = None, (entry or {}).get("digests")
+    if previous is not None and previous.keys() == digests.keys():
+        changed = [col for col, digest in digests.items() if previous[col] != digest]
+        identity = set(merged_df.columns[:IDENTITY_WIDTH])
+        if not changed:
+            value = entry["value"]
+        elif update is not None and not identity.intersection(changed):
+            value = update(entry["value"], merged_df, changed, *args)
+    if value is None:
+        value = compute(merged_df, *args)
+    return store_result(name, version, value, digests)
+
+
+def _with_stats(merged_df, stats):
+    """Returns the identity columns of the merged data with only some of its stats."""
+    return merged_df[list(merged_df.columns[:IDENTITY_WIDTH]) + list(stats)]
+
+
+def _update_ranges(previous, merged_df, changed):
+    """Recomputes the per-position ranges of the changed stats."""
+    updated = previous.copy()
+    updated[changed] = position_ranges(_with_stats(merged_df, changed))
+    return updated
+
+
+def _update_teams(previous, merged_df, changed):
+    """Recomputes the changed stats of the team tables; None if minutes changed."""
+    if "Minutes" in changed:
+        return None
+    partial = team_aggregates(_with_stats(merged_df, ["Minutes", *changed]))
+    updated = dict(previous)
+    for key in ("totals", "averages"):
+        columns = [col for col in partial[key].columns if col in changed]
+        updated[key] = previous[key].copy()
+        updated[key][columns] = partial[key][columns]
+    return updated
+
+
+def position_range_table(merged_df, version):
+    """Returns the per-position min/quantile/max table, once per dataset version."""
+    return tracked_result(
+        "position ranges", version, position_ranges, merged_df, update=_update_ranges
+    )
+
+
+def player_row_lookup(merged_df, version):
+    """Returns the (Player, Team) -> row number map, kept while players stay the same."""
+    return tracked_result(
+        "player rows", version, player_rows, merged_df, columns=["Player", "Team"]
+    )
+
+
+def team_tables(merged_df, version):
+    """Returns the team aggregate tables, once per dataset version."""
+    return tracked_result(
+        "team aggregates", version, team_aggregates, merged_df, update=_update_teams
+    )
+
+
+def stat_correlations(merged_df, version):
+    """Returns the per-group correlation moments, once per dataset version."""
+    return tracked_result(
+        "stat correlations",
+        version,
+        StatCorrelations,
+        merged_df,
+        update=StatCorrelations.updated,
+    )
+
+
+def stat_distributions(merged_df, version):
+    """Returns the per-group histograms and quantile sketches, once per dataset version."""
+    return tracked_result(
+        "stat distributions",
+        version,
+        StatDistributions,
+        merged_df,
+        update=StatDistributions.updated,
+    )
@@ -0,0 +1,189 @@
+import contextvars
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+
+# * Priority classes (lower value is served first)
+INTERACTIVE = 0  # Page loads triggered by a user
+PREFETCH = 1  # Warm-up jobs
+BULK = 2  # Background refreshes
+
+PRIORITY_NAMES = {INTERACTIVE: "interactive", PREFETCH: "prefetch", BULK: "bulk"}
+
+# * Upstream budgets: (max requests, period in seconds)
+# Refer: https://www.sports-reference.com/bot-traffic.html
+BUDGETS = {
+    "fbref": (10, 60),
+    "football-data": (10, 60),
+}
+
+# Slots per period that lower classes leave free, so a user request never
+# queues behind a warm-up job that already used up the budget
+HEADROOM = {INTERACTIVE: 0, PREFETCH: 2, BULK: 4}
+
+_context = contextvars.ContextVar("request_context", default=(INTERACTIVE, None, None))
+_sequence = itertools.count()
+_upstreams = {}
+_upstreams_lock = threading.Lock()
+
+# {(upstream, key): priority} of requests in progress, across their retries
+_flights = {}
+
+
+@contextmanager
+def request_priority(priority, deadline=None, cancel_event=None):
+    """
+    Sets the priority, deadline (absolute `time.time()`) and cancellation event
+    used by upstream requests made inside the block.
+    """
+    token = _context.set((priority, deadline, cancel_event))
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+def current_request_context():
+    """Returns (priority, deadline, cancel_event) for the current thread."""
+    return _context.get()
+
+
+def _get_upstream(upstream):
+    with _upstreams_lock:
+        if upstream not in _upstreams:
+            _upstreams[upstream] = {
+                "cond": threading.Condition(),
+                "waiting": [],
+                "timestamps": [],
+            }
+        return _upstreams[upstream]
+
+
+def acquire(upstream, priority=None, deadline=None, cancel_event=None, key=None):
+    """
+    Blocks until a request slot for `upstream` is granted.
+
+    Waiting requests are served by priority class, then in arrival order.
+    Returns False if the deadline passes or the request is cancelled first.
+    """
+    context_priority, context_deadline, context_cancel = current_request_context()
+    priority = context_priority if priority is None else priority
+    deadline = context_deadline if deadline is None else deadline
+    cancel_event = context_cancel if cancel_event is None else cancel_event
+
+    # A retry keeps the priority its request was promoted to
+    with _upstreams_lock:
+        priority = min(priority, _flights.get((upstream, key), priority))
+
+    max_requests, period = BUDGETS[upstream]
+    state = _get_upstream(upstream)
+    ticket = [priority, next(_sequence), key, False]  # priority, seq, key, cancelled
+
+    with state["cond"]:
+        heapq.heappush(state["waiting"], ticket)
+
+        while True:
+            current_time = time.time()
+            expired = deadline is not None and current_time >= deadline
+            if ticket[3] or expired or (cancel_event and cancel_event.is_set()):
+                state["waiting"].remove(ticket)
+                heapq.heapify(state["waiting"])
+                state["cond"].notify_all()
+                return False
+
+            # Keep only grants within the current period
+            state["timestamps"] = [
+                t for t in state["timestamps"] if current_time - t < period
+            ]
+            allowed = max_requests - HEADROOM.get(ticket[0], 0)
+
+            if state["waiting"][0] is ticket and len(state["timestamps"]) < allowed:
+                heapq.heappop(state["waiting"])
+                state["timestamps"].append(current_time)
+                state["cond"].notify_all()
+                return True
+
+            # Sleep until the oldest grant leaves the window (or we are notified)
+            timeout = 1.0
+            if state["timestamps"] and len(state["timestamps"]) >= allowed:
+                timeout = max(period - (current_time - state["timestamps"][0]), 0.01)
+            if deadline is not None:
+                timeout = min(timeout, max(deadline - current_time, 0))
+            # Poll regularly so cancellation events are noticed
+            state["cond"].wait(min(timeout, 1.0))
+
+
+@contextmanager
+def request_flight(upstream, key, priority=None):
+    """
+    Marks a request for `key` as in progress for the duration of the block.
+
+    A promotion while it sleeps between retries (e.g. after a 429) is kept
+    here, so its next `acquire` queues at the promoted priority.
+    """
+    if priority is None:
+        priority = current_request_context()[0]
+    with _upstreams_lock:
+        _flights[(upstream, key)] = priority
+    try:
+        yield
+    finally:
+        with _upstreams_lock:
+            _flights.pop((upstream, key), None)
+
+
+def promote(upstream, key, priority):
+    """Raises the priority of a waiting request, e.g. when a user joins a prefetch."""
+    with _upstreams_lock:
+        if _flights.get((upstream, key), priority) > priority:
+            _flights[(upstream, key)] = priority
+
+    state = _get_upstream(upstream)
+    with state["cond"]:
+        for ticket in state["waiting"]:
+            if ticket[2] == key and ticket[0] > priority:
+                ticket[0] = priority
+        heapq.heapify(state["waiting"])
+        state["cond"].notify_all()
+
+
+def cancel_waiting(priority, upstream=None):
+    """Cancels every waiting request of a priority class. Returns the count."""
+    with _upstreams_lock:
+        names = [upstream] if upstream else list(_upstreams)
+
+    cancelled = 0
+    for name in names:
+        state = _get_upstream(name)
+        with state["cond"]:
+            for ticket in state["waiting"]:
+                if ticket[0] == priority and not ticket[3]:
+                    ticket[3] = True
+                    cancelled += 1
+            state["cond"].notify_all()
+    return cancelled
+
+
+def scheduler_stats():
+    """Returns queued requests per priority class and recent grants per upstream."""
+    with _upstreams_lock:
+        names = list(_upstreams)
+
+    stats = {}
+    for name in names:
+        state = _get_upstream(name)
+        _, period = BUDGETS[name]
+        with state["cond"]:
+            current_time = time.time()
+            waiting = {label: 0 for label in PRIORITY_NAMES.values()}
+            for ticket in state["waiting"]:
+                waiting[PRIORITY_NAMES[ticket[0]]] += 1
+            stats[name] = {
+                "waiting": waiting,
+                "recent_requests": sum(
+                    1 for t in state["timestamps"] if current_time - t < period
+                ),
+            }
+    return stats
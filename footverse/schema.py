@@ -0,0 +1,162 @@
+"""
+Column plans of the fbref tables, compiled once from the `columns/*.json` files.
+
+A plan lists every column a table is expected to have: the raw fbref headers it
+comes from, its target name, its type, whether the table keeps it and which
+table owns it in the merged dataset. Applying a plan renames, filters and
+converts a raw table in one pass, and raises SchemaDriftError when fbref adds
+or removes a column instead of silently dropping it.
+"""
+
+from dataclasses import dataclass, field
+import pandas as pd
+from footverse.errors import SchemaDriftError, SchemaError
+from footverse.fbref import (
+    COLUMN_MAPPING_FILE,
+    GOALKEEPING_SCHEMA_FILE,
+    STANDARD_SCHEMA_FILE,
+    read_json,
+)
+
+# Row numbers and match-log links are never kept
+DROPPED_COLUMNS = ("Rank", "Matches")
+
+# Identity columns stay text; every other column is numeric
+STRING_COLUMNS = ("Player", "Nationality", "Position", "Team", "League", "Age")
+
+
+@dataclass(frozen=True)
+class ColumnPlan:
+    """How one column of a table is loaded."""
+
+    target: str
+    sources: tuple
+    dtype: str
+    keep: bool
+    owner: str
+
+
+@dataclass(frozen=True)
+class TablePlan:
+    """The compiled schema of one fbref table."""
+
+    name: str
+    json_file: str
+    standard: bool
+    goalkeeping: bool
+    columns: tuple
+    rename: dict = field(repr=False, compare=False)
+
+    @property
+    def kept(self):
+        """Target names the table keeps, in schema order."""
+        return [col.target for col in self.columns if col.keep]
+
+    @property
+    def numeric(self):
+        """Kept columns that are converted to numbers."""
+        return [
+            col.target for col in self.columns if col.keep and col.dtype == "number"
+        ]
+
+    def apply(self, df):
+        """Turns a raw fbref table into the planned columns. Raises SchemaDriftError."""
+        # Join the multi-level headers; unnamed groups keep only the last part
+        headers = [" ".join(col).strip() for col in df.columns]
+        headers = [col.split()[-1] if "level_0" in col else col for col in headers]
+        targets = [self.rename.get(col, col) for col in headers]
+
+        df = df.set_axis(targets, axis=1).reset_index(drop=True)
+        present = set(targets)
+        missing = [col for col in self.kept + ["Player"] if col not in present]
+        if missing:
+            raise SchemaDriftError(self.name, missing=dict.fromkeys(missing))
+
+        # Remove repeated header rows before checking which columns are empty
+        rows = (df["Player"] != "Player").to_numpy()
+        planned = {col.target for col in self.columns}
+        has_values = df[rows].notna().any().to_numpy()
+        unexpected = [
+            col
+            for col, filled in zip(targets, has_values)
+            if filled and col not in planned
+        ]
+        if unexpected:
+            raise SchemaDriftError(self.name, unexpected=dict.fromkeys(unexpected))
+
+        kept = set(self.kept)
+        df = df.iloc[rows, [i for i, col in enumerate(targets) if col in kept]].copy()
+
+        numeric = [col for col in self.numeric if col in df.columns]
+        df[numeric] = df[numeric].apply(pd.to_numeric, errors="coerce")
+        return df
+
+
+def schema_headers(json_file):
+    """Returns a schema's column names, checked against the column mapping."""
+    json_data = read_json(json_file)
+    targets = set(read_json(COLUMN_MAPPING_FILE).values())
+
+    headers = json_data.get("col_headers", [])
+    for col in headers:
+        if col not in targets:
+            raise SchemaError(
+                json_file, f"lists '{col}', which the mapping never produces"
+            )
+    if len(set(headers)) != len(headers):
+        raise SchemaError(json_file, "lists a column twice")
+    return headers
+
+
+def shared_columns(json_file):
+    """Returns the columns a table keeps after removing its `col_remove` entries."""
+    remove = set(read_json(json_file).get("col_remove", []))
+    return [col for col in schema_headers(json_file) if col not in remove]
+
+
+def compile_plans(datasets):
+    """
+    Compiles {name: (json_file, standard, goalkeeping)} into {name: TablePlan}.
+
+    Tables are listed in merge order; a column is owned by the first table that
+    keeps it. Raises SchemaError if a schema file is invalid.
+    """
+    mapping = read_json(COLUMN_MAPPING_FILE)
+    sources = {}
+    for source, target in mapping.items():
+        sources.setdefault(target, []).append(source)
+
+    keep = {}
+    for name, (json_file, standard, goalkeeping) in datasets.items():
+        remove = set(read_json(json_file).get("col_remove", [])) | set(DROPPED_COLUMNS)
+        # Other tables repeat the standard (or goalkeeping) columns; keep one copy
+        if not standard:
+            remove |= set(
+                shared_columns(
+                    GOALKEEPING_SCHEMA_FILE if goalkeeping else STANDARD_SCHEMA_FILE
+                )
+            )
+        keep[name] = {col: col not in remove for col in schema_headers(json_file)}
+
+    owners = {}
+    for name, columns in keep.items():
+        for col, kept in columns.items():
+            if kept:
+                owners.setdefault(col, name)
+
+    plans = {}
+    for name, (json_file, standard, goalkeeping) in datasets.items():
+        columns = tuple(
+            ColumnPlan(
+                target=col,
+                sources=tuple(sources[col]),
+                dtype="string" if col in STRING_COLUMNS else "number",
+                keep=kept,
+                owner=owners.get(col, name),
+            )
+            for col, kept in keep[name].items()
+        )
+        plans[name] = TablePlan(
+            name, json_file, standard, goalkeeping, columns, rename=mapping
+        )
+    return plans
@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+
+
+def weighted_scores(df, metrics, weights):
+    """
+    Computes a Weighted Linear Combination (WLC) score for every player.
+
+    Missing values count as 0, and metrics with a negative weight are penalised.
+    Returns the scores and the raw metric values.
+    """
+    scores = pd.DataFrame()
+    scores["Player"] = df["Player"]
+
+    category_score = np.zeros(len(df))
+
+    for metric in metrics:
+        if metric in df.columns:
+            metric_values = df[metric].fillna(0)  # Fill NA with 0
+
+            if weights[metric] < 0:  # Penalizing negative-weighted metrics
+                metric_values *= -1
+
+            category_score += metric_values * abs(weights[metric])
+
+    scores["Weighted Score"] = category_score  # Store raw WLC score
+    return scores, df[["Player"] + metrics]  # Return raw metrics too
+
+
+def percentile_scale(scores, column="Weighted Score"):
+    """Adds a `Percentile Rank` column (0-100 scale) based on average ranks."""
+    scores["Percentile Rank"] = scores[column].rank(method="average")
+    scores["Percentile Rank"] = (
+        (scores["Percentile Rank"] - 1) / (len(scores) - 1) * 100
+    )
+    return scores
+
+
+# Quantiles summarised per position; 0 and 1 are the minimum and maximum
+RANGE_QUANTILES = [0.0, 0.1, 0.25, 0.5, 0.75, 0.9, 1.0]
+
+
+def position_ranges(merged_df):
+    """
+    Summarises every stat within each positional group.
+
+    Returns a frame indexed by (primary position, quantile) with one column
+    per stat, so normalising a player is a row lookup.
+    """
+    primary_position = merged_df["Position"].str.split(",").str[0]
+    stats_columns = [col for col in merged_df.columns[7:] if col != "Primary Position"]
+    stats = merged_df[stats_columns].astype("float64")
+    return stats.groupby(primary_position).quantile(RANGE_QUANTILES)
+
+
+def player_rows(merged_df):
+    """Maps every (Player, Team) pair to its row number in the dataset."""
+    keys = zip(merged_df["Player"], merged_df["Team"])
+    rows = {}
+    for row, key in enumerate(keys):
+        rows.setdefault(key, row)
+    return rows
+
+
+def pareto_front(values):
+    """
+    Returns the rows of a 2D array that no other row dominates, best first.
+
+    A row dominates another if it is at least as high on every column and
+    higher on one; missing values count as the lowest. Rows are visited by
+    decreasing column sum (sort-filter skyline): a row can only be dominated
+    by one with a larger sum, so the best remaining row is always on the front
+    and removes every row it dominates in one vectorised comparison.
+    """
+    values = np.where(np.isnan(values), -np.inf, values)
+    order = np.argsort(-np.nan_to_num(values, neginf=0.0).sum(axis=1), kind="stable")
+    remaining, rows = values[order], order
+    front = []
+    while len(rows):
+        best = remaining[0]
+        front.append(rows[0])
+        dominated = np.all(remaining <= best, axis=1) & np.any(remaining < best, axis=1)
+        dominated[0] = True
+        remaining, rows = remaining[~dominated], rows[~dominated]
+    return np.array(front, dtype=np.intp)
+
+
+def skyline(df, stats, by_position=False):
+    """
+    Returns the players of `df` that no other player beats on every stat.
+
+    Stats are compared as percentiles (0-100) of `df`, within each primary
+    position when `by_position=True`, so a defender is measured against the
+    other defenders. The percentiles are returned as `<stat> Percentile`
+    columns, plus their mean as `Skyline Score`.
+    """
+    values = df[stats].astype("float64")
+    if by_position:
+        values = values.groupby(df["Position"].str.split(",").str[0])
+    percentiles = values.rank(pct=True) * 100
+
+    front = pareto_front(percentiles.to_numpy())
+    percentiles = percentiles.iloc[front].to_numpy()
+    return df.iloc[front].assign(
+        **{f"{stat} Percentile": percentiles[:, i] for i, stat in enumerate(stats)},
+        **{"Skyline Score": np.nanmean(percentiles, axis=1)},
+    )
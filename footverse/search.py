@@ -0,0 +1,174 @@
+"""
+Accent-insensitive fuzzy player search.
+
+Player and team names are folded to lowercase ASCII ("Ødegaard" -> "odegaard")
+and split into word trigrams. A query is scored against every player at once
+from the trigram postings, so partial ("mbap"), misspelled ("odegard") and
+accent-free queries all find their player. The index is built once per
+dataset version.
+"""
+
+import re
+import unicodedata
+import numpy as np
+import pandas as pd
+from footverse.precompute import tracked_result
+
+# Letters that do not decompose into a base letter plus an accent
+FOLDED_LETTERS = str.maketrans(
+    {
+        "ø": "o",
+        "Ø": "O",
+        "æ": "ae",
+        "Æ": "AE",
+        "œ": "oe",
+        "Œ": "OE",
+        "ß": "ss",
+        "đ": "d",
+        "Đ": "D",
+        "ł": "l",
+        "Ł": "L",
+        "ı": "i",
+        "þ": "th",
+        "Þ": "Th",
+    }
+)
+
+# Share of a match score that comes from how much of the query was found
+COVERAGE_WEIGHT = 0.75
+
+# Matches scoring below this are not returned
+MIN_SCORE = 0.4
+
+# Added when the query appears as is at the start of a word of the player's name
+SUBSTRING_BONUS = 0.5
+
+RESULT_COLUMNS = ["Player", "Team", "League", "Position", "Primary Position"]
+
+
+def normalise(text):
+    """Folds a name to lowercase ASCII words ("Martin Ødegaard" -> "martin odegaard")."""
+    text = unicodedata.normalize("NFKD", str(text).translate(FOLDED_LETTERS))
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return re.sub(r"[^a-z0-9]+", " ", text.casefold()).strip()
+
+
+def trigrams(text, prefix=False):
+    """
+    Returns the trigrams of every word of a normalised text.
+
+    Words are padded with two leading spaces and one trailing space; with
+    `prefix=True` the trailing space is left out, so a partial query word
+    still matches the start of a longer name.
+    """
+    grams = set()
+    for word in text.split():
+        padded = f"  {word}" if prefix else f"  {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def _postings(texts):
+    """Returns {trigram: row numbers} and the trigram count of every text."""
+    postings, sizes = {}, np.zeros(len(texts), dtype=np.int32)
+    for row, text in enumerate(texts):
+        grams = trigrams(text)
+        sizes[row] = len(grams)
+        for gram in grams:
+            postings.setdefault(gram, []).append(row)
+    return {
+        gram: np.array(rows, dtype=np.int32) for gram, rows in postings.items()
+    }, sizes
+
+
+class SearchIndex:
+    """Trigram index over the normalised Player and Team names of a dataset."""
+
+    def __init__(self, df):
+        self.rows = (
+            df.assign(**{"Primary Position": df["Position"].str.split(",").str[0]})[
+                RESULT_COLUMNS
+            ]
+            .drop_duplicates(["Player", "Team"])
+            .reset_index(drop=True)
+        )
+        self.names = [normalise(name) for name in self.rows["Player"]]
+        teams = [normalise(team) for team in self.rows["Team"]]
+        self.name_postings, self.name_sizes = _postings(self.names)
+        self.team_postings, _ = _postings(teams)
+        # Trigrams of name and team together, each counted once
+        self.both_sizes = np.array(
+            [
+                len(trigrams(name) | trigrams(team))
+                for name, team in zip(self.names, teams)
+            ],
+            dtype=np.int32,
+        )
+
+    def _hits(self, grams, *fields):
+        """
+        Counts the query trigrams every row shares with some fields.
+
+        A trigram found in several of the fields counts once.
+        """
+        empty = np.empty(0, dtype=np.int32)
+        rows = [
+            np.unique(
+                np.concatenate([postings.get(gram, empty) for postings in fields])
+            )
+            for gram in grams
+        ]
+        return np.bincount(np.concatenate(rows), minlength=len(self.rows))
+
+    @staticmethod
+    def _similarity(hits, query_size, sizes):
+        """Blends query coverage with the Jaccard similarity of the trigram sets."""
+        coverage = hits / query_size
+        jaccard = hits / (query_size + sizes - hits)
+        return COVERAGE_WEIGHT * coverage + (1 - COVERAGE_WEIGHT) * jaccard
+
+    def search(self, query, limit=10):
+        """Returns up to `limit` players matching a query, best match first."""
+        text = normalise(query)
+        grams = trigrams(text, prefix=True)
+        if not grams:
+            return self.rows.iloc[:0].assign(Score=pd.Series(dtype=float))
+
+        name_hits = self._hits(grams, self.name_postings)
+        both_hits = self._hits(grams, self.name_postings, self.team_postings)
+
+        # Mostly how much of the query was found, then how close the lengths are,
+        # against the name alone or against name and team together
+        scores = np.maximum(
+            self._similarity(name_hits, len(grams), self.name_sizes),
+            self._similarity(both_hits, len(grams), self.both_sizes),
+        )
+
+        candidates = np.flatnonzero(scores >= MIN_SCORE)
+        candidate_scores = scores[candidates] + [
+            SUBSTRING_BONUS if f" {text}" in f" {self.names[row]}" else 0.0
+            for row in candidates
+        ]
+
+        best = np.argsort(-candidate_scores, kind="stable")[:limit]
+        return (
+            self.rows.iloc[candidates[best]]
+            .assign(Score=candidate_scores[best])
+            .reset_index(drop=True)
+        )
+
+
+def player_index(merged_df, version):
+    """Returns the search index of a dataset, rebuilt only when the players change."""
+    return tracked_result(
+        "player search index",
+        version,
+        SearchIndex,
+        merged_df,
+        columns=["Player", "Team", "League", "Position"],
+    )
+
+
+def search_players(merged_df, version, query, limit=10):
+    """Returns up to `limit` players matching a query, best match first."""
+    return player_index(merged_df, version).search(query, limit)
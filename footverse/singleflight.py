@@ -0,0 +1,43 @@
+import threading
+
+_lock = threading.Lock()
+_in_flight = {}
+
+
+def single_flight(key, func, *args, **kwargs):
+    """
+    Runs `func` once per key across concurrent callers.
+
+    The first caller for a key performs the call; callers arriving while it is
+    in flight wait for it and receive the same result (or exception).
+    """
+    with _lock:
+        call = _in_flight.get(key)
+        leader = call is None
+        if leader:
+            call = {"done": threading.Event(), "result": None, "error": None}
+            _in_flight[key] = call
+
+    if not leader:
+        call["done"].wait()
+        if call["error"] is not None:
+            raise call["error"]
+        return call["result"]
+
+    try:
+        call["result"] = func(*args, **kwargs)
+    except BaseException as e:
+        call["error"] = e
+        raise
+    finally:
+        with _lock:
+            _in_flight.pop(key, None)
+        call["done"].set()
+
+    return call["result"]
+
+
+def in_flight_keys():
+    """Returns the keys of calls currently in flight."""
+    with _lock:
+        return list(_in_flight.keys())
@@ -0,0 +1,217 @@
+import hashlib
+import json
+import os
+import pickle
+import re
+import tempfile
+import threading
+import time
+import pandas as pd
+from footverse.cache import cache_path, file_version
+from footverse.scheduler import BULK, request_priority
+
+# Last good version of each fbref table and of each competition's part of it,
+# kept on disk between restarts (rows are indexed by competition, so snapshots
+# from before the competition registry are not reused)
+SNAPSHOT_NAMESPACE = "fbref_tables"
+
+# Minimum time between two background refresh attempts of the same table
+RETRY_INTERVAL = 60 * 10
+
+_lock = threading.Lock()
+_snapshots = {}
+# Version of the file each in-memory snapshot was read from or written to
+_file_versions = {}
+_refreshing = set()
+_last_attempt = {}
+
+
+def _slug(name):
+    """Turns a dataset name into a file-system friendly slug."""
+    return re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_")
+
+
+def _snapshot_path(name):
+    return cache_path(SNAPSHOT_NAMESPACE, f"{_slug(name)}.pkl")
+
+
+def _manifest_path(name):
+    return cache_path(SNAPSHOT_NAMESPACE, f"{_slug(name)}.json")
+
+
+def _atomic_write(path, data, mode="wb"):
+    """Writes to a temporary file and renames it so readers never see a partial file."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, mode) as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def content_digest(df):
+    """Returns a hash of a table's columns and parsed rows (index included)."""
+    digest = hashlib.sha1(repr(list(df.columns)).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _loaded_snapshot(name):
+    """Returns the in-memory snapshot of a table unless a newer file replaced it."""
+    disk_version = file_version(_snapshot_path(name))
+    with _lock:
+        snapshot = _snapshots.get(name)
+        if snapshot is None:
+            return None, disk_version
+        if disk_version is not None and _file_versions.get(name) != disk_version:
+            return None, disk_version
+    return snapshot, disk_version
+
+
+def load_snapshot(name):
+    """
+    Returns the last good snapshot of a table ({'df', 'fetched_at', 'digest'}) or None.
+
+    A snapshot held in memory is reloaded when another process (such as the
+    warmup job) wrote a newer one to disk.
+    """
+    snapshot, disk_version = _loaded_snapshot(name)
+    if snapshot is not None or disk_version is None:
+        return snapshot
+
+    try:
+        with open(_snapshot_path(name), "rb") as f:
+            snapshot = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        with _lock:
+            return _snapshots.get(name)
+    if "digest" not in snapshot:
+        snapshot["digest"] = content_digest(snapshot["df"])
+
+    with _lock:
+        # Keep a snapshot installed by another thread in the meantime
+        if _file_versions.get(name) != file_version(_snapshot_path(name)):
+            _snapshots[name] = snapshot
+            _file_versions[name] = disk_version
+        return _snapshots[name]
+
+
+def validate_table(df, previous=None):
+    """Checks that a freshly parsed table is safe to replace the previous one."""
+    if df is None or df.empty:
+        return False
+    if previous is not None:
+        # Reject truncated downloads and tables that lost most of their schema
+        if len(df) < len(previous) * 0.5:
+            return False
+        kept = set(previous.columns).intersection(df.columns)
+        if len(kept) < len(previous.columns) * 0.9:
+            return False
+    return True
+
+
+def install_snapshot(name, df, validate=True):
+    """
+    Validates a table and atomically swaps it in as the current snapshot.
+
+    Pass `validate=False` for tables built from parts that were validated
+    when they were installed. A table whose rows did not change keeps its
+    previous frame and digest, so only its fetch time moves on and nothing
+    derived from it is recomputed.
+    """
+    previous = load_snapshot(name)
+    if validate and not validate_table(df, previous["df"] if previous else None):
+        return None
+
+    digest = content_digest(df)
+    if previous is not None and previous["digest"] == digest:
+        df = previous["df"]
+    snapshot = {"df": df, "fetched_at": time.time(), "digest": digest}
+    try:
+        if _snapshot_path(name) is None:
+            raise OSError("Caches are kept in memory only")
+        _atomic_write(_snapshot_path(name), pickle.dumps(snapshot))
+        manifest = {
+            "name": name,
+            "fetched_at": snapshot["fetched_at"],
+            "digest": digest,
+            "rows": len(df),
+            "columns": list(df.columns),
+        }
+        _atomic_write(_manifest_path(name), json.dumps(manifest, indent=2), "w")
+    except OSError:
+        # The in-memory snapshot is still served if the disk is read-only
+        pass
+
+    with _lock:
+        _snapshots[name] = snapshot
+        _file_versions[name] = file_version(_snapshot_path(name))
+    return snapshot
+
+
+def load_manifest(name):
+    """Returns a table's manifest (columns, rows, fetched_at) without loading its data."""
+    path = _manifest_path(name)
+    if path is None or not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def snapshot_age(name):
+    """Returns the age of a table's snapshot in seconds, or None if absent."""
+    snapshot, _ = _loaded_snapshot(name)
+    # Fall back to the manifest so tables that are not loaded (or were
+    # rewritten by another process) stay unpickled
+    fetched_at = (snapshot or load_manifest(name) or {}).get("fetched_at")
+    return time.time() - fetched_at if fetched_at else None
+
+
+def is_refreshing(name=None):
+    """Checks whether a table (or any table) is being refreshed in the background."""
+    with _lock:
+        return name in _refreshing if name else bool(_refreshing)
+
+
+def record_attempt(name):
+    """Records that a table fetch was attempted."""
+    with _lock:
+        _last_attempt[name] = time.time()
+
+
+def last_attempt(name):
+    """Returns when a table fetch was last attempted, or None."""
+    with _lock:
+        return _last_attempt.get(name)
+
+
+def refresh_in_background(name, loader):
+    """
+    Runs `loader` on a daemon thread without blocking the caller.
+
+    The loader is expected to validate and install the new snapshot itself.
+    """
+    with _lock:
+        if name in _refreshing:
+            return False
+        if time.time() - _last_attempt.get(name, 0) < RETRY_INTERVAL:
+            return False
+        _refreshing.add(name)
+        _last_attempt[name] = time.time()
+
+    def run():
+        try:
+            # Background refreshes yield the upstream budget to user requests
+            with request_priority(BULK):
+                loader()
+        except Exception:
+            # Keep serving the previous snapshot; the next attempt retries
+            pass
+        finally:
+            with _lock:
+                _refreshing.discard(name)
+
+    threading.Thread(target=run, name=f"refresh-{_slug(name)}", daemon=True).start()
+    return True
@@ -0,0 +1,286 @@
+"""
+Optional SQLite copy of the merged dataset, shared by every worker process.
+
+The store is a single file under the cache directory with one `players` table
+(the merged dataset plus `Primary Position`), indexed on League, Team,
+Primary Position and Player. It is rebuilt into a temporary file and swapped
+in atomically, so readers in other processes always see a complete version.
+
+Enable it with the `FOOTVERSE_SQL_STORE=1` environment variable; the pages
+fall back to pandas when it is disabled or caches are kept in memory only.
+"""
+
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+from contextlib import closing
+import pandas as pd
+from footverse.cache import cache_path
+from footverse.errors import FootverseError
+
+STORE_NAMESPACE = "store"
+STORE_ENV = "FOOTVERSE_SQL_STORE"
+
+TABLE = "players"
+INDEXED_COLUMNS = ["League", "Team", "Primary Position", "Player"]
+
+# Columns every query returns, in the order of the merged dataset
+IDENTITY_COLUMNS = ["Player", "Nationality", "Position", "Team", "League", "Age"]
+
+_lock = threading.Lock()
+_build_lock = threading.Lock()
+_columns = {}
+
+
+def _store_path():
+    return cache_path(STORE_NAMESPACE, "players.sqlite")
+
+
+def _quote(name):
+    """Quotes a column name for SQL."""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def store_enabled():
+    """Returns True if the store is switched on and caches persist to disk."""
+    enabled = os.environ.get(STORE_ENV, "").lower() in ("1", "true", "yes")
+    return enabled and _store_path() is not None
+
+
+def connect():
+    """Opens a read-only connection to the store. Raises FootverseError if it is missing."""
+    path = _store_path()
+    if path is None or not os.path.exists(path):
+        raise FootverseError("The SQL store has not been built yet.")
+    return sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+
+
+def store_version():
+    """Returns the dataset version the store was built from, or None."""
+    try:
+        with closing(connect()) as con:
+            row = con.execute("SELECT version FROM meta").fetchone()
+    except (FootverseError, sqlite3.Error):
+        return None
+    return row[0] if row else None
+
+
+def _version_key(version):
+    return json.dumps(version)
+
+
+def build_store(merged_df, version):
+    """Writes the merged dataset to a new store file and swaps it in."""
+    df = merged_df
+    if "Primary Position" not in df.columns:
+        df = df.assign(**{"Primary Position": df["Position"].str.split(",").str[0]})
+
+    path = _store_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    os.close(fd)
+    # Readable by worker processes running as other users
+    os.chmod(tmp_path, 0o644)
+    try:
+        with closing(sqlite3.connect(tmp_path)) as con:
+            df.to_sql(TABLE, con, index=False, if_exists="replace")
+            for column in INDEXED_COLUMNS:
+                con.execute(
+                    f"CREATE INDEX {_quote('idx_' + column)} ON {TABLE} ({_quote(column)})"
+                )
+            con.execute("CREATE TABLE meta (version TEXT)")
+            con.execute("INSERT INTO meta VALUES (?)", (_version_key(version),))
+            con.commit()
+        os.replace(tmp_path, path)
+    except (OSError, sqlite3.Error) as e:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise FootverseError(f"Could not build the SQL store: {e}")
+
+    with _lock:
+        _columns.clear()
+
+
+def ensure_store(merged_df, version):
+    """Builds the store unless it already holds this dataset version."""
+    with _build_lock:
+        if store_is_current(version):
+            return False
+        build_store(merged_df, version)
+    return True
+
+
+def store_is_current(version):
+    """Returns True if the store holds this dataset version."""
+    return store_version() == _version_key(version)
+
+
+def store_columns():
+    """Returns {column: declared SQL type} of the players table."""
+    version = store_version()
+    with _lock:
+        if version in _columns:
+            return _columns[version]
+    with closing(connect()) as con:
+        rows = con.execute(f"PRAGMA table_info({TABLE})").fetchall()
+    columns = {row[1]: row[2] for row in rows}
+    with _lock:
+        _columns[version] = columns
+    return columns
+
+
+def _check_columns(columns):
+    """Raises FootverseError if a column is not in the store."""
+    known = store_columns()
+    unknown = [column for column in columns if column not in known]
+    if unknown:
+        raise FootverseError(f"Unknown column(s): {', '.join(unknown)}.")
+    return known
+
+
+def _where(filters, not_null=()):
+    """
+    Turns {column: condition} into a WHERE clause and its parameters.
+
+    A list or set matches any of its values, a (low, high) tuple is an
+    inclusive range (either bound may be None) and any other value must match
+    exactly. Empty conditions are ignored; `not_null` columns must have a value.
+    """
+    _check_columns([*(filters or {}), *not_null])
+    clauses = [f"{_quote(column)} IS NOT NULL" for column in not_null]
+    params = []
+    for column, condition in (filters or {}).items():
+        name = _quote(column)
+        if isinstance(condition, (list, set)):
+            if not condition:
+                continue
+            clauses.append(f"{name} IN ({', '.join('?' * len(condition))})")
+            params.extend(condition)
+        elif isinstance(condition, tuple):
+            low, high = condition
+            if low is not None:
+                clauses.append(f"{name} >= ?")
+                params.append(low)
+            if high is not None:
+                clauses.append(f"{name} <= ?")
+                params.append(high)
+        elif condition is not None:
+            clauses.append(f"{name} = ?")
+            params.append(condition)
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+
+def query(sql, params=()):
+    """Runs a read-only SQL query against the store and returns a DataFrame."""
+    with closing(connect()) as con:
+        return pd.read_sql_query(sql, con, params=params)
+
+
+def select_players(columns, filters=None, order_by=None, ascending=False, limit=None):
+    """Returns the identity columns plus `columns` of the players matching `filters`."""
+    columns = [col for col in dict.fromkeys(columns) if col not in IDENTITY_COLUMNS]
+    selected = IDENTITY_COLUMNS + columns
+    _check_columns(selected + ([order_by] if order_by else []))
+
+    where, params = _where(filters)
+    sql = f"SELECT {', '.join(map(_quote, selected))} FROM {TABLE}{where}"
+    if order_by:
+        sql += f" ORDER BY {_quote(order_by)} {'ASC' if ascending else 'DESC'}"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(int(limit))
+    return query(sql, params)
+
+
+def count_players(filters=None):
+    """Returns the number of players matching `filters`."""
+    where, params = _where(filters)
+    with closing(connect()) as con:
+        return con.execute(f"SELECT COUNT(*) FROM {TABLE}{where}", params).fetchone()[0]
+
+
+def column_summary(column, filters=None):
+    """Returns the (max, mean) of a column over the players matching `filters`."""
+    where, params = _where(filters, not_null=[column])
+    sql = f"SELECT MAX({_quote(column)}), AVG({_quote(column)}) FROM {TABLE}{where}"
+    with closing(connect()) as con:
+        return con.execute(sql, params).fetchone()
+
+
+def leaderboard(stat, n=10, filters=None, columns=()):
+    """Returns the top `n` players by a stat, skipping players without a value."""
+    selected = IDENTITY_COLUMNS + [
+        col for col in dict.fromkeys([*columns, stat]) if col not in IDENTITY_COLUMNS
+    ]
+    _check_columns(selected)
+
+    where, params = _where(filters, not_null=[stat])
+    sql = (
+        f"SELECT {', '.join(map(_quote, selected))} FROM {TABLE}{where} "
+        f"ORDER BY {_quote(stat)} DESC LIMIT ?"
+    )
+    return query(sql, params + [int(n)])
+
+
+def percentiles(stat, filters=None):
+    """
+    Returns each player's percentile (0-100) for a stat within their primary position.
+
+    Matches `Series.rank(pct=True, method="max")`; players without a value are skipped.
+    """
+    where, params = _where(filters, not_null=[stat])
+    sql = (
+        f'SELECT "Player", "Team", "Primary Position", {_quote(stat)}, '
+        f'100.0 * CUME_DIST() OVER (PARTITION BY "Primary Position" '
+        f'ORDER BY {_quote(stat)}) AS "Percentile" FROM {TABLE}{where}'
+    )
+    return query(sql, params)
+
+
+def value_percentiles(values, filters=None):
+    """
+    Returns the percentile (0-100) of each {column: value} among the players matching `filters`.
+
+    For a player's own values this matches `Series.rank(pct=True)` (ties averaged);
+    missing values and columns without any value get NaN.
+    """
+    _check_columns(list(values))
+    counts, params = [], []
+    for column, value in values.items():
+        value = None if pd.isna(value) else float(value)
+        name = _quote(column)
+        counts.append(f"SUM({name} < ?), SUM({name} = ?), COUNT({name})")
+        params.extend([value, value])
+    where, filter_params = _where(filters)
+    sql = f"SELECT {', '.join(counts)} FROM {TABLE}{where}"
+    with closing(connect()) as con:
+        row = con.execute(sql, params + filter_params).fetchone()
+
+    result = {}
+    for i, (column, value) in enumerate(values.items()):
+        below, tied, count = row[3 * i : 3 * i + 3]
+        result[column] = (
+            (below + (tied + 1) / 2) / count * 100
+            if count and not pd.isna(value)
+            else float("nan")
+        )
+    return pd.Series(result, dtype="float64")
+
+
+def lookup_players(keys, columns):
+    """Returns the identity columns plus `columns` for a list of (Player, Team) keys."""
+    keys = list(dict.fromkeys(keys))
+    if not keys:
+        return pd.DataFrame(columns=IDENTITY_COLUMNS + list(columns))
+
+    columns = [col for col in dict.fromkeys(columns) if col not in IDENTITY_COLUMNS]
+    selected = IDENTITY_COLUMNS + columns
+    _check_columns(selected)
+    values = ", ".join("(?, ?)" for _ in keys)
+    sql = (
+        f"SELECT {', '.join(map(_quote, selected))} FROM {TABLE} "
+        f'WHERE ("Player", "Team") IN (VALUES {values}) ORDER BY rowid'
+    )
+    return query(sql, [value for key in keys for value in key])
@@ -0,0 +1,114 @@
+"""
+Squad-level tables built from the merged player data.
+
+Counting stats are summed per team, every other stat is averaged weighted by
+the minutes of the players who have a value, and each squad gets an age
+profile and its depth per primary position. Everything comes out of a single
+groupby over (Team, League), so the tables can be built once per dataset
+version and read by the pages as is.
+"""
+
+import numpy as np
+import pandas as pd
+from footverse.derived import PLAYING_TIME_COLUMNS, counting_stats
+
+TEAM_KEYS = ["Team", "League"]
+
+POSITIONS = ["GK", "DF", "MF", "FW"]
+
+# Upper age bound (exclusive) of each band; the last band is open-ended
+AGE_BANDS = {"U21": 21, "21-24": 25, "25-29": 30, "30+": np.inf}
+
+
+def _age_bands(age):
+    """Returns one 0/1 column per age band."""
+    bands, lower = {}, -np.inf
+    for band, upper in AGE_BANDS.items():
+        bands[band] = ((age >= lower) & (age < upper)).astype(float)
+        lower = upper
+    return bands
+
+
+def team_aggregates(merged_df):
+    """
+    Aggregates the players of every (Team, League).
+
+    Returns {"totals", "averages", "ages", "depth"}, four frames indexed by
+    (Team, League): summed counting and playing time stats, minutes-weighted
+    averages of the other stats, squad size with mean and minutes-weighted age
+    plus player counts per age band, and players and minutes share per primary
+    position.
+    """
+    stats = [col for col in merged_df.columns[7:] if col != "Primary Position"]
+    counted = set(counting_stats(stats)) | PLAYING_TIME_COLUMNS
+    summed = [col for col in stats if col in counted]
+    averaged = [col for col in stats if col not in summed]
+
+    minutes = merged_df["Minutes"].to_numpy(dtype="float64", na_value=np.nan)
+    minutes = np.nan_to_num(minutes)
+    age = merged_df["Age"].to_numpy(dtype="float64", na_value=np.nan)
+    primary_position = merged_df["Position"].str.split(",").str[0]
+
+    # Weighted means are (sum of value x minutes) / (sum of minutes), where
+    # only players with a value count towards the minutes
+    rates = merged_df[averaged].to_numpy(dtype="float64", na_value=np.nan)
+    has_rate = ~np.isnan(rates)
+    has_age = ~np.isnan(age)
+    blocks = {
+        "total": merged_df[summed].to_numpy(dtype="float64", na_value=np.nan),
+        "weighted": np.where(has_rate, rates * minutes[:, None], 0.0),
+        "weight": has_rate * minutes[:, None],
+        "ages": np.column_stack(
+            [
+                has_age,
+                np.nan_to_num(age),
+                np.where(has_age, age * minutes, 0.0),
+                has_age * minutes,
+                *_age_bands(age).values(),
+            ]
+        ),
+        "positions": np.column_stack(
+            [primary_position == position for position in POSITIONS]
+            + [
+                np.where(primary_position == position, minutes, 0.0)
+                for position in POSITIONS
+            ]
+        ).astype(float),
+    }
+
+    # The one grouped pass; min_count keeps all-missing totals missing
+    grouped = (
+        pd.DataFrame(np.hstack(list(blocks.values())), index=merged_df.index)
+        .groupby([merged_df[key] for key in TEAM_KEYS], sort=True)
+        .sum(min_count=1)
+    )
+    index, sums, start = grouped.index, grouped.to_numpy(), 0
+    for name, block in blocks.items():
+        blocks[name] = sums[:, start : start + block.shape[1]]
+        start += block.shape[1]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        averages = blocks["weighted"] / blocks["weight"]
+        ages = blocks["ages"]
+        squad, mean_age = ages[:, 0], ages[:, 1] / ages[:, 0]
+        weighted_age = ages[:, 2] / ages[:, 3]
+        positions = blocks["positions"]
+        team_minutes = positions[:, len(POSITIONS) :].sum(axis=1, keepdims=True)
+        minutes_share = positions[:, len(POSITIONS) :] / team_minutes * 100
+
+    return {
+        "totals": pd.DataFrame(blocks["total"], index=index, columns=summed),
+        "averages": pd.DataFrame(averages, index=index, columns=averaged),
+        "ages": pd.DataFrame(
+            np.column_stack([squad, mean_age, weighted_age, ages[:, 4:]]),
+            index=index,
+            columns=["Squad Size", "Average Age", "Minutes-Weighted Age"]
+            + list(AGE_BANDS),
+        ),
+        "depth": pd.DataFrame(
+            np.column_stack([positions[:, : len(POSITIONS)], minutes_share]),
+            index=index,
+            columns=[f"{position} Players" for position in POSITIONS]
+            + [f"{position} Minutes %" for position in POSITIONS],
+        ),
+    }
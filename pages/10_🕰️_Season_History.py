@@ -0,0 +1,159 @@
+import streamlit as st
+import numpy as np
+import pandas as pd
+from data.data_loader import (
+    column_options,
+    load_columns,
+    load_history,
+    stat_columns,
+    stored_seasons,
+)
+
+st.set_page_config(page_title="Season History", page_icon="🕰️", layout="wide")
+
+st.title("🕰️ Season History")
+st.caption(
+    "Follow a player through the seasons, or find who played like them years ago! 📅⚽"
+)
+st.divider()
+
+seasons = stored_seasons()
+if not seasons:
+    st.info(
+        "📦 No past seasons are stored yet. Load some with "
+        "`python scripts/load_history.py 2023-2024 2022-2023`."
+    )
+    st.stop()
+
+# Each query only reads the seasons and categories it needs
+with st.sidebar:
+    st.header("⚙️ Pick the Seasons")
+    selected_seasons = st.multiselect(
+        "📅 Seasons", seasons, default=seasons, help="Stored past seasons."
+    )
+
+stats_columns = stat_columns(derived=True)
+default_stats = [stat for stat in ("Goals", "Assists") if stat in stats_columns]
+
+
+@st.fragment
+def player_trend(selected_seasons):
+    """A player's stats season by season. Reruns on its own when its widgets change."""
+    players = load_history([], selected_seasons)
+    if players is None or players.empty:
+        st.warning("⚠️ No players stored for the selected seasons.")
+        return
+
+    player = st.selectbox(
+        "⚽ **Select a Player**", sorted(players["Player"].dropna().unique())
+    )
+    trend_stats = st.multiselect(
+        "📈 **Stats to Follow**", stats_columns, default=default_stats
+    )
+    if not trend_stats:
+        st.warning("⚠️ Please select at least **1 stat**.")
+        return
+
+    history_df = load_history(trend_stats, selected_seasons, {"Player": player})
+    current_df = load_columns(trend_stats)
+    if current_df is not None:
+        current_df = current_df[current_df["Player"] == player].assign(Season="Current")
+        history_df = pd.concat([history_df, current_df], ignore_index=True)
+
+    trend_df = history_df[["Season", "Team", *trend_stats]]
+
+    import plotly.express as px
+
+    chart = px.line(
+        trend_df.melt(["Season", "Team"], var_name="Stat", value_name="Value"),
+        x="Season",
+        y="Value",
+        color="Stat",
+        markers=True,
+        hover_data=["Team"],
+        title=f"📈 {player} Season by Season",
+    )
+    st.plotly_chart(chart, use_container_width=True)
+    st.dataframe(
+        trend_df.set_index("Season").style.format(precision=2),
+        use_container_width=True,
+    )
+
+
+@st.fragment
+def past_versions(selected_seasons):
+    """Past-season players closest to a current player. Reruns on its own when its widgets change."""
+    st.info(
+        "Finds the players of a past season whose stats were closest to a "
+        "current player's, among the same primary position."
+    )
+
+    col1, col2 = st.columns(2)
+    with col1:
+        player = st.selectbox("⚽ **Current Player**", column_options("Player"))
+    with col2:
+        season = st.selectbox("📅 **Past Season**", selected_seasons[::-1])
+    match_stats = st.multiselect(
+        "📊 **Stats to Match**",
+        stats_columns,
+        default=[
+            stat
+            for stat in ("Goals p90", "Assists p90", "Key Passes", "Tackles")
+            if stat in stats_columns
+        ],
+    )
+    if not match_stats or season is None:
+        st.warning("⚠️ Please select a season and at least **1 stat**.")
+        return
+
+    current_df = load_columns(match_stats)
+    if current_df is None:
+        return
+    target = current_df[current_df["Player"] == player].iloc[:1]
+    if target.empty:
+        st.warning("⚠️ Player not found in the current season.")
+        return
+    position = target["Primary Position"].iloc[0]
+
+    past_df = load_history(match_stats, [season], {"Primary Position": position})
+    if past_df is None or past_df.empty:
+        st.warning(f"⚠️ No {position}s stored for {season}.")
+        return
+
+    # Standardised with the past season's spread, so each stat weighs the same
+    past_stats = past_df[match_stats].astype("float64")
+    mean, std = past_stats.mean(), past_stats.std().replace(0, 1)
+    past_z = ((past_stats - mean) / std).fillna(0).to_numpy()
+    target_z = ((target[match_stats].astype("float64") - mean) / std).fillna(0)
+    distances = np.linalg.norm(past_z - target_z.to_numpy(), axis=1)
+
+    closest = past_df.assign(**{"Similarity Score": 100 / (1 + distances)}).nlargest(
+        10, "Similarity Score"
+    )
+    st.subheader(f"🪞 **The {season} Versions of :blue[{player}]**")
+    st.dataframe(
+        pd.concat([target.assign(Season="Current"), closest], ignore_index=True)[
+            [
+                "Season",
+                "Player",
+                "Team",
+                "League",
+                "Age",
+                *match_stats,
+                "Similarity Score",
+            ]
+        ]
+        .set_index("Player")
+        .style.format(precision=2)
+        .format({"Similarity Score": "{:.1f}%"}, na_rep="—"),
+        use_container_width=True,
+    )
+
+
+tabs = st.tabs(["📈 Player Trend", "🪞 Past Versions"])
+
+with tabs[0]:
+    player_trend(selected_seasons)
+
+with tabs[1]:
+    past_versions(selected_seasons)
@@ -0,0 +1,134 @@
+import streamlit as st
+from data.data_loader import load_form, load_json, load_match_logs
+from footverse.matchlogs import FORM_WINDOW, HALF_LIFE_DAYS, form_index
+
+st.set_page_config(page_title="Form Guide", page_icon="🔥", layout="wide")
+
+st.title("🔥 Form Guide")
+st.caption("Season totals hide form. See who is on fire right now! 🔥⚽")
+st.divider()
+
+# Updated with the matches stored since the last visit, never recomputed
+form = load_form()
+if form is None:
+    st.info(
+        "📦 No match logs are stored yet. Add some with "
+        "`python scripts/ingest_match_logs.py <fbref match-log URL or CSV>`."
+    )
+    st.stop()
+
+st.caption(f"🗓️ Latest match: **{form.reference:%d %b %Y}**")
+
+with st.sidebar:
+    st.header("⚙️ Form Settings")
+    mode = st.radio(
+        "📐 **Form Measure**",
+        [f"🔁 Last {form.window} Matches", "📉 Time-Decayed"],
+        help=(
+            f"Time-decayed stats weigh every match by 0.5 per {form.half_life} days "
+            "before the latest match."
+        ),
+    )
+    table = form.rolling_table() if mode.startswith("🔁") else form.decayed_table()
+    min_90s = st.slider(
+        "⏳ **Minimum 90s Played**",
+        0.0,
+        float(form.window),
+        1.0,
+        0.5,
+        help="For time-decayed form, the decayed 90s.",
+    )
+
+metric_weights = load_json("config/performance-index-weights.json")
+
+
+@st.fragment
+def in_form(table):
+    """Ranks players by a Performance Index category. Reruns on its own."""
+    scores = form_index(table, metric_weights, min_90s)
+    categories = [col for col in metric_weights if col in scores.columns]
+    if not categories:
+        st.warning("⚠️ Not enough players or stats in the logs to score.")
+        return
+
+    col1, col2 = st.columns(2)
+    with col1:
+        category = st.selectbox("🧠 **Performance Index Category**", categories)
+    with col2:
+        leagues = st.multiselect(
+            "🌍 **Leagues**", sorted(scores["League"].dropna().unique())
+        )
+    if leagues:
+        scores = scores[scores["League"].isin(leagues)]
+
+    metrics = [metric for metric in metric_weights[category] if metric in table]
+    st.caption(f"🔍 Scored on {', '.join(metrics)}")
+    ranked = scores.merge(table[["Player", "Team", *metrics]], on=["Player", "Team"])
+    st.dataframe(
+        ranked.sort_values(category, ascending=False)
+        .head(50)
+        .set_index("Player")[
+            ["Team", "League", "Position", "Matches Played", "90s", category, *metrics]
+        ]
+        .style.background_gradient(cmap="RdYlGn", subset=[category])
+        .format(precision=2),
+        use_container_width=True,
+    )
+
+
+@st.fragment
+def player_form(table):
+    """A player's matches with their rolling average. Reruns on its own."""
+    col1, col2 = st.columns(2)
+    with col1:
+        player = st.selectbox(
+            "⚽ **Select a Player**", sorted(table["Player"].unique())
+        )
+    stats = [col for col in table.columns if col.endswith(" p90")]
+    with col2:
+        stat = st.selectbox(
+            "📈 **Select a Stat**",
+            [stat.removesuffix(" p90") for stat in stats],
+        )
+
+    matches = load_match_logs([player])
+    if matches is None or matches.empty:
+        return
+    matches = matches.assign(
+        **{
+            "Per 90": matches[stat] / matches["Minutes"] * 90,
+            f"Last {FORM_WINDOW} Matches p90": matches[stat]
+            .rolling(FORM_WINDOW, min_periods=1)
+            .sum()
+            / matches["Minutes"].rolling(FORM_WINDOW, min_periods=1).sum()
+            * 90,
+        }
+    )
+
+    import plotly.express as px
+
+    chart = px.line(
+        matches,
+        x="Date",
+        y=["Per 90", f"Last {FORM_WINDOW} Matches p90"],
+        markers=True,
+        hover_data=["Team", "Minutes", stat],
+        title=f"📈 {player}: {stat} per 90, match by match",
+    )
+    st.plotly_chart(chart, use_container_width=True)
+
+
+tabs = st.tabs(["🔥 In Form", "📈 Player Form"])
+
+with tabs[0]:
+    in_form(table)
+
+with tabs[1]:
+    player_form(table)
+
+with st.expander("**About the Form Measures**", expanded=False, icon="ℹ️"):
+    st.markdown(f"""
+- **Last {FORM_WINDOW} Matches** sums each player's stats over their latest {FORM_WINDOW} matches for the same team.
+- **Time-Decayed** sums every match, weighted by 0.5 per {HALF_LIFE_DAYS} days before the latest stored match, so recent matches count most while older ones fade out.
+- Per-90 stats divide by the (decayed) minutes, and the Performance Index categories use the same weights as the season index, as percentiles among the players shown.
+""")
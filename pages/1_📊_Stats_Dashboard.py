@@ -1,7 +1,22 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-from data.data_loader import store_session_data
+from components.search import sidebar_search
+from components.tables import MAX_STYLED_ROWS, top_rows
+from data.data_loader import (
+    FILTER_HELP,
+    column_options,
+    column_summary,
+    count_players,
+    dataset_version,
+    expression_filter,
+    leaderboard,
+    load_columns,
+    select_players,
+    show_data_age,
+    sql_store_ready,
+    stat_columns,
+)
+from footverse.scoring import skyline
 
 # Page Configuration
 st.set_page_config(page_title="Stats Dashboard", page_icon="📊", layout="wide")
@@ -13,18 +28,19 @@ st.caption(
 )
 st.divider()
 
-# Load data if not in session state
-if "merged_data" not in st.session_state:
-    store_session_data()
-
-# Retrieve session data
-merged_df = st.session_state.merged_data
-stats_columns = merged_df.columns[7:]
+# Stat names come from the table schemas (plus the derived per-90, per-touch and
+# team share stats); each chart only loads the tables it needs
+stats_columns = stat_columns(derived=True)
 
+# With the SQL store, filters and rankings run as queries instead of on frames
+use_store = sql_store_ready()
+players_df = None if use_store else load_columns(["Minutes"])
+show_data_age()
+if not use_store and players_df is None:
+    st.stop()
 
-# Helper function to get unique sorted values
-def unique_sorted_list(column):
-    return sorted(merged_df[column].dropna().astype(str).unique().tolist())
+# The player search shared by the pages; a pick opens the player's Scout Report
+sidebar_search(load_columns([]) if use_store else players_df, dataset_version())
 
 
 # Sidebar Filters
@@ -34,17 +50,17 @@ with st.sidebar:
     filters = {
         "Leagues": st.pills(
             "🌍 Select Leagues",
-            options=unique_sorted_list("League"),
+            options=column_options("League"),
             selection_mode="multi",
         ),
         "Teams": st.multiselect(
             "🏆 Choose Teams",
-            options=unique_sorted_list("Team"),
+            options=column_options("Team"),
             placeholder="Pick your favorite teams",
         ),
         "Nations": st.multiselect(
             "🌎 Select Nationalities",
-            options=unique_sorted_list("Nationality"),
+            options=column_options("Nationality"),
             placeholder="Filter by country",
         ),
         "Positions": st.segmented_control(
@@ -59,37 +75,123 @@ with st.sidebar:
             (15, 50),
             help="Select the age range of players to analyze.",
         ),
+        "Expression": expression_filter(
+            st.text_input(
+                "🧮 Custom Filter",
+                placeholder='Age < 23 and "xG p90" > 0.35',
+                help=FILTER_HELP,
+            )
+        ),
+    }
+
+
+def filter_columns(filters):
+    """Returns the columns the custom filter expression reads."""
+    expression = filters["Expression"]
+    return list(expression.columns) if expression is not None else []
+
+
+def apply_filters(df, filters):
+    """Returns the players matching the sidebar filters (one combined mask)."""
+    filter_conditions = {
+        "League": filters["Leagues"],
+        "Team": filters["Teams"],
+        "Nationality": filters["Nations"],
+        "Primary Position": filters["Positions"],
     }
 
-# Apply Filters
-filtered_df = merged_df.copy()
-filtered_df["Primary Position"] = filtered_df["Position"].str.split(",").str[0]
+    mask = pd.Series(True, index=df.index)
+    for column, values in filter_conditions.items():
+        if values:
+            mask &= df[column].isin(values)
+
+    if filters["Age"] != (15, 50):
+        mask &= df["Age"].between(*filters["Age"])
+
+    if filters["Expression"] is not None:
+        mask &= filters["Expression"].mask(df)
+
+    return df[mask]
+
+
+def store_filters(filters):
+    """Translates the sidebar filters into SQL store conditions."""
+    return {
+        "League": filters["Leagues"],
+        "Team": filters["Teams"],
+        "Nationality": filters["Nations"],
+        "Primary Position": filters["Positions"],
+        "Age": filters["Age"] if filters["Age"] != (15, 50) else None,
+    }
+
+
+def filtered_players(columns, filters, order_by=None):
+    """Returns the filtered players, from the SQL store when it is enabled."""
+    columns = columns + filter_columns(filters)
+    if not use_store:
+        df = load_columns(columns)
+        if df is None:
+            # load_columns already showed why
+            st.stop()
+        return apply_filters(df, filters)
 
-filter_conditions = {
-    "League": filters["Leagues"],
-    "Team": filters["Teams"],
-    "Nationality": filters["Nations"],
-    "Primary Position": filters["Positions"],
-}
+    df = select_players(columns, store_filters(filters), order_by=order_by)
+    if filters["Expression"] is not None:
+        df = df[filters["Expression"].mask(df)]
+    return df
 
-for col, values in filter_conditions.items():
-    if values:
-        filtered_df = filtered_df[filtered_df[col].isin(values)]
 
-if filters["Age"] != (15, 50):
-    filtered_df = filtered_df[filtered_df["Age"].between(*filters["Age"])]
+def players_found(filters):
+    """Checks whether any player matches the filters (a COUNT(*) in the SQL store)."""
+    if use_store and filters["Expression"] is None:
+        return count_players(store_filters(filters)) > 0
+    return not filtered_players(["Minutes"], filters).empty
 
-filtered_df.drop(columns=["Primary Position"], errors="ignore", inplace=True)
 
-if filtered_df.empty:
+def minutes_slider(high, mean):
+    """Returns the minimum minutes played chosen for per-90 stats."""
+    return st.slider(
+        "⏳ **Minimum Minutes Played**",
+        0,
+        int(high),
+        int(mean),
+        help="Filter players based on game time.",
+    )
+
+
+def ranked_players(stat, filters):
+    """
+    Returns the filtered players ranked by a stat, after the minutes filter.
+
+    Without a custom expression the SQL store returns just the displayed top
+    players; otherwise the filtered players are ranked here.
+    """
+    if use_store and filters["Expression"] is None:
+        conditions = store_filters(filters)
+        if "p90" in stat:
+            high, mean = column_summary("Minutes", conditions)
+            conditions["Minutes"] = (minutes_slider(high or 0, mean or 0), None)
+        return leaderboard(stat, MAX_STYLED_ROWS, conditions, columns=["Minutes"])
+
+    filtered_df = filtered_players(["Minutes", stat], filters, order_by=stat)
+    if "p90" in stat:
+        min_minutes = minutes_slider(
+            filtered_df["Minutes"].max(), filtered_df["Minutes"].mean()
+        )
+        filtered_df = filtered_df[filtered_df["Minutes"] >= min_minutes]
+    return filtered_df
+
+
+if not players_found(filters):
     st.error(
         "No players found based on the selected filters. Please adjust your search."
     )
     st.stop()
 
-tabs = st.tabs(["🔢 Overall Player Performance", "🔄 Multi-Stat Comparison"])
 
-with tabs[0]:
+@st.fragment
+def overall_performance(filters):
+    """Top players by a single stat. Reruns on its own when its widgets change."""
     st.info("Analyze player performances based on key performance metrics.")
 
     stat = st.selectbox(
@@ -106,17 +208,11 @@ with tabs[0]:
         help="Adjust the number of top-performing players shown.",
     )
 
-    if "p90" in stat:
-        min_minutes = st.slider(
-            "⏳ **Minimum Minutes Played**",
-            0,
-            int(filtered_df["Minutes"].max()),
-            int(filtered_df["Minutes"].mean()),
-            help="Filter players based on game time.",
-        )
-        filtered_df = filtered_df[filtered_df["Minutes"] >= min_minutes]
+    filtered_df = ranked_players(stat, filters)
 
     # Plot Chart
+    import plotly.express as px
+
     stat_chart = px.bar(
         filtered_df.nlargest(top_n, stat),
         x="Player",
@@ -132,23 +228,38 @@ with tabs[0]:
         f"📜 **View Complete List of Top Players by {stat}**", expanded=False
     ):
         st.dataframe(
-            filtered_df.iloc[:, :6]
-            .join(filtered_df[[stat]])
-            .sort_values(stat, ascending=False)
+            top_rows(
+                filtered_df.iloc[:, :6]
+                .join(filtered_df[[stat]])
+                .sort_values(stat, ascending=False)
+            )
             .style.background_gradient(cmap="RdYlGn", subset=[stat])
             .format({"Age": "{:.3f}"})
         )
 
-with tabs[1]:
+
+@st.fragment
+def multi_stat_comparison(filters):
+    """Top players across several stats. Reruns on its own when its widgets change."""
     st.info("Compare player performances across multiple statistics.")
 
-    # Select 2 or 3 Stats
+    mode = st.radio(
+        "🧭 **Ranking Mode**",
+        ["➕ Stat Sum", "🏔️ Skyline"],
+        horizontal=True,
+        help=(
+            "Stat Sum ranks players by the total of 2 or 3 stats. Skyline keeps "
+            "every player that no other player beats on all of the chosen stats, "
+            "so specialists are not hidden."
+        ),
+    )
+
+    # Same widget in both modes so switching keeps the selection
     selected_stats = st.multiselect(
-        "📈 Choose 2 or 3 Stats for Comparison",
+        "📈 Choose Stats for Comparison",
         options=stats_columns,
         default=stats_columns[4:6],
-        max_selections=3,
-        help="Select multiple statistics to compare player performances.",
+        help="Select 2 or 3 statistics for Stat Sum, or 2 or more for Skyline.",
     )
 
     top_n_multi = st.slider(
@@ -161,11 +272,25 @@ with tabs[1]:
 
     if len(selected_stats) < 2:
         st.warning("⚠️ Please select at least **2 stats** to compare.")
+    elif mode == "🏔️ Skyline":
+        by_position = st.toggle(
+            "📏 Compare Within Position",
+            help="Compare each stat as a percentile among players of the same primary position.",
+        )
+        skyline_comparison(filters, selected_stats, top_n_multi, by_position)
+    elif len(selected_stats) > 3:
+        st.warning("⚠️ Stat Sum compares up to **3 stats**. Use **Skyline** for more.")
     else:
+        filtered_df = filtered_players(selected_stats, filters)
+
         # Compute total ranking score by summing selected statistics
-        filtered_df["Stat_Sum"] = filtered_df[selected_stats].sum(axis=1)
+        filtered_df = filtered_df.assign(
+            Stat_Sum=filtered_df[selected_stats].sum(axis=1)
+        )
         top_players_multi_df = filtered_df.nlargest(top_n_multi, "Stat_Sum")
 
+        import plotly.express as px
+
         if len(selected_stats) == 2:
             # 2D Scatter Plot
             scatter_fig = px.scatter(
@@ -174,7 +299,7 @@ with tabs[1]:
                 y=selected_stats[1],
                 color="Player",
                 hover_data=["Team", "Age"],
-                title=f"🏆 Top {top_n} Players by {selected_stats[0]} vs {selected_stats[1]}",
+                title=f"🏆 Top {top_n_multi} Players by {selected_stats[0]} vs {selected_stats[1]}",
                 size="Stat_Sum",
             )
         else:
@@ -186,7 +311,7 @@ with tabs[1]:
                 z=selected_stats[2],
                 color="Player",
                 hover_data=["Team", "Age"],
-                title=f"🏆 Top {top_n} Players by {selected_stats[0]} vs {selected_stats[1]} vs {selected_stats[2]}",
+                title=f"🏆 Top {top_n_multi} Players by {selected_stats[0]} vs {selected_stats[1]} vs {selected_stats[2]}",
                 size="Stat_Sum",
             )
 
@@ -207,13 +332,87 @@ with tabs[1]:
 
             # Display Data with Proper Formatting
             st.dataframe(
-                filtered_df.iloc[:, :6]
-                .join(filtered_df[selected_stats])
-                .join(filtered_df["Stat_Sum"])
-                .sort_values("Stat_Sum", ascending=False)
-                .drop(columns=["Stat_Sum"])  # Remove helper column
+                top_rows(
+                    filtered_df.iloc[:, :6]
+                    .join(filtered_df[selected_stats])
+                    .join(filtered_df["Stat_Sum"])
+                    .sort_values("Stat_Sum", ascending=False)
+                    .drop(columns=["Stat_Sum"])  # Remove helper column
+                )
                 .style.background_gradient(cmap="RdYlGn", subset=selected_stats)
                 .format(format_dict)  # Apply dynamic formatting
             )
 
+
+def skyline_comparison(filters, selected_stats, top_n, by_position):
+    """Players no one else beats on every selected stat (the Pareto front)."""
+    filtered_df = filtered_players(selected_stats, filters)
+    front_df = skyline(filtered_df, selected_stats, by_position).sort_values(
+        "Skyline Score", ascending=False
+    )
+    percentile_columns = [f"{stat} Percentile" for stat in selected_stats]
+
+    st.success(
+        f"🏔️ **{len(front_df)}** of {len(filtered_df)} players are not beaten "
+        "on every selected stat by anyone else."
+    )
+
+    import plotly.express as px
+
+    if len(selected_stats) == 2:
+        # The frontier against everyone else
+        on_skyline = pd.Series(False, index=filtered_df.index)
+        on_skyline[front_df.index] = True
+        scatter_fig = px.scatter(
+            filtered_df.assign(**{"On Skyline": on_skyline}),
+            x=selected_stats[0],
+            y=selected_stats[1],
+            color="On Skyline",
+            color_discrete_map={True: "#FF4500", False: "#D3D3D3"},
+            hover_data=["Player", "Team", "Age"],
+            title=f"🏔️ Skyline of {selected_stats[0]} vs {selected_stats[1]}",
+        )
+    elif len(selected_stats) == 3:
+        scatter_fig = px.scatter_3d(
+            front_df.head(top_n),
+            x=selected_stats[0],
+            y=selected_stats[1],
+            z=selected_stats[2],
+            color="Player",
+            hover_data=["Team", "Age"],
+            title=f"🏔️ Top {top_n} Skyline Players by {', '.join(selected_stats)}",
+            size="Skyline Score",
+        )
+    else:
+        # One line per player across the percentiles of every stat
+        scatter_fig = px.parallel_coordinates(
+            front_df.head(top_n),
+            dimensions=percentile_columns,
+            color="Skyline Score",
+            color_continuous_scale="RdYlGn",
+            labels={col: col.removesuffix(" Percentile") for col in percentile_columns},
+            title=f"🏔️ Top {top_n} Skyline Players (percentiles)",
+        )
+
+    st.plotly_chart(scatter_fig, use_container_width=True)
+
+    with st.expander(
+        f"📜 **View All {len(front_df)} Skyline Players**", expanded=False
+    ):
+        st.dataframe(
+            front_df.iloc[:, :6]
+            .join(front_df[selected_stats + ["Skyline Score"]])
+            .style.background_gradient(cmap="RdYlGn", subset=selected_stats)
+            .format({"Age": "{:.3f}", "Skyline Score": "{:.1f}"}, precision=3)
+        )
+
+
+tabs = st.tabs(["🔢 Overall Player Performance", "🔄 Multi-Stat Comparison"])
+
+with tabs[0]:
+    overall_performance(filters)
+
+with tabs[1]:
+    multi_stat_comparison(filters)
+
 st.divider()
@@ -1,145 +1,156 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
-import plotly.graph_objects as go
 import random
+from components.distributions import distribution_chart
+from components.search import search_matches
 from data.data_loader import store_session_data
+from footverse.precompute import (
+    player_row_lookup,
+    position_range_table,
+    stat_distributions,
+)
 
 st.set_page_config(page_title="Player Comparison", page_icon="⚖️", layout="wide")
 
 st.title("⚖️ **Player Comparison**")
-st.caption("Compare two football stars and see who dominates the field! ⚽🌟")
+st.caption("Compare up to 10 football stars and see who dominates the field! ⚽🌟")
 st.divider()
 
-# Load data if not available
-if "merged_data" not in st.session_state or "data" not in st.session_state:
-    store_session_data()
+# Load the latest available data (expired tables refresh in the background)
+store_session_data()
 
 merged_df = st.session_state.merged_data
+primary_position = st.session_state.primary_position
 data = st.session_state.data
 stats_columns = merged_df.columns[7:]
 
 
-def random_selection():
-    """Randomly selects a league, team, position, and player."""
-    league = random.choice(sorted(merged_df["League"].unique()))
-    team = random.choice(
-        sorted(merged_df.loc[merged_df["League"] == league, "Team"].unique())
-    )
-
-    df = merged_df.query("League == @league and Team == @team").copy()
-    df["Primary Position"] = df["Position"].str.split(",").str[0]
-
-    position = random.choice(["GK", "DF", "MF", "FW"])
-    players = sorted(df.loc[df["Primary Position"] == position, "Player"].unique())
-
-    if not players:
-        return random_selection()
-
-    player = random.choice(players)
-    return league, team, position, player
-
-
-# Ensure initial player selection
-if "player1" not in st.session_state or "player2" not in st.session_state:
-    while True:
-        league1, team1, position1, player1 = random_selection()
-        league2, team2, position2, player2 = random_selection()
-        if player1 != player2:
-            st.session_state.player1 = (league1, team1, position1, player1)
-            st.session_state.player2 = (league2, team2, position2, player2)
+# Up to this many players share one radar and table
+MAX_PLAYERS = 10
+
+# Radar colours, one per player
+COLORS = [
+    "0, 191, 255",
+    "255, 69, 0",
+    "50, 205, 50",
+    "255, 215, 0",
+    "186, 85, 211",
+    "255, 105, 180",
+    "0, 206, 209",
+    "255, 140, 0",
+    "154, 205, 50",
+    "240, 128, 128",
+]
+
+version = st.session_state.data_version
+row_lookup = player_row_lookup(merged_df, version)
+player_keys = list(row_lookup)
+
+
+def player_label(key):
+    """Formats a (Player, Team) key for the selectors."""
+    player, team = key
+    return f"{player} ({team})"
+
+
+def random_selection(count=2):
+    """Picks random players from different teams for a quick start."""
+    keys = random.sample(player_keys, min(count * 5, len(player_keys)))
+    picked, teams = [], set()
+    for key in keys:
+        if key[1] not in teams:
+            picked.append(key)
+            teams.add(key[1])
+        if len(picked) == count:
             break
-
-
-def player_selection(column, key):
-    """Handles league, team, position, and player selection within a column."""
-    league, team, position, player = st.session_state[key]
-
-    with column:
-        color = ":blue" if key == "player1" else ":red"
-        st.subheader(f"{color}[**Player {key[-1]}**]")
-
-        selected_league = st.radio(
-            "🏆 **Choose a League:**",
-            sorted(merged_df["League"].unique()),
-            key=f"{key}_league",
-            index=list(sorted(merged_df["League"].unique())).index(league),
+    return picked
+
+
+def add_player(key):
+    """Adds a searched player to the comparison (callback of the add button)."""
+    selected = st.session_state.comparison_players
+    if key not in selected and len(selected) < MAX_PLAYERS:
+        st.session_state.comparison_players = selected + [key]
+
+
+# Ensure initial player selection (drops players missing from a newer dataset)
+st.session_state.comparison_players = [
+    key for key in st.session_state.get("comparison_players", []) if key in row_lookup
+] or random_selection()
+
+search_col, add_col = st.columns([3, 1], vertical_alignment="bottom")
+with search_col:
+    _, matches = search_matches(merged_df, version, "🔎 **Search a Player:**")
+if matches is not None:
+    match_keys = list(zip(matches["Player"], matches["Team"]))
+    match = st.selectbox("✨ **Best Matches:**", match_keys, format_func=player_label)
+    with add_col:
+        st.button(
+            "➕ Add to Comparison",
+            on_click=add_player,
+            args=(match,),
+            disabled=len(st.session_state.comparison_players) >= MAX_PLAYERS,
+            use_container_width=True,
         )
 
-        teams = sorted(
-            merged_df.loc[merged_df["League"] == selected_league, "Team"].unique()
-        )
-        selected_team = st.selectbox(
-            "⚔️ **Pick a Team:**",
-            teams,
-            key=f"{key}_team",
-            index=teams.index(team) if team in teams else 0,
-        )
-
-        df = merged_df.query(
-            "League == @selected_league and Team == @selected_team"
-        ).copy()
-        df["Primary Position"] = df["Position"].str.split(",").str[0]
-
-        selected_position = st.selectbox(
-            "🔄 **Choose Position:**",
-            ["GK", "DF", "MF", "FW"],
-            key=f"{key}_position",
-            index=["GK", "DF", "MF", "FW"].index(position),
-        )
+selected_keys = st.multiselect(
+    f"👥 **Players to Compare (up to {MAX_PLAYERS}):**",
+    player_keys,
+    key="comparison_players",
+    format_func=player_label,
+    max_selections=MAX_PLAYERS,
+)
 
-        players = sorted(
-            df.loc[df["Primary Position"] == selected_position, "Player"].unique()
-        )
+st.divider()
 
-        if key == "player2" and st.session_state.player1[3] in players:
-            players.remove(st.session_state.player1[3])
 
-        selected_player = st.selectbox(
-            "⭐ **Select a Player:**",
-            players,
-            key=f"{key}_player",
-            index=players.index(player) if player in players else 0,
-        )
-
-        st.session_state[key] = (
-            selected_league,
-            selected_team,
-            selected_position,
-            selected_player,
-        )
-
-        return (
-            df[df["Player"] == selected_player].reset_index(drop=True),
-            selected_player,
+def highlight(row):
+    """Highlights the best stat in green and the lowest one in red."""
+    if row.isna().any():
+        return ["color: gray;"] * len(row)  # Gray for missing values
+    if row.max() == row.min():
+        return ["color: white; font-weight: bold;"] * len(row)  # Equal values
+    return [
+        (
+            "color: limegreen; font-weight: bold;"
+            if value == row.max()
+            else "color: tomato;" if value == row.min() else ""
         )
+        for value in row
+    ]
 
 
-lc, rc = st.columns(2)
-player1_df, player1 = player_selection(lc, "player1")
-player2_df, player2 = player_selection(rc, "player2")
-
-st.divider()
-
-
-def highlight(row):
-    """Highlights the better stat in green and the lower one in red."""
-    val1, val2 = row.iloc[0], row.iloc[1]
+@st.fragment
+def plot_radar_chart(selected_keys):
+    """
+    Displays a radar chart and a stat table comparing the selected players.
 
-    if pd.isna(val1) or pd.isna(val2):
-        return ["color: gray;"] * 2  # Gray for missing values
+    Runs as a fragment, so changing the category or stat selection only redraws
+    this section.
+    """
+    df_columns = {
+        name.replace(" Data", ""): list(df.columns) for name, df in data.items()
+    }
+    categories = list(df_columns.keys())
 
-    if val1 > val2:
-        return ["color: limegreen; font-weight: bold;", "color: tomato;"]
-    elif val2 > val1:
-        return ["color: tomato;", "color: limegreen; font-weight: bold;"]
-    else:
-        return ["color: white; font-weight: bold;"] * 2  # Equal values
+    category_choice = st.selectbox(
+        "📂 **Select a Stat Category:**",
+        categories,
+        index=0,
+        help="Pick a category to compare players in.",
+    )
 
+    columns = (
+        df_columns[category_choice][11:]
+        if category_choice in ["Standard", "Goalkeeping"]
+        else df_columns[category_choice]
+    )
 
-def plot_radar_chart(columns):
-    """Displays a radar chart for comparing two players."""
     normalize = st.checkbox(
-        "📏 Normalize Values", help="Rescales stats for better comparison.", value=True
+        "📏 Normalize Values",
+        help="Rescales each stat between the minimum and maximum of the player's position.",
+        value=True,
     )
 
     selected_stats = (
@@ -154,48 +165,64 @@ def plot_radar_chart(columns):
         else columns
     )
 
-    # Get positions of both players
-    pos1, pos2 = st.session_state.player1[2], st.session_state.player2[2]
-
-    # Filter dataset by player positions
-    merged_df["Primary Position"] = merged_df["Position"].str.split(",").str[0]
-    pos1_df = merged_df[merged_df["Primary Position"] == pos1]
-    pos2_df = merged_df[merged_df["Primary Position"] == pos2]
+    if not selected_stats:
+        st.warning("⚠️ No data available for selected players in this category!")
+        return
 
-    stats_p1, stats_p2 = player1_df[selected_stats], player2_df[selected_stats]
+    # One row lookup per player; position ranges are precomputed per dataset version
+    players_df = merged_df.iloc[[row_lookup[key] for key in selected_keys]]
+    positions = primary_position.iloc[[row_lookup[key] for key in selected_keys]]
+    stats = players_df[selected_stats].astype("float64")
 
     if normalize:
-        # Normalize each player's stats based on their position group
-        min_vals_p1, max_vals_p1 = (
-            pos1_df[selected_stats].min(),
-            pos1_df[selected_stats].max(),
+        ranges = position_range_table(merged_df, version)
+        # Positions without a range (e.g. no primary position) get empty rows
+        min_vals = ranges.reindex([(pos, 0.0) for pos in positions])[selected_stats]
+        max_vals = ranges.reindex([(pos, 1.0) for pos in positions])[selected_stats]
+        stats = (stats.to_numpy() - min_vals.to_numpy()) / (
+            max_vals.to_numpy() - min_vals.to_numpy()
         )
-        min_vals_p2, max_vals_p2 = (
-            pos2_df[selected_stats].min(),
-            pos2_df[selected_stats].max(),
-        )
-
-        stats_p1 = (stats_p1 - min_vals_p1) / (max_vals_p1 - min_vals_p1)
-        stats_p2 = (stats_p2 - min_vals_p2) / (max_vals_p2 - min_vals_p2)
-
-    if stats_p1.empty or stats_p2.empty:
-        st.warning("⚠️ No data available for selected players in this category!")
-        return
+        unranged = [
+            player_label(key)
+            for key, pos in zip(selected_keys, positions)
+            if pd.isna(pos) or (pos, 0.0) not in ranges.index
+        ]
+        if unranged:
+            st.caption(
+                f"⚠️ No position to normalize against for {', '.join(unranged)}."
+            )
+    else:
+        stats = stats.to_numpy()
 
-    merged_df.drop(columns=["Primary Position"], inplace=True)
+    import plotly.graph_objects as go
 
     fig = go.Figure()
-    colors = ["rgba(0, 191, 255, 0.4)", "rgba(255, 69, 0, 0.4)"]
 
-    for player, stats, color in zip([player1, player2], [stats_p1, stats_p2], colors):
+    for (player, team), values, color in zip(selected_keys, stats, COLORS):
         fig.add_trace(
             go.Scatterpolar(
-                r=stats.values.flatten(),
+                r=values,
                 theta=selected_stats,
                 fill="toself",
-                name=player,
-                fillcolor=color,
-                line=dict(color=color.replace("0.4", "1"), width=2),
+                name=f"{player} ({team})",
+                fillcolor=f"rgba({color}, 0.25)",
+                line=dict(color=f"rgba({color}, 1)", width=2),
+            )
+        )
+
+    # The median player of the first player's position, for reference
+    reference = positions.iloc[0]
+    has_reference = not pd.isna(reference)
+    if normalize and has_reference and (reference, 0.5) in ranges.index:
+        median = ranges.loc[(reference, 0.5), selected_stats].to_numpy()
+        low = ranges.loc[(reference, 0.0), selected_stats].to_numpy()
+        high = ranges.loc[(reference, 1.0), selected_stats].to_numpy()
+        fig.add_trace(
+            go.Scatterpolar(
+                r=(median - low) / (high - low),
+                theta=selected_stats,
+                name=f"Median {reference}",
+                line=dict(color="rgba(200, 200, 200, 0.8)", width=1, dash="dash"),
             )
         )
 
@@ -212,36 +239,47 @@ def plot_radar_chart(columns):
     st.plotly_chart(fig, use_container_width=True)
 
     comparison_df = pd.DataFrame(
-        {
-            player1: player1_df[selected_stats].values.flatten(),
-            player2: player2_df[selected_stats].values.flatten(),
-        },
+        players_df[selected_stats].to_numpy(dtype="float64", na_value=np.nan).T,
         index=selected_stats,
+        columns=[player_label(key) for key in selected_keys],
     )
 
     with st.expander("📊 **Stat Breakdown Table**", expanded=False):
         st.dataframe(comparison_df.style.apply(highlight, axis=1).format(precision=2))
 
+    with st.expander("📈 **Distributions**", expanded=False):
+        # Precomputed histograms, so each chart is a lookup
+        distributions = stat_distributions(merged_df, version)
+        if not has_reference or reference not in distributions.positions():
+            st.caption(
+                f"⚠️ No position to compare against for {player_label(selected_keys[0])}."
+            )
+            return
+        st.caption(
+            f"Where each player sits among all {reference}s (the first player's position)."
+        )
+        distribution_stats = st.multiselect(
+            "📊 Stats to Plot", selected_stats, default=selected_stats[:4]
+        )
+        chart_columns = st.columns(2)
+        for i, stat in enumerate(distribution_stats):
+            markers = [
+                (player, value, color)
+                for (player, _), value, color in zip(
+                    selected_keys, comparison_df.loc[stat], COLORS
+                )
+            ]
+            with chart_columns[i % 2]:
+                st.plotly_chart(
+                    distribution_chart(distributions, stat, reference, markers),
+                    use_container_width=True,
+                )
 
-if "data" in st.session_state:
-    df_columns = {
-        name.replace(" Data", ""): list(df.columns) for name, df in data.items()
-    }
-    categories = list(df_columns.keys())
-
-    category_choice = st.selectbox(
-        "📂 **Select a Stat Category:**",
-        categories,
-        index=0,
-        help="Pick a category to compare players in.",
-    )
-
-    selected_columns = (
-        df_columns[category_choice][11:]
-        if category_choice in ["Standard", "Goalkeeping"]
-        else df_columns[category_choice]
-    )
 
-    plot_radar_chart(selected_columns)
+if "data" in st.session_state:
+    if len(selected_keys) < 2:
+        st.warning("⚠️ Please select at least **2 players** to compare.")
+    else:
+        plot_radar_chart(selected_keys)
 
 st.divider()
@@ -1,7 +1,23 @@
 import streamlit as st
 import random
+import numpy as np
 import pandas as pd
-from data.data_loader import store_session_data
+from components.distributions import distribution_chart
+from components.search import match_label, scout_selection, search_matches
+from data.data_loader import (
+    GOALKEEPING_CATEGORIES,
+    OUTFIELD_CATEGORIES,
+    dataset_version,
+    load_columns,
+    load_distribution_data,
+    lookup_players,
+    show_data_age,
+    sql_store_ready,
+    stat_columns,
+    store_columns,
+    table_columns,
+    value_percentiles,
+)
 
 st.set_page_config(page_title="Player Scout Report", page_icon="🔍", layout="wide")
 
@@ -11,18 +27,15 @@ st.caption(
 )
 st.divider()
 
-# Load data if not available in session state
-if "merged_data" not in st.session_state or "data" not in st.session_state:
-    store_session_data()
-
-merged_df = st.session_state.merged_data
-goalkeeping_columns = st.session_state.goalkeeping_columns
-outfield_columns = st.session_state.outfield_columns
-data = st.session_state.data
-stats_columns = merged_df.columns[7:]
+# Only the identity columns pick the player; each table's stats load below
+merged_df = load_columns([])
+show_data_age()
+if merged_df is None:
+    st.stop()
+version = dataset_version()
 
-# Extract Primary Position
-merged_df["Primary Position"] = merged_df["Position"].str.split(",").str[0]
+# With the SQL store, the player's stats and ranks come from queries
+use_store = sql_store_ready()
 
 
 def unique_sorted_list(column, condition=None):
@@ -62,6 +75,26 @@ if "selected_league" not in st.session_state:
 with st.sidebar:
     st.header("⚙️ Refine Your Search")
 
+    # Jump straight to a player instead of walking League -> Team -> Position
+    query, matches = search_matches(merged_df, version)
+    if matches is not None:
+        match = st.selectbox(
+            "✨ Best Matches",
+            range(len(matches)),
+            format_func=lambda i: match_label(matches, i),
+        )
+        # Only a new pick overrides the selections below
+        if st.session_state.get("search_pick") != (query, match):
+            st.session_state.search_pick = (query, match)
+            selection = scout_selection(matches.loc[match])
+            if selection is not None:
+                (
+                    st.session_state.selected_league,
+                    st.session_state.selected_team,
+                    st.session_state.selected_position,
+                    st.session_state.selected_player,
+                ) = selection
+
     st.session_state.selected_league = st.radio(
         "🌍 Choose a League",
         unique_sorted_list("League"),
@@ -107,56 +140,103 @@ with st.sidebar:
         st.session_state.selected_player = None
 
 
-@st.cache_data(show_spinner="Analyzing Performance... 📊")
-def calculate_percentile_ranks(df, position):
-    """Computes percentile ranks for players within their positional group."""
-    return df[df["Primary Position"] == position][stats_columns].rank(pct=True) * 100
+if st.session_state.selected_player is None:
+    st.warning("⚠️ No players found for this team and position.")
+    st.stop()
 
 
-filtered_df = merged_df[
-    (merged_df["League"] == st.session_state.selected_league)
-    & (merged_df["Team"] == st.session_state.selected_team)
-    & (merged_df["Position"].str.contains(st.session_state.selected_position))
-    & (merged_df["Player"] == st.session_state.selected_player)
-]
+def category_report(name):
+    """
+    Returns the selected player's stats of one table with their percentile ranks.
 
-position_percentiles = calculate_percentile_ranks(
-    merged_df, st.session_state.selected_position
-)
+    Ranks are taken within the players of the selected primary position, like
+    the percentiles of the whole dataset. Returns None if the table is not loaded.
+    """
+    columns = [col for col in table_columns(name) if col in position_stats]
+    if use_store:
+        return store_report(columns)
+    df = load_columns(columns)
+    if df is None:
+        return None
+    columns = [col for col in columns if col in df.columns]
 
-merged_df.drop(columns=["Primary Position"], errors="ignore", inplace=True)
-filtered_df.drop(columns=["Primary Position"], errors="ignore", inplace=True)
+    group = df[df["Primary Position"] == st.session_state.selected_position]
+    rows = group.index[
+        (group["League"] == st.session_state.selected_league)
+        & (group["Team"] == st.session_state.selected_team)
+        & (group["Player"] == st.session_state.selected_player)
+    ]
+    if rows.empty:
+        return None
+
+    # The player's rank only (ties averaged, like DataFrame.rank(pct=True))
+    values = group[columns].to_numpy(dtype="float64", na_value=np.nan)
+    value = group.loc[rows[0], columns].to_numpy(dtype="float64", na_value=np.nan)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        below, tied = (values < value).sum(axis=0), (values == value).sum(axis=0)
+        percentile = (below + (tied + 1) / 2) / (~np.isnan(values)).sum(axis=0) * 100
+    return pd.DataFrame(
+        {
+            "Statistics": columns,
+            "Value": value,
+            "Percentile": np.where(np.isnan(value), np.nan, percentile),
+        }
+    ).set_index("Statistics")
+
+
+def store_report(columns):
+    """`category_report` from the SQL store: a (Player, Team) lookup, then one ranking query."""
+    columns = [col for col in columns if col in store_columns()]
+    rows = lookup_players(
+        [(st.session_state.selected_player, st.session_state.selected_team)],
+        columns + ["Primary Position"],
+    )
+    rows = rows[
+        (rows["League"] == st.session_state.selected_league)
+        & (rows["Primary Position"] == st.session_state.selected_position)
+    ]
+    if not columns or rows.empty:
+        return None
+
+    value = rows.iloc[0][columns].astype("float64")
+    percentile = value_percentiles(
+        value.to_dict(), {"Primary Position": st.session_state.selected_position}
+    )
+    return pd.DataFrame(
+        {
+            "Statistics": columns,
+            "Value": value.to_numpy(),
+            "Percentile": percentile[columns].to_numpy(),
+        }
+    ).set_index("Statistics")
 
-filtered_df = filtered_df.merge(
-    position_percentiles,
-    left_index=True,
-    right_index=True,
-    suffixes=("", " Percentile"),
-)
 
 st.subheader(f"📋 **Scouting Report for :blue[{st.session_state.selected_player}]**")
 st.write(
     f"Analyzing **{st.session_state.selected_player}**, a {st.session_state.selected_position} from {st.session_state.selected_team} in the {st.session_state.selected_league}."
 )
 
-stats_columns = stats_columns.tolist()
-if st.session_state.selected_position == "GK":
-    stats_columns = list(pd.Index(stats_columns).intersection(goalkeeping_columns))
-else:
-    stats_columns = list(pd.Index(stats_columns).intersection(outfield_columns))
-percentile_columns = [col + " Percentile" for col in stats_columns]
-
-stats_values = filtered_df[stats_columns].values.flatten().tolist()
-percentile_values = filtered_df[percentile_columns].values.flatten().tolist()
-
-scout_report_df = pd.DataFrame(
-    {
-        "Statistics": stats_columns,
-        "Value": stats_values,
-        "Percentile": percentile_values,
-    }
+# Goalkeepers are only ranked on the stats of the goalkeeping tables
+position_stats = set(
+    stat_columns(goalkeeping=st.session_state.selected_position == "GK")
+)
+dataset_names = (
+    GOALKEEPING_CATEGORIES
+    if st.session_state.selected_position == "GK"
+    else OUTFIELD_CATEGORIES
 )
-scout_report_df.set_index("Statistics", inplace=True)
+with st.spinner("Analyzing Performance... 📊"):
+    category_reports = {
+        name: report
+        for name in dataset_names
+        if (report := category_report(name)) is not None
+    }
+if not category_reports:
+    st.stop()
+
+# Shared columns (Minutes, 90s, ...) are listed under their first table
+scout_report_df = pd.concat(category_reports.values())
+scout_report_df = scout_report_df[~scout_report_df.index.duplicated()]
 
 with st.expander("📊 __Detailed Scout Report__", expanded=True):
     st.dataframe(
@@ -166,26 +246,52 @@ with st.expander("📊 __Detailed Scout Report__", expanded=True):
         .format(precision=2, subset=["Value"])
     )
 
-if "data" in st.session_state:
-    dataset_names = list(st.session_state.data.keys())
-    dataset_names = (
-        st.session_state.goalkeeping_categories
-        if st.session_state.selected_position == "GK"
-        else st.session_state.outfield_categories
-    )
+# Histograms and quantile sketches are precomputed per (stat, position, league)
+distributions = load_distribution_data()
 
-    for dataset_name in dataset_names:
-        df = st.session_state.data[dataset_name]
-        if not df.empty:
-            with st.expander(f"📌 {dataset_name.replace(' Data', '')}"):
-                valid_columns = [
-                    col for col in scout_report_df.index if col in df.columns
-                ]
-                st.dataframe(
-                    scout_report_df.loc[valid_columns]
-                    .style.format({"Percentile": "{:.2f}%"})
-                    .background_gradient(cmap="RdYlGn", subset=["Percentile"])
-                    .format(precision=2, subset=["Value"])
+if distributions is not None:
+    with st.expander("📈 __Where They Stand__", expanded=True):
+        within_league = st.toggle(
+            f"🌍 Only {st.session_state.selected_position}s in the {st.session_state.selected_league}",
+            help="Compare against the player's league instead of every league.",
+        )
+        distribution_stats = st.multiselect(
+            "📊 Stats to Plot",
+            scout_report_df.index.tolist(),
+            default=scout_report_df["Percentile"].dropna().nlargest(6).index.tolist(),
+        )
+        league = st.session_state.selected_league if within_league else None
+
+        chart_columns = st.columns(3)
+        for i, stat in enumerate(distribution_stats):
+            value = scout_report_df.at[stat, "Value"]
+            value = np.nan if pd.isna(value) else float(value)
+            percentile = distributions.percentile(
+                stat, st.session_state.selected_position, value, league
+            )
+            label = (
+                f"{st.session_state.selected_player} ({percentile:.0f}%)"
+                if not np.isnan(percentile)
+                else st.session_state.selected_player
+            )
+            with chart_columns[i % 3]:
+                st.plotly_chart(
+                    distribution_chart(
+                        distributions,
+                        stat,
+                        st.session_state.selected_position,
+                        [(label, value, "0, 191, 255")],
+                        [league] if league else None,
+                    ),
+                    use_container_width=True,
                 )
 
+for dataset_name, report in category_reports.items():
+    with st.expander(f"📌 {dataset_name.replace(' Data', '')}"):
+        st.dataframe(
+            report.style.format({"Percentile": "{:.2f}%"})
+            .background_gradient(cmap="RdYlGn", subset=["Percentile"])
+            .format(precision=2, subset=["Value"])
+        )
+
 st.divider()
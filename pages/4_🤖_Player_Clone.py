@@ -2,9 +2,9 @@ import streamlit as st
 import random
 import numpy as np
 import pandas as pd
-from sklearn.preprocessing import StandardScaler
-from sklearn.metrics.pairwise import euclidean_distances
-from data.data_loader import store_session_data
+from components.search import sidebar_search
+from components.tables import top_rows
+from data.data_loader import column_options, store_session_data
 
 st.set_page_config(page_title="Player Clone", page_icon="🤖", layout="wide")
 
@@ -12,9 +12,8 @@ st.title("🤖 **Player Clone**")
 st.caption("Discover players who match your favorite star's playstyle! ⚡💫")
 st.divider()
 
-# Load data if not available
-if "merged_data" not in st.session_state or "data" not in st.session_state:
-    store_session_data()
+# Load the latest available data (expired tables refresh in the background)
+store_session_data()
 
 merged_df = st.session_state.merged_data
 data = st.session_state.data
@@ -24,12 +23,17 @@ goalkeeping_categories = st.session_state.goalkeeping_categories
 outfield_columns = st.session_state.outfield_columns
 goalkeeping_columns = st.session_state.goalkeeping_columns
 
-# Extract Primary Position
-merged_df["Primary Position"] = merged_df["Position"].str.split(",").str[0]
+# Primary Position, computed once per dataset version
+primary_position = st.session_state.primary_position
+
+# The player search shared by the pages; a pick opens the player's Scout Report
+sidebar_search(merged_df, st.session_state.data_version)
 
 
 def unique_sorted_list(column, condition=None):
-    df = merged_df if condition is None else merged_df[condition]
+    if condition is None:
+        return column_options(column)
+    df = merged_df[condition]
     return sorted(df[column].dropna().astype(str).unique().tolist())
 
 
@@ -42,7 +46,7 @@ def random_selection():
         "Player",
         condition=(merged_df["League"] == league)
         & (merged_df["Team"] == team)
-        & (merged_df["Primary Position"] == position),
+        & (primary_position == position),
     )
     return (
         (league, team, position, random.choice(players))
@@ -91,7 +95,7 @@ with st.sidebar:
         "Player",
         condition=(merged_df["League"] == st.session_state.selected_league)
         & (merged_df["Team"] == st.session_state.selected_team)
-        & (merged_df["Primary Position"] == st.session_state.selected_position),
+        & (primary_position == st.session_state.selected_position),
     )
     if players_in_team:
         st.session_state.selected_player = st.selectbox(
@@ -137,121 +141,144 @@ df_columns = {
     for name, df in data.items()
 }
 
-# Stat category selection
-category_choice = st.selectbox(
-    "📂 **Select a Stat Category:**",
-    categories,
-    index=0,
-    help="Pick a stat category for comparison.",
-)
-selected_stats = (
-    df_columns[category_choice][4:]
-    if category_choice in ["Standard", "Goalkeeping"]
-    else df_columns[category_choice]
-)
-
-# Allow narrowing stats
-narrow_stats = st.checkbox(
-    "🎛️ **Narrow down specific stats**", help="Select only certain stats for comparison."
-)
-if narrow_stats:
-    selected_stats = st.multiselect(
-        "📊 **Choose Stats to Compare:**", stats_columns, default=selected_stats
-    )
-
-# Allow weight adjustment
-adjust_weights = st.checkbox(
-    "⚖️ **Adjust stat weights**",
-    help="Assign more or less importance to specific stats.",
-)
-
-# Collect weight inputs
-stat_weights = {}
-if adjust_weights:
-    st.markdown("🔢 **Assign weight to each stat (higher value = more importance)**")
-    cols = st.columns(3)  # Create three columns for better layout
-
-    for index, stat in enumerate(selected_stats):
-        with cols[index % 3]:  # Distribute inputs across three columns
-            stat_weights[stat] = st.number_input(
-                f"⚖️ **{stat}**", min_value=0.1, max_value=10.0, value=1.0, step=0.1
-            )
-
-# Filter dataset by position type
-if player_type == "GK":
-    compare_df = merged_df[merged_df["Position"].str.contains("GK")].copy()
-else:
-    compare_df = merged_df[~merged_df["Position"].str.contains("GK")].copy()
-
-# Ensure selected stats exist in data
-selected_stats = [stat for stat in selected_stats if stat in compare_df.columns]
-if not selected_stats:
-    st.warning("⚠️ No valid stats selected for comparison!")
 
-st.divider()
-
-# Reset indexes for comparison
-compare_df.reset_index(drop=True, inplace=True)
-
-# Extract relevant stats and normalize
-scaler = StandardScaler()
-stats_matrix = compare_df[selected_stats].copy()
-
-# Handle missing values before normalizing
-stats_matrix = stats_matrix.ffill().bfill()
-
-# Normalize data
-stats_matrix = scaler.fit_transform(stats_matrix)
+@st.fragment
+def similar_players(selected_player, player_type, stats_columns, df_columns):
+    """
+    Finds players with the most similar stats to the selected player.
+
+    Runs as a fragment, so changing the category, stats or weights only
+    recomputes this section.
+    """
+    # Stat category selection
+    category_choice = st.selectbox(
+        "📂 **Select a Stat Category:**",
+        categories,
+        index=0,
+        help="Pick a stat category for comparison.",
+    )
+    selected_stats = (
+        df_columns[category_choice][4:]
+        if category_choice in ["Standard", "Goalkeeping"]
+        else df_columns[category_choice]
+    )
 
-# Apply weights if enabled
-if adjust_weights:
-    weight_array = np.array([stat_weights[stat] for stat in selected_stats])
-    # Scale stats based on user-defined weights
-    stats_matrix = stats_matrix * weight_array
+    # Allow narrowing stats
+    narrow_stats = st.checkbox(
+        "🎛️ **Narrow down specific stats**",
+        help="Select only certain stats for comparison.",
+    )
+    if narrow_stats:
+        selected_stats = st.multiselect(
+            "📊 **Choose Stats to Compare:**", stats_columns, default=selected_stats
+        )
 
-# Find Euclidean Distance
-player_index = compare_df[compare_df["Player"] == selected_player].index[0]
+    # Allow weight adjustment
+    adjust_weights = st.checkbox(
+        "⚖️ **Adjust stat weights**",
+        help="Assign more or less importance to specific stats.",
+    )
 
-# Compute similarity
-similarity_scores = 1 / (
-    1 + euclidean_distances([stats_matrix[player_index]], stats_matrix)[0]
-)
+    # Collect weight inputs
+    stat_weights = {}
+    if adjust_weights:
+        st.markdown(
+            "🔢 **Assign weight to each stat (higher value = more importance)**"
+        )
+        cols = st.columns(3)  # Create three columns for better layout
+
+        for index, stat in enumerate(selected_stats):
+            with cols[index % 3]:  # Distribute inputs across three columns
+                stat_weights[stat] = st.number_input(
+                    f"⚖️ **{stat}**", min_value=0.1, max_value=10.0, value=1.0, step=0.1
+                )
+
+    # Ensure selected stats exist in data
+    selected_stats = [stat for stat in selected_stats if stat in merged_df.columns]
+    if not selected_stats:
+        st.warning("⚠️ No valid stats selected for comparison!")
+        return
+
+    # Filter dataset by position type, keeping only the columns used below
+    is_goalkeeper = merged_df["Position"].str.contains("GK")
+    compare_df = merged_df.loc[
+        is_goalkeeper if player_type == "GK" else ~is_goalkeeper,
+        ["Player", "Team", "League", "Position", "Age"] + selected_stats,
+    ].copy()
+
+    st.divider()
+
+    # Reset indexes for comparison
+    compare_df.reset_index(drop=True, inplace=True)
+
+    # ! scikit-learn takes over a second to import, so load it only when needed
+    from sklearn.metrics.pairwise import euclidean_distances
+    from sklearn.preprocessing import StandardScaler
+
+    # Extract relevant stats and normalize
+    scaler = StandardScaler()
+    stats_matrix = compare_df[selected_stats].copy()
+
+    # Handle missing values before normalizing
+    stats_matrix = stats_matrix.ffill().bfill()
+
+    # Normalize data
+    stats_matrix = scaler.fit_transform(stats_matrix)
+
+    # Apply weights if enabled
+    if adjust_weights:
+        weight_array = np.array([stat_weights[stat] for stat in selected_stats])
+        # Scale stats based on user-defined weights
+        stats_matrix = stats_matrix * weight_array
+
+    # Find Euclidean Distance
+    player_index = compare_df[compare_df["Player"] == selected_player].index[0]
+
+    # Compute similarity
+    similarity_scores = 1 / (
+        1 + euclidean_distances([stats_matrix[player_index]], stats_matrix)[0]
+    )
 
-# Store similarity scores in DataFrame
-compare_df["Similarity Score"] = similarity_scores
-compare_df = compare_df.sort_values(by="Similarity Score", ascending=False).reset_index(
-    drop=True
-)
+    # Store similarity scores in DataFrame
+    compare_df["Similarity Score"] = similarity_scores
+    compare_df = compare_df.sort_values(
+        by="Similarity Score", ascending=False
+    ).reset_index(drop=True)
+
+    # Remove the selected player from results and filter out zero similarity scores
+    compare_df = compare_df[
+        (compare_df["Player"] != selected_player) & (compare_df["Similarity Score"] > 0)
+    ]
+
+    # Display results
+    if compare_df.empty:
+        st.warning(
+            "⚠️ No similar players found based on the selected stats. Try choosing different criteria!"
+        )
+    else:
+        st.subheader(
+            f"🧩 **Similar Players to :blue[{st.session_state.selected_player}] ({len(compare_df)})**"
+        )
 
-# Remove the selected player from results and filter out zero similarity scores
-compare_df = compare_df[
-    (compare_df["Player"] != selected_player) & (compare_df["Similarity Score"] > 0)
-]
+        styled_df = compare_df.copy()
+        styled_df = styled_df.set_index("Player")  # Set Player as index
 
-# Display results
-if compare_df.empty:
-    st.warning(
-        "⚠️ No similar players found based on the selected stats. Try choosing different criteria!"
-    )
-else:
-    st.subheader(
-        f"🧩 **Similar Players to :blue[{st.session_state.selected_player}] ({len(compare_df)})**"
-    )
+        # Ensure index uniqueness
+        styled_df = styled_df.loc[~styled_df.index.duplicated(keep="first")]
 
-    styled_df = compare_df.copy()
-    styled_df = styled_df.set_index("Player")  # Set Player as index
+        # Convert Similarity Score to percentage
+        styled_df["Similarity Score"] = styled_df["Similarity Score"] * 100
 
-    # Ensure index uniqueness
-    styled_df = styled_df.loc[~styled_df.index.duplicated(keep="first")]
+        # Display with styling
+        st.dataframe(
+            top_rows(
+                styled_df[["Team", "League", "Position", "Age", "Similarity Score"]]
+            )
+            .style.background_gradient(cmap="RdYlGn", subset=["Similarity Score"])
+            .format({"Similarity Score": "{:.2f}%", "Age": "{:.3f}"})
+        )
 
-    # Convert Similarity Score to percentage
-    styled_df["Similarity Score"] = styled_df["Similarity Score"] * 100
 
-    # Display with styling
-    st.dataframe(
-        styled_df[["Team", "League", "Position", "Age", "Similarity Score"]]
-        .style.background_gradient(cmap="RdYlGn", subset=["Similarity Score"])
-        .format({"Similarity Score": "{:.2f}%", "Age": "{:.3f}"})
-    )
+similar_players(selected_player, player_type, stats_columns, df_columns)
 
 st.divider()
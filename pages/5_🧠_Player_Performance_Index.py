@@ -1,8 +1,21 @@
 import streamlit as st
-import pandas as pd
 import numpy as np
-from data.data_loader import load_json, store_session_data
-from scipy.stats import rankdata
+from components.search import sidebar_search
+from components.tables import top_rows
+from data.data_loader import (
+    FILTER_HELP,
+    column_options,
+    dataset_columns,
+    expression_filter,
+    count_players,
+    dataset_version,
+    load_columns,
+    load_json,
+    select_players,
+    show_data_age,
+    sql_store_ready,
+)
+from footverse.scoring import percentile_scale, weighted_scores
 
 st.set_page_config(page_title="Player Performance Index", page_icon="🧠", layout="wide")
 
@@ -12,13 +25,18 @@ st.caption(
 )
 st.divider()
 
-# Load data if not available in session state
-if "merged_data" not in st.session_state or "data" not in st.session_state:
-    store_session_data()
+# Metric names come from the table schemas; scores only load the tables they need
+outfield_columns, goalkeeping_columns = dataset_columns()
+
+# With the SQL store, players are filtered by queries instead of on frames
+use_store = sql_store_ready()
+players_df = None if use_store else load_columns(["Minutes"])
+show_data_age()
+if not use_store and players_df is None:
+    st.stop()
 
-merged_df = st.session_state.merged_data
-goalkeeping_columns = st.session_state.goalkeeping_columns
-outfield_columns = st.session_state.outfield_columns
+# The player search shared by the pages; a pick opens the player's Scout Report
+sidebar_search(load_columns([]) if use_store else players_df, dataset_version())
 
 # Load metric weights
 metric_weights = load_json("config/performance-index-weights.json")
@@ -36,21 +54,6 @@ with col2:
 position_filter = "Goalkeeper" if position_filter == "🧤 Goalkeepers" else "Outfield"
 
 
-# Filter Players by Position**
-def filter_players_by_position(df, position_filter):
-    """Filters players based on whether they are Goalkeepers or Outfield players."""
-    if position_filter == "Goalkeeper":
-        cols_to_drop = [
-            col for col in outfield_columns[11:] if col != "Passes Attempted"
-        ]
-        return df[df["Primary Position"] == "GK"].drop(columns=cols_to_drop)
-    else:
-        return df[df["Primary Position"] != "GK"].drop(columns=goalkeeping_columns[11:])
-
-
-merged_df["Primary Position"] = merged_df["Position"].str.split(",").str[0]
-filtered_df = filter_players_by_position(merged_df, position_filter)
-
 # Define Outfield and Goalkeeping Categories
 goalkeeper_categories = [
     "Goalkeeping Score",
@@ -83,17 +86,17 @@ with st.sidebar:
     filters = {
         "Leagues": st.pills(
             "🌍 Select Leagues",
-            options=sorted(merged_df["League"].dropna().unique().tolist()),
+            options=column_options("League"),
             selection_mode="multi",
         ),
         "Teams": st.multiselect(
             "🏆 Choose Teams",
-            options=sorted(merged_df["Team"].dropna().unique().tolist()),
+            options=column_options("Team"),
             placeholder="Pick your favorite teams",
         ),
         "Nations": st.multiselect(
             "🌎 Select Nationalities",
-            options=sorted(merged_df["Nationality"].dropna().unique().tolist()),
+            options=column_options("Nationality"),
             placeholder="Filter by country",
         ),
     }
@@ -113,132 +116,85 @@ with st.sidebar:
         help="Select the age range of players to analyze.",
     )
 
-# Apply Sidebar Filters
-filter_conditions = {
-    "League": filters["Leagues"],
-    "Team": filters["Teams"],
-    "Nationality": filters["Nations"],
-}
-
-if position_filter == "Outfield":
-    filter_conditions["Primary Position"] = filters.get("Positions", [])
-
-for col, values in filter_conditions.items():
-    if values:
-        filtered_df = filtered_df[filtered_df[col].isin(values)]
+    filters["Expression"] = expression_filter(
+        st.text_input(
+            "🧮 Custom Filter",
+            placeholder='Age < 23 and "Progressive Carries" >= 80',
+            help=FILTER_HELP,
+        )
+    )
 
-if filters["Age"] != (15, 50):
-    filtered_df = filtered_df[filtered_df["Age"].between(*filters["Age"])]
 
-filtered_df.drop(columns=["Primary Position"], errors="ignore", inplace=True)
+def filter_columns(filters):
+    """Returns the columns the custom filter expression reads."""
+    expression = filters["Expression"]
+    return list(expression.columns) if expression is not None else []
 
-if filtered_df.empty:
-    st.error("No players found with the selected filters. Please adjust your search.")
-    st.stop()
 
-# Expander for Custom Metric Selection & Weight Adjustment
-with st.expander("Customize Metrics & Weights", icon="⚙️"):
+def apply_filters(df, filters, position_filter):
+    """Returns the players matching the player type and sidebar filters (one combined mask)."""
     if position_filter == "Goalkeeper":
-        available_metrics = goalkeeping_columns[11:]
+        mask = df["Primary Position"] == "GK"
     else:
-        available_metrics = outfield_columns[11:]
+        mask = df["Primary Position"] != "GK"
 
-    # Get default metrics from the selected category in JSON
-    default_metrics = list(metric_weights.get(selected_category, {}).keys())
-
-    # Filter only valid metrics
-    default_metrics = [
-        metric for metric in default_metrics if metric in available_metrics
-    ]
-
-    # User selection for metrics
-    selected_metrics = st.multiselect(
-        "📊 Select Metrics:",
-        options=available_metrics,
-        default=default_metrics,
-        help="Choose the performance metrics to include in the analysis.",
-    )
-
-    # Dictionary to store metric weights
-    metric_weights_input = {}
-
-    cols = st.columns(2)  # Create two columns
-
-    for idx, metric in enumerate(selected_metrics):
-        col = cols[idx % 2]  # Alternate between the two columns
-
-        # Use weight from JSON or default to 0
-        default_weight = metric_weights.get(selected_category, {}).get(metric, 0.0)
-
-        with col:  # Place the number input inside the selected column
-            metric_weights_input[metric] = st.number_input(
-                f"⚖️ **{metric}**",
-                min_value=-1.0,
-                max_value=1.0,
-                value=default_weight,
-                step=0.01,
-                help="Adjust the importance of this metric in the overall score. Values can range from -1 to 1.",
-            )
-
-# Check if sum of weights is exactly 1
-total_weight = sum(metric_weights_input.values())
-
-if not np.isclose(
-    total_weight, 1.0, atol=0.001
-):  # Allowing slight float precision error
-    st.error(
-        f"⚠️ The total sum of weights must be **1.0**. Current sum: **{total_weight:.3f}**"
-    )
-    st.stop()
+    filter_conditions = {
+        "League": filters["Leagues"],
+        "Team": filters["Teams"],
+        "Nationality": filters["Nations"],
+        "Primary Position": filters.get("Positions", []),
+    }
+    for column, values in filter_conditions.items():
+        if values:
+            mask &= df[column].isin(values)
 
-# Filter out selected metrics with 0 weight
-selected_metrics = [
-    metric
-    for metric, weight in metric_weights_input.items()
-    if not np.isclose(weight, 0.0, atol=0.0001)
-]
+    if filters["Age"] != (15, 50):
+        mask &= df["Age"].between(*filters["Age"])
 
-# Minimum Minutes Played Filter
-min_minutes = st.slider(
-    "⏳ **Minimum Minutes Played**",
-    0,
-    int(filtered_df["Minutes"].max()),
-    int(filtered_df["Minutes"].mean()),
-    help="Filter players based on game time.",
-)
-filtered_df = filtered_df[filtered_df["Minutes"] >= min_minutes]
+    if filters["Expression"] is not None:
+        mask &= filters["Expression"].mask(df)
 
-st.markdown("######")
+    return df[mask]
 
 
-# Compute Weighted Linear Combination (WLC) Scores
-def calculate_scores(df, selected_metrics, metric_weights_input):
-    scores = pd.DataFrame()
-    scores["Player"] = df["Player"]
+def store_filters(filters, position_filter):
+    """Translates the player type and sidebar filters into SQL store conditions."""
+    positions = ["GK"] if position_filter == "Goalkeeper" else ["DF", "MF", "FW"]
+    return {
+        "League": filters["Leagues"],
+        "Team": filters["Teams"],
+        "Nationality": filters["Nations"],
+        "Primary Position": filters.get("Positions") or positions,
+        "Age": filters["Age"] if filters["Age"] != (15, 50) else None,
+    }
 
-    category_score = np.zeros(len(df))
 
-    for metric in selected_metrics:
-        if metric in df.columns:
-            metric_values = df[metric].fillna(0)  # Fill NA with 0
+def filtered_players(columns, filters, position_filter):
+    """Returns the filtered players, from the SQL store when it is enabled."""
+    columns = columns + filter_columns(filters)
+    if not use_store:
+        df = load_columns(columns)
+        if df is None:
+            # load_columns already showed why
+            st.stop()
+        return apply_filters(df, filters, position_filter)
 
-            if metric_weights_input[metric] < 0:  # Penalizing negative-weighted metrics
-                metric_values *= -1
+    df = select_players(columns, store_filters(filters, position_filter))
+    if filters["Expression"] is not None:
+        df = df[filters["Expression"].mask(df)]
+    return df
 
-            category_score += metric_values * abs(metric_weights_input[metric])
 
-    scores["Weighted Score"] = category_score  # Store raw WLC score
-    return scores, df[["Player"] + selected_metrics]  # Return raw metrics too
+def players_found(filters, position_filter):
+    """Checks whether any player matches the filters (a COUNT(*) in the SQL store)."""
+    if use_store and filters["Expression"] is None:
+        return count_players(store_filters(filters, position_filter)) > 0
+    return not filtered_players(["Minutes"], filters, position_filter).empty
 
 
-# Quantile Ranking (0-100 Scale)
-def quantile_scaling(scores):
-    """Converts scores into percentiles (0-100 scale)."""
-    scores["Percentile Rank"] = rankdata(scores["Weighted Score"], method="average")
-    scores["Percentile Rank"] = (
-        (scores["Percentile Rank"] - 1) / (len(scores) - 1) * 100
-    )
-    return scores
+if not players_found(filters, position_filter):
+    st.error("No players found with the selected filters. Please adjust your search.")
+    st.stop()
 
 
 # Enhance Final Scores DataFrame
@@ -264,37 +220,129 @@ def enhance_final_scores(df, original_df):
     return df
 
 
-# Compute Scores for Selected Category
-category_scores, raw_metrics_df = calculate_scores(
-    filtered_df, selected_metrics, metric_weights_input
-)
-final_scores_df = quantile_scaling(category_scores)
+@st.fragment
+def performance_index(filters, selected_category, position_filter):
+    """
+    Scores and ranks players for a performance category.
 
-# Merge Metrics for Display
-final_scores_df = raw_metrics_df.merge(final_scores_df, on="Player")
+    Runs as a fragment, so editing metrics, weights or the minutes filter only
+    recomputes this section.
+    """
+    # Expander for Custom Metric Selection & Weight Adjustment
+    with st.expander("Customize Metrics & Weights", icon="⚙️"):
+        if position_filter == "Goalkeeper":
+            available_metrics = goalkeeping_columns[11:]
+        else:
+            available_metrics = outfield_columns[11:]
 
-# Enhance with additional player info and reorder columns
-final_scores_df = enhance_final_scores(final_scores_df, filtered_df)
+        # Get default metrics from the selected category in JSON
+        default_metrics = list(metric_weights.get(selected_category, {}).keys())
 
-# Ensure index uniqueness
-final_scores_df = final_scores_df.loc[~final_scores_df.index.duplicated(keep="first")]
+        # Filter only valid metrics
+        default_metrics = [
+            metric for metric in default_metrics if metric in available_metrics
+        ]
+
+        # User selection for metrics
+        selected_metrics = st.multiselect(
+            "📊 Select Metrics:",
+            options=available_metrics,
+            default=default_metrics,
+            help="Choose the performance metrics to include in the analysis.",
+        )
 
-# Display Results
-st.caption(f"🔍 Analyzing **{selected_category}** Metrics")
+        # Dictionary to store metric weights
+        metric_weights_input = {}
 
-# Define the columns that should have the gradient
-gradient_columns = ["Weighted Score"]
+        cols = st.columns(2)  # Create two columns
+
+        for idx, metric in enumerate(selected_metrics):
+            col = cols[idx % 2]  # Alternate between the two columns
+
+            # Use weight from JSON or default to 0
+            default_weight = metric_weights.get(selected_category, {}).get(metric, 0.0)
+
+            with col:  # Place the number input inside the selected column
+                metric_weights_input[metric] = st.number_input(
+                    f"⚖️ **{metric}**",
+                    min_value=-1.0,
+                    max_value=1.0,
+                    value=default_weight,
+                    step=0.01,
+                    help="Adjust the importance of this metric in the overall score. Values can range from -1 to 1.",
+                )
+
+    # Check if sum of weights is exactly 1
+    total_weight = sum(metric_weights_input.values())
+
+    if not np.isclose(
+        total_weight, 1.0, atol=0.001
+    ):  # Allowing slight float precision error
+        st.error(
+            f"⚠️ The total sum of weights must be **1.0**. Current sum: **{total_weight:.3f}**"
+        )
+        return
+
+    # Filter out selected metrics with 0 weight
+    selected_metrics = [
+        metric
+        for metric, weight in metric_weights_input.items()
+        if not np.isclose(weight, 0.0, atol=0.0001)
+    ]
+
+    # Only the tables holding the selected metrics are loaded
+    filtered_df = filtered_players(
+        ["Minutes"] + selected_metrics, filters, position_filter
+    )
+
+    # Minimum Minutes Played Filter
+    min_minutes = st.slider(
+        "⏳ **Minimum Minutes Played**",
+        0,
+        int(filtered_df["Minutes"].max()),
+        int(filtered_df["Minutes"].mean()),
+        help="Filter players based on game time.",
+    )
+    filtered_df = filtered_df[filtered_df["Minutes"] >= min_minutes]
+
+    st.markdown("######")
+
+    # Compute Scores for Selected Category
+    category_scores, raw_metrics_df = weighted_scores(
+        filtered_df, selected_metrics, metric_weights_input
+    )
+    final_scores_df = percentile_scale(category_scores)
+
+    # Merge Metrics for Display
+    final_scores_df = raw_metrics_df.merge(final_scores_df, on="Player")
+
+    # Enhance with additional player info and reorder columns
+    final_scores_df = enhance_final_scores(final_scores_df, filtered_df)
+
+    # Ensure index uniqueness
+    final_scores_df = final_scores_df.loc[
+        ~final_scores_df.index.duplicated(keep="first")
+    ]
+
+    # Display Results
+    st.caption(f"🔍 Analyzing **{selected_category}** Metrics")
+
+    # Define the columns that should have the gradient
+    gradient_columns = ["Weighted Score"]
+
+    # Apply styling
+    styled_df = (
+        top_rows(final_scores_df.sort_values("Percentile Rank", ascending=False))
+        .style.background_gradient(cmap="RdYlGn", subset=gradient_columns)
+        .format({col: "{:.2f}" for col in final_scores_df.columns}, precision=2)
+        .format({"Weighted Score": "{:.3f}", "Age": "{:.3f}"}, precision=3)
+    )
+
+    # Display DataFrame with styling
+    st.dataframe(styled_df)
 
-# Apply styling
-styled_df = (
-    final_scores_df.sort_values("Percentile Rank", ascending=False)
-    .style.background_gradient(cmap="RdYlGn", subset=gradient_columns)
-    .format({col: "{:.2f}" for col in final_scores_df.columns}, precision=2)
-    .format({"Weighted Score": "{:.3f}", "Age": "{:.3f}"}, precision=3)
-)
 
-# Display DataFrame with styling
-st.dataframe(styled_df)
+performance_index(filters, selected_category, position_filter)
 
 with st.expander("**Performance Index Metrics**", expanded=False, icon="ℹ️"):
     st.info(
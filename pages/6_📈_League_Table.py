@@ -2,6 +2,7 @@ import streamlit as st
 import pandas as pd
 from streamlit_javascript import st_javascript
 from data.api import rate_limited_request
+from footverse.assets import crest_thumbnail, crest_thumbnails
 from data.data_loader import load_json
 
 st.set_page_config(page_title="League Table", page_icon="📈", layout="wide")
@@ -73,7 +74,7 @@ for i, (league_name, league_code) in enumerate(league_codes.items()):
             st.warning(f"⚠️ Unable to fetch data for {league_name}.")
             continue
 
-        competition_logo = competition_data["emblem"]
+        competition_logo = crest_thumbnail(competition_data["emblem"], 150)
 
         # Display competition details
         col1, col2, col3 = st.columns([1, 1, 1])
@@ -149,11 +150,14 @@ for i, (league_name, league_code) in enumerate(league_codes.items()):
         # Extract team standings
         teams = standings_data["standings"][0]["table"]
 
+        # Serve locally cached crest thumbnails instead of the full-size originals
+        crests = crest_thumbnails([team["team"]["crest"] for team in teams], 50)
+
         df = pd.DataFrame(
             [
                 {
                     "Position": team["position"],
-                    "Crest": team["team"]["crest"],
+                    "Crest": crests.get(team["team"]["crest"]),
                     "Team": team["team"]["name"],
                     "Played": team["playedGames"],
                     "Won": team["won"],
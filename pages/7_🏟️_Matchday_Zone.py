@@ -1,6 +1,8 @@
 import streamlit as st
-from data.api import rate_limited_request
+from data.api import rate_limited_request, response_version
+from footverse.assets import crest_thumbnails
 from data.data_loader import load_json
+from components.fixtures import fixture_list
 
 st.set_page_config(page_title="Matchday Zone", page_icon="🏟️", layout="wide")
 
@@ -18,6 +20,10 @@ for i, (league_name, league_code) in enumerate(league_codes.items()):
     with tabs[i]:
         competition_data = rate_limited_request(f"/competitions/{league_code}")
 
+        if not competition_data:
+            st.warning(f"⚠️ Unable to fetch data for {league_name}.")
+            continue
+
         col1, col2 = st.columns(2)
 
         with col1:
@@ -51,63 +57,33 @@ for i, (league_name, league_code) in enumerate(league_codes.items()):
                 key=f"{league_code}_matchday",
             )
 
-        match_data = rate_limited_request(
-            f"/competitions/{league_code}/matches?season={selected_season}&matchday={selected_matchday}"
-        )
+        matches_endpoint = f"/competitions/{league_code}/matches?season={selected_season}&matchday={selected_matchday}"
+        match_data = rate_limited_request(matches_endpoint)
 
         st.divider()
 
         if not match_data or "matches" not in match_data:
             st.warning(f"⚠️ No matches available for the {selected_season} season.")
+            continue
+
+        # Serve locally cached crest thumbnails instead of the full-size originals
+        crests = crest_thumbnails(
+            [
+                match[side]["crest"]
+                for match in match_data["matches"]
+                for side in ("homeTeam", "awayTeam")
+            ],
+            50,
+        )
 
-        for match in match_data["matches"]:
-            home_team = match["homeTeam"]
-            away_team = match["awayTeam"]
-            score = match["score"]
-            match_status = match["status"]
-
-            # Match result formatting
-            home_score = (
-                score["fullTime"]["home"]
-                if score["fullTime"]["home"] is not None
-                else "-"
-            )
-            away_score = (
-                score["fullTime"]["away"]
-                if score["fullTime"]["away"] is not None
-                else "-"
-            )
-            match_result = f"{home_score} - {away_score}"
-
-            # Define CSS for centering content
-            center_style = "text-align: center;"
-
-            col1, col2, col3 = st.columns([3, 1, 3])
-
-            with col1:
-                st.markdown(
-                    f'<div style="{center_style}"><img src="{home_team["crest"]}" width="50" style="margin-bottom: 10px;"><br><strong>{home_team["shortName"]}</strong></div>',
-                    unsafe_allow_html=True,
-                )
-
-            with col2:
-                if match_status == "FINISHED":
-                    st.markdown(
-                        f'<div style="{center_style}"><h3>{match_result}</h3></div>',
-                        unsafe_allow_html=True,
-                    )
-                else:
-                    st.markdown(
-                        f'<div style="{center_style}"><strong>Status:</strong> {match_status}</div>',
-                        unsafe_allow_html=True,
-                    )
-
-            with col3:
-                st.markdown(
-                    f'<div style="{center_style}"><img src="{away_team["crest"]}" width="50" style="margin-bottom: 10px;"><br><strong>{away_team["shortName"]}</strong></div>',
-                    unsafe_allow_html=True,
-                )
-
-            st.markdown("###")
+        # Render the whole matchday as one HTML block, cached per response version
+        fixture_list(
+            league_code,
+            selected_season,
+            selected_matchday,
+            response_version(matches_endpoint),
+            match_data["matches"],
+            crests,
+        )
 
 st.divider()
@@ -0,0 +1,158 @@
+import streamlit as st
+import pandas as pd
+from data.data_loader import load_team_data, show_data_age
+
+st.set_page_config(page_title="Team View", page_icon="👥", layout="wide")
+
+st.title("👥 Team View")
+st.caption("Squad totals, age profiles and depth charts for every club we cover! 🏟️📊")
+st.divider()
+
+# Materialised once per dataset version, so interactions are only lookups
+tables = load_team_data()
+show_data_age()
+if tables is None:
+    st.stop()
+
+totals, averages = tables["totals"], tables["averages"]
+ages, depth = tables["ages"], tables["depth"]
+teams = ages.index
+
+# Sidebar Filters
+with st.sidebar:
+    st.header("⚙️ Pick a Squad")
+    league = st.radio(
+        "🌍 Choose a League",
+        sorted(teams.get_level_values("League").unique()),
+    )
+    team = st.selectbox(
+        "🏆 Select a Team",
+        sorted(teams[teams.get_level_values("League") == league].get_level_values(0)),
+    )
+
+key = (team, league)
+league_teams = teams.get_level_values("League") == league
+
+col1, col2, col3, col4 = st.columns(4)
+col1.metric("👥 Squad Size", int(ages.at[key, "Squad Size"]))
+col2.metric("🎂 Average Age", f"{ages.at[key, 'Average Age']:.1f}")
+col3.metric("⏱️ Minutes-Weighted Age", f"{ages.at[key, 'Minutes-Weighted Age']:.1f}")
+col4.metric("⚽ Goals", f"{totals.at[key, 'Goals']:.0f}")
+
+
+@st.fragment
+def squad_stats(team, league):
+    """Ranks the league's teams by one stat. Reruns on its own when its widgets change."""
+    st.info(
+        "Counting stats are squad totals; rates and percentages are averaged "
+        "weighted by each player's minutes."
+    )
+
+    stat = st.selectbox(
+        "📈 **Select a Stat**",
+        options=list(totals.columns) + list(averages.columns),
+        index=list(totals.columns).index("Goals"),
+        help="Totals first, then minutes-weighted averages.",
+    )
+    table = totals if stat in totals.columns else averages
+    league_values = (
+        table.loc[league_teams, stat].droplevel("League").sort_values(ascending=False)
+    )
+
+    import plotly.express as px
+
+    chart = px.bar(
+        league_values.reset_index(),
+        x="Team",
+        y=stat,
+        color=league_values.index == team,
+        color_discrete_map={True: "#FF4500", False: "#00BFFF"},
+        title=f"🏆 {league} Teams by {stat}",
+    )
+    chart.update_layout(showlegend=False)
+    st.plotly_chart(chart, use_container_width=True)
+
+    with st.expander(f"📜 **View All {team} Stats**", expanded=False):
+        # Rank 1 is the league's highest value
+        ranks = pd.concat(
+            [totals.loc[league_teams], averages.loc[league_teams]], axis=1
+        ).rank(ascending=False, method="min")
+        st.dataframe(
+            pd.DataFrame(
+                {
+                    "Value": pd.concat([totals.loc[key], averages.loc[key]]),
+                    "League Rank": ranks.loc[key],
+                }
+            ).style.format({"Value": "{:.2f}", "League Rank": "{:.0f}"})
+        )
+
+
+def age_profile():
+    """Players per age band, next to the league's other squads."""
+    import plotly.express as px
+
+    bands = ages.columns[3:]
+    chart = px.bar(
+        x=list(bands),
+        y=ages.loc[key, bands].tolist(),
+        labels={"x": "Age Band", "y": "Players"},
+        title=f"🎂 {team} Age Profile",
+    )
+    st.plotly_chart(chart, use_container_width=True)
+
+    st.dataframe(
+        ages.loc[league_teams]
+        .droplevel("League")
+        .sort_values("Minutes-Weighted Age")
+        .style.format({"Average Age": "{:.1f}", "Minutes-Weighted Age": "{:.1f}"})
+        .format(precision=0, subset=["Squad Size", *bands]),
+        use_container_width=True,
+    )
+
+
+def positional_depth():
+    """Players and share of minutes per primary position."""
+    import plotly.express as px
+
+    positions = [col.split()[0] for col in depth.columns if col.endswith("Players")]
+    team_depth = pd.DataFrame(
+        {
+            "Position": positions,
+            "Players": [depth.at[key, f"{pos} Players"] for pos in positions],
+            "Minutes %": [depth.at[key, f"{pos} Minutes %"] for pos in positions],
+        }
+    )
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.plotly_chart(
+            px.bar(
+                team_depth,
+                x="Position",
+                y="Players",
+                title=f"🧱 {team} Players per Position",
+            ),
+            use_container_width=True,
+        )
+    with col2:
+        st.plotly_chart(
+            px.pie(
+                team_depth,
+                names="Position",
+                values="Minutes %",
+                title="⏱️ Share of Minutes",
+            ),
+            use_container_width=True,
+        )
+
+
+tabs = st.tabs(["📦 Squad Stats", "🎂 Age Profile", "🧱 Positional Depth"])
+
+with tabs[0]:
+    squad_stats(team, league)
+
+with tabs[1]:
+    age_profile()
+
+with tabs[2]:
+    positional_depth()
@@ -0,0 +1,141 @@
+import streamlit as st
+import numpy as np
+from data.data_loader import FBREF_DATASETS, load_correlation_data, show_data_age
+from footverse.correlations import REDUNDANCY_THRESHOLD, redundant_clusters
+from footverse.datasets import table_columns
+
+st.set_page_config(page_title="Stat Correlations", page_icon="🧬", layout="wide")
+
+st.title("🧬 Stat Correlations")
+st.caption("Find the stats that tell the same story before you weight them twice! 🔗📊")
+st.divider()
+
+# Per-group sums computed once per dataset version; a slice only adds them up
+correlations = load_correlation_data()
+show_data_age()
+if correlations is None:
+    st.stop()
+
+# Sidebar Filters
+with st.sidebar:
+    st.header("⚙️ Slice the Players")
+    positions = st.multiselect(
+        "🎯 Positions",
+        correlations.positions(),
+        help="Leave empty to include every primary position.",
+    )
+    leagues = st.multiselect(
+        "🌍 Leagues",
+        correlations.leagues(),
+        help="Leave empty to include every league.",
+    )
+
+corr = correlations.matrix(positions, leagues)
+
+
+@st.fragment
+def redundant_stats(corr):
+    """Clusters of near-duplicate stats. Reruns on its own when its widgets change."""
+    st.info(
+        "Stats in the same cluster move together. Keeping the representative "
+        "and dropping the rest avoids counting one skill several times in the "
+        "Performance Index weights or the Player Clone stats."
+    )
+
+    threshold = st.slider(
+        "🔗 **Minimum Correlation**",
+        0.5,
+        0.99,
+        REDUNDANCY_THRESHOLD,
+        0.01,
+        help="Stats are grouped when their average absolute correlation reaches this value.",
+    )
+    clusters = redundant_clusters(corr, threshold)
+
+    if clusters.empty:
+        st.success("✅ No redundant stats at this threshold.")
+        return
+
+    st.write(
+        f"**{clusters['Cluster'].nunique()}** clusters covering "
+        f"**{len(clusters)}** stats."
+    )
+    st.dataframe(
+        clusters.style.background_gradient(
+            cmap="RdYlGn_r", subset=["Mean |r|"], vmin=threshold, vmax=1
+        ).format({"Mean |r|": "{:.3f}"}),
+        hide_index=True,
+        use_container_width=True,
+    )
+
+
+@st.fragment
+def heatmap(corr):
+    """Correlation heatmap of one stat category. Reruns on its own when its widgets change."""
+    category = st.selectbox(
+        "📂 **Stat Category**",
+        [name for name in FBREF_DATASETS if name != "Standard Data"],
+        help="Standard stats are always included.",
+    )
+    stats = [
+        col
+        for col in dict.fromkeys(
+            table_columns("Standard Data") + table_columns(category)
+        )
+        if col in corr.index
+    ]
+
+    import plotly.express as px
+
+    chart = px.imshow(
+        corr.loc[stats, stats],
+        zmin=-1,
+        zmax=1,
+        color_continuous_scale="RdBu_r",
+        aspect="auto",
+        title=f"🔥 Standard vs {category} Correlations",
+    )
+    chart.update_layout(height=max(500, 18 * len(stats)))
+    st.plotly_chart(chart, use_container_width=True)
+
+
+@st.fragment
+def stat_partners(corr):
+    """The stats most correlated with one stat. Reruns on its own when its widgets change."""
+    stat = st.selectbox(
+        "📈 **Select a Stat**",
+        corr.index,
+        index=list(corr.index).index("Goals") if "Goals" in corr.index else 0,
+    )
+    top_n = st.slider("🏅 **How Many Stats to Display?**", 5, 30, 15)
+
+    partners = corr[stat].drop(stat).dropna()
+    partners = partners.iloc[np.argsort(-partners.abs().to_numpy(), kind="stable")]
+    partners = partners.head(top_n).rename_axis("Stat").reset_index(name="Correlation")
+
+    import plotly.express as px
+
+    chart = px.bar(
+        partners,
+        x="Correlation",
+        y="Stat",
+        orientation="h",
+        color="Correlation",
+        color_continuous_scale="RdBu_r",
+        range_color=[-1, 1],
+        title=f"🔎 Stats Most Correlated with {stat}",
+    )
+    chart.update_layout(yaxis={"autorange": "reversed"})
+    st.plotly_chart(chart, use_container_width=True)
+
+
+tabs = st.tabs(["🧩 Redundant Stats", "🔥 Heatmap", "🔎 Stat Partners"])
+
+with tabs[0]:
+    redundant_stats(corr)
+
+with tabs[1]:
+    heatmap(corr)
+
+with tabs[2]:
+    stat_partners(corr)
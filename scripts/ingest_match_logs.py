@@ -0,0 +1,75 @@
+"""
+Appends per-match player logs to the match log store and updates the form.
+
+A source is either an fbref player match-log URL (fetched at bulk priority)
+or a CSV file with one row per player and match, using the dataset's column
+names (at least Player, Team, Date and Minutes). Matches already stored are
+skipped, so the script can be re-run with overlapping sources. Exits with
+status 1 if any source failed.
+
+Usage (from the repository root):
+    python scripts/ingest_match_logs.py SOURCE [SOURCE ...] [--player NAME]
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The data modules use paths relative to the repository root
+os.chdir(ROOT)
+sys.path.insert(0, ROOT)
+
+import pandas as pd  # noqa: E402
+from footverse.errors import FootverseError  # noqa: E402
+from footverse.fbref import fetch_table  # noqa: E402
+from footverse.matchlogs import append_logs, form_state, parse_match_logs  # noqa: E402
+from footverse.scheduler import BULK, request_priority  # noqa: E402
+
+# e.g. https://fbref.com/en/players/bc7dc64d/matchlogs/2024-2025/summary/Bukayo-Saka-Match-Logs
+PLAYER_SLUG = re.compile(r"/([^/]+)-Match-Logs")
+
+
+def read_source(source, player=None):
+    """Returns the log rows of a URL or CSV file."""
+    if not source.startswith("http"):
+        return pd.read_csv(source)
+
+    if player is None:
+        slug = PLAYER_SLUG.search(source)
+        if slug is None:
+            raise FootverseError(f"Pass --player for {source}")
+        player = slug.group(1).replace("-", " ")
+    return parse_match_logs(fetch_table(source), player)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("sources", nargs="+", help="fbref match-log URLs or CSV files")
+    parser.add_argument(
+        "--player", help="player name of the URLs (defaults to the URL's name)"
+    )
+    args = parser.parse_args()
+
+    ok = True
+    with request_priority(BULK):
+        for source in args.sources:
+            start = time.time()
+            try:
+                added = append_logs(read_source(source, args.player))
+                summary, status = f"{added} new matches", "✅"
+            except (FootverseError, OSError, pd.errors.ParserError) as e:
+                summary, status, ok = str(e), "❌", False
+            print(f"{status} {source}: {summary} ({time.time() - start:.1f} s)")
+
+    start = time.time()
+    state = form_state()
+    print(f"🔥 Form updated to {state.parts} parts ({time.time() - start:.1f} s)")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+"""
+Adds previous fbref seasons to the history store, without a browser.
+
+Only the tables of a season that are not stored yet are fetched, so the
+script can be re-run to add a new season or finish one that failed halfway;
+stored seasons are never rewritten unless `--force` is given. A table is
+stored with the competitions that could be fetched; the others are reported,
+and fetched again on the next run. Requests run at bulk priority, so a live
+server's users are served first. Exits with status 1 if any season failed.
+
+Usage (from the repository root):
+    python scripts/load_history.py 2023-2024 [2022-2023 ...] [--force] [--table NAME ...]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The data modules use paths relative to the repository root
+os.chdir(ROOT)
+sys.path.insert(0, ROOT)
+
+from footverse.datasets import FBREF_DATASETS  # noqa: E402
+from footverse.errors import FootverseError  # noqa: E402
+from footverse.history import append_season, check_season  # noqa: E402
+from footverse.scheduler import BULK, request_priority  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("seasons", nargs="+", help="seasons such as 2022-2023")
+    parser.add_argument(
+        "--force", action="store_true", help="re-fetch tables that are stored"
+    )
+    parser.add_argument(
+        "--table",
+        action="append",
+        choices=list(FBREF_DATASETS),
+        help="only load this table (repeatable)",
+    )
+    args = parser.parse_args()
+
+    try:
+        seasons = [check_season(season) for season in args.seasons]
+    except FootverseError as e:
+        parser.error(str(e))
+
+    ok = True
+    with request_priority(BULK):
+        for season in seasons:
+            start = time.time()
+            try:
+                written = append_season(season, args.table, args.force)
+                summary, status = f"{len(written)} tables stored", "✅"
+                missing = [
+                    f"{name} ({', '.join(errors)})"
+                    for name, errors in written.items()
+                    if errors
+                ]
+                if missing:
+                    summary += f", missing competitions: {'; '.join(missing)}"
+                    status = "⚠️"
+            except FootverseError as e:
+                summary, status, ok = str(e), "❌", False
+            print(f"{status} {season}: {summary} ({time.time() - start:.1f} s)")
+
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
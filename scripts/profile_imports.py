@@ -0,0 +1,108 @@
+"""
+Measures the import cost of every page and checks it against a budget.
+
+Each page's top-level imports run in a fresh interpreter with `-X importtime`,
+so the numbers match a cold start. The Streamlit runtime itself is measured
+separately and subtracted, since every page pays for it anyway.
+
+Usage (from the repository root):
+    python scripts/profile_imports.py [--budget 500] [--top 5]
+"""
+
+import argparse
+import ast
+import glob
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Import cost (ms) a page may add on top of Streamlit and pandas
+IMPORT_BUDGET_MS = 500
+
+# Modules every page needs; their cost is the baseline
+BASELINE_IMPORTS = "import streamlit\nimport pandas\n"
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def page_files():
+    """Returns the Home page followed by the pages in sidebar order."""
+    return sorted(glob.glob(os.path.join(ROOT, "*.py"))) + sorted(
+        glob.glob(os.path.join(ROOT, "pages", "*.py"))
+    )
+
+
+def top_level_imports(path):
+    """Returns the source of the imports a page runs at module level."""
+    with open(path, "r", encoding="utf-8") as f:
+        source = f.read()
+    tree = ast.parse(source)
+    return "\n".join(
+        ast.get_source_segment(source, node)
+        for node in tree.body
+        if isinstance(node, (ast.Import, ast.ImportFrom))
+    )
+
+
+def import_times(code):
+    """Runs `code` in a fresh interpreter and returns {module: cumulative ms}."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    times = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        # Only count modules imported directly, not their dependencies
+        if match and len(match.group(3)) == 1:
+            times[match.group(4)] = int(match.group(2)) / 1000
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--budget", type=float, default=IMPORT_BUDGET_MS)
+    parser.add_argument("--top", type=int, default=5)
+    args = parser.parse_args()
+
+    baseline = import_times(BASELINE_IMPORTS)
+    print(f"Baseline (streamlit + pandas): {sum(baseline.values()):.0f} ms\n")
+
+    over_budget = []
+    for path in page_files():
+        name = os.path.relpath(path, ROOT)
+        try:
+            times = import_times(BASELINE_IMPORTS + top_level_imports(path))
+        except RuntimeError as e:
+            print(f"⚠️ {name}: {e}")
+            over_budget.append(name)
+            continue
+
+        extra = {module: ms for module, ms in times.items() if module not in baseline}
+        total = sum(extra.values())
+        status = "✅" if total <= args.budget else "❌"
+        print(f"{status} {name}: {total:.0f} ms")
+
+        heaviest = sorted(extra.items(), key=lambda item: item[1], reverse=True)
+        for module, ms in heaviest[: args.top]:
+            print(f"      {ms:8.1f} ms  {module}")
+
+        if total > args.budget:
+            over_budget.append(name)
+
+    if over_budget:
+        print(f"\n{len(over_budget)} page(s) over the {args.budget:.0f} ms budget.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
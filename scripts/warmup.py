@@ -0,0 +1,237 @@
+"""
+Fills the data caches before the server takes traffic, without a browser.
+
+Stages: fbref tables, merged dataset (with its search index and team
+aggregates), percentile ranks, the SQL store (when `FOOTVERSE_SQL_STORE=1`)
+and current-season league data (competitions, standings, current matchday and
+crests). Each stage reports what it refreshed and how long it took.
+
+Only uses the `footverse` package, so Streamlit is not imported. The
+football-data.org key is read from the `API_FOOTBALL_DATA_KEY` environment
+variable, or from `.streamlit/secrets.toml`.
+
+Safe to run from cron: a lock file prevents overlapping runs, tables that are
+still fresh are skipped, and a failed fetch keeps the previous snapshot.
+Requests run at prefetch priority, so a live server's users are served first.
+Exits with status 1 if any stage failed.
+
+Usage (from the repository root):
+    python scripts/warmup.py [--force] [--skip-leagues]
+
+Example crontab entry (every day at 05:00):
+    0 5 * * * cd /path/to/footverse && python scripts/warmup.py >> warmup.log 2>&1
+"""
+
+import argparse
+import fcntl
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The data modules use paths relative to the repository root
+os.chdir(ROOT)
+sys.path.insert(0, ROOT)
+
+from footverse.assets import crest_thumbnail, crest_thumbnails  # noqa: E402
+from footverse.cache import CACHE_DIR  # noqa: E402
+from footverse.datasets import (  # noqa: E402
+    DATA_TTL,
+    FBREF_DATASETS,
+    build_datasets,
+    current_snapshots,
+    dataset_version,
+    refresh_table,
+    sync_store,
+)
+from footverse.errors import FootverseError  # noqa: E402
+from footverse.fbref import read_json  # noqa: E402
+from footverse.football_data import cached_request, load_api_key  # noqa: E402
+from footverse.precompute import (  # noqa: E402
+    player_row_lookup,
+    position_range_table,
+    stat_correlations,
+    stat_distributions,
+    team_tables,
+)
+from footverse.scheduler import PREFETCH, request_priority  # noqa: E402
+from footverse.search import player_index  # noqa: E402
+from footverse.snapshots import snapshot_age  # noqa: E402
+from footverse.store import store_enabled  # noqa: E402
+
+LOCK_FILE = os.path.join(CACHE_DIR, "warmup.lock")
+
+class StageError(Exception):
+    """Raised when a stage could not refresh everything it was asked to."""
+
+
+def warm_tables(force=False):
+    """Fetches every fbref table whose snapshot is missing or expired."""
+    refreshed, fresh, failed = [], [], []
+    for name in FBREF_DATASETS:
+        age = snapshot_age(name)
+        if not force and age is not None and age < DATA_TTL:
+            fresh.append(name)
+            continue
+        try:
+            refresh_table(name)
+            refreshed.append(name)
+        except FootverseError as e:
+            failed.append(f"{name} ({e})")
+
+    summary = f"{len(refreshed)} refreshed, {len(fresh)} still fresh"
+    if failed:
+        raise StageError(f"{summary}, failed: {', '.join(failed)}")
+    return summary
+
+
+def warm_merged_data():
+    """Merges the current tables and stores the result, its search index and team tables."""
+    snapshots = current_snapshots()
+    version = dataset_version(snapshots)
+    frames = build_datasets(
+        {name: snapshot["df"] for name, snapshot in snapshots.items()}, version
+    )
+    if frames["merged_data"] is None:
+        raise StageError("no merged dataset (tables missing)")
+    player_index(frames["merged_data"], version)
+    team_tables(frames["merged_data"], version)
+    rows, columns = frames["merged_data"].shape
+    return f"{rows} players x {columns} columns"
+
+
+def warm_percentiles():
+    """Precomputes position ranges, stat correlations and distributions."""
+    snapshots = current_snapshots()
+    version = dataset_version(snapshots)
+    merged_data = build_datasets(
+        {name: snapshot["df"] for name, snapshot in snapshots.items()}, version
+    )["merged_data"]
+    if merged_data is None:
+        raise StageError("no merged dataset (tables missing)")
+
+    position_range_table(merged_data, version)
+    player_row_lookup(merged_data, version)
+    stat_correlations(merged_data, version)
+    distributions = stat_distributions(merged_data, version)
+    return f"{len(distributions.stats)} stats"
+
+
+def warm_store():
+    """Loads the current merged dataset into the SQL store shared by the workers."""
+    if not sync_store():
+        raise StageError("no merged dataset (tables missing)")
+    return "players table current"
+
+
+def warm_leagues():
+    """Caches competitions, standings, current fixtures and crests of every league."""
+    league_codes = read_json("config/league-codes.json")
+    api_key = load_api_key()
+    requests_made, failed, crest_urls, emblems = 0, [], set(), set()
+
+    for league_name, league_code in league_codes.items():
+        requests_made += 1
+        try:
+            competition_data = cached_request(
+                f"/competitions/{league_code}", api_key=api_key
+            )
+        except FootverseError as e:
+            failed.append(f"{league_name} ({e})")
+            continue
+        emblems.add(competition_data.get("emblem"))
+
+        season = competition_data["currentSeason"]
+        current_season = int(season["startDate"][:4])
+        current_matchday = season.get("currentMatchday")
+
+        # Same endpoints as the League Table and Matchday Zone defaults
+        standings_endpoint = (
+            f"/competitions/{league_code}/standings"
+            if league_code == "CL"
+            else f"/competitions/{league_code}/standings?season={current_season}"
+        )
+        endpoints = [standings_endpoint]
+        if current_matchday:
+            endpoints.append(
+                f"/competitions/{league_code}/matches?season={current_season}&matchday={current_matchday}"
+            )
+
+        for endpoint in endpoints:
+            requests_made += 1
+            try:
+                payload = cached_request(endpoint, api_key=api_key)
+            except FootverseError as e:
+                failed.append(f"{league_name} {endpoint.split('?')[0]} ({e})")
+                continue
+            for standing in payload.get("standings", [])[:1]:
+                crest_urls.update(team["team"]["crest"] for team in standing["table"])
+            for match in payload.get("matches", []):
+                crest_urls.update(
+                    match[side]["crest"] for side in ("homeTeam", "awayTeam")
+                )
+
+    for emblem in emblems - {None}:
+        crest_thumbnail(emblem, 150)
+    crest_thumbnails(crest_urls, 50)
+
+    summary = (
+        f"{len(league_codes)} leagues, {requests_made} requests, "
+        f"{len(crest_urls) + len(emblems - {None})} crests"
+    )
+    if failed:
+        raise StageError(f"{summary}, failed: {', '.join(failed)}")
+    return summary
+
+
+def run_stage(label, func, *args):
+    """Runs a stage, prints its outcome and duration. Returns True on success."""
+    start = time.time()
+    try:
+        summary, ok = func(*args), True
+    except StageError as e:
+        summary, ok = str(e), False
+    except Exception as e:  # Keep going so later stages still run
+        summary, ok = f"{type(e).__name__}: {e}", False
+    status = "✅" if ok else "❌"
+    print(f"{status} {label}: {summary} ({time.time() - start:.1f} s)", flush=True)
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--force", action="store_true", help="re-fetch fbref tables that are fresh"
+    )
+    parser.add_argument(
+        "--skip-leagues", action="store_true", help="skip football-data.org"
+    )
+    args = parser.parse_args()
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(LOCK_FILE, "w") as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            print("⏭️ Another warmup is running, skipping.")
+            return 0
+
+        start = time.time()
+        with request_priority(PREFETCH):
+            results = [
+                run_stage("fbref tables", warm_tables, args.force),
+                run_stage("merged dataset", warm_merged_data),
+                run_stage("percentile ranks", warm_percentiles),
+            ]
+            if store_enabled():
+                results.append(run_stage("sql store", warm_store))
+            if not args.skip_leagues:
+                results.append(run_stage("league data", warm_leagues))
+
+        print(f"🏁 Warmup finished in {time.time() - start:.1f} s")
+        return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,5 @@
 import streamlit as st
-from data.data_loader import store_session_data
+from data.data_loader import show_data_age
 
 # Page Configuration
 st.set_page_config(page_title="Footverse", page_icon="⚽", layout="wide")
@@ -11,9 +11,8 @@ st.caption(
 )
 st.divider()
 
-# Ensure data is loaded into session state
-if "merged_data" not in st.session_state:
-    store_session_data()
+# Data is loaded lazily by the pages that need it
+show_data_age()
 
 # Home Page Content
 st.header("🚀 Welcome to Footverse!")
@@ -31,6 +30,10 @@ st.write(
 - **Unlock Advanced Metrics** – Go beyond basic stats with percentile rankings & performance insights.  
 - **Goalkeeping & Outfield Insights** – Get specialized reports tailored for each position.  
 - **Scout Players** – Discover hidden gems and potential signings with data-driven scouting.
+- **Analyze Squads** – Team totals, age profiles and positional depth for every club.
+- **Spot Redundant Stats** – See which stats move together before building your own scores.
+- **Travel Back in Time** – Follow players across past seasons and find who played like them years ago.
+- **Track Form** – Rolling and time-decayed stats from match logs show who is in form right now.
 - **Live Matchday Updates** – Stay updated with live, upcoming, and past matches across leagues.
 """
 )